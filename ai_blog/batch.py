@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, TypeVar
+
+from .metrics import metrics
+
+T = TypeVar("T")
+
+
+@dataclass
+class Stage:
+    """One step of :func:`run_pipeline`.
+
+    ``fn`` runs on ``workers`` threads and takes the previous stage's result
+    (the item itself for the first stage). Its input queue holds at most
+    ``queue_size`` items, twice ``workers`` by default.
+    """
+
+    name: str
+    fn: Callable[[Any], Any]
+    workers: int = 1
+    queue_size: int | None = None
+
+
+_DONE = object()
+
+
+def run_pipeline(
+    items: Iterable[T],
+    stages: list[Stage],
+    fatal: tuple[type[BaseException], ...] = (),
+    on_result: Callable[[T, Any, Exception | None], None] | None = None,
+    poll: float = 0.05,
+) -> int:
+    """Pass ``items`` through ``stages``, each on its own threads.
+
+    Stages are joined by bounded queues, so a slow stage holds back the ones
+    before it and a long feed is never read far ahead. ``on_result(item,
+    result, error)`` runs on the calling thread for each item. An exception
+    in ``fatal``, or any ``BaseException`` that is not an ``Exception``,
+    stops new work and is re-raised. Returns the number of items started.
+    """
+    queues = [
+        queue.Queue(maxsize=stage.queue_size or 2 * max(1, stage.workers))
+        for stage in stages
+    ]
+    results: queue.Queue = queue.Queue(maxsize=queues[-1].maxsize)
+    outboxes = queues[1:] + [results]
+    stop = threading.Event()
+    lock = threading.Lock()
+    failures: list[BaseException] = []
+    running = [max(1, stage.workers) for stage in stages]
+    started = 0
+
+    def publish(index: int) -> None:
+        metrics.set(f"pipeline.{stages[index].name}.queue", queues[index].qsize())
+
+    def worker(index: int) -> None:
+        nonlocal started
+        stage = stages[index]
+        while True:
+            entry = queues[index].get()
+            publish(index)
+            if entry is _DONE:
+                break
+            item, value, error = entry
+            if error is not None:
+                results.put(entry)
+                continue
+            if index == 0:
+                if stop.is_set():
+                    continue
+                with lock:
+                    started += 1
+            begin = time.monotonic()
+            try:
+                value = stage.fn(value)
+            except BaseException as exc:
+                if isinstance(exc, fatal) or not isinstance(exc, Exception):
+                    with lock:
+                        failures.append(exc)
+                    stop.set()
+                else:
+                    results.put((item, None, exc))
+                continue
+            finally:
+                metrics.observe(f"pipeline.{stage.name}", time.monotonic() - begin)
+            outboxes[index].put((item, value, None))
+            if index + 1 < len(stages):
+                publish(index + 1)
+        with lock:
+            running[index] -= 1
+            last = running[index] == 0
+        if last:
+            # The last worker out hands shutdown to the next stage.
+            if index + 1 < len(stages):
+                for _ in range(running[index + 1]):
+                    outboxes[index].put(_DONE)
+            else:
+                results.put(_DONE)
+
+    def report(entry) -> None:
+        item, value, error = entry
+        if on_result:
+            on_result(item, value, error)
+
+    def drain() -> None:
+        while True:
+            try:
+                entry = results.get_nowait()
+            except queue.Empty:
+                return
+            if entry is _DONE:
+                # Cannot happen before the first stage is told to stop.
+                results.put(entry)
+                return
+            report(entry)
+
+    def offer(entry) -> None:
+        while True:
+            try:
+                queues[0].put(entry, timeout=poll)
+            except queue.Full:
+                drain()
+                continue
+            publish(0)
+            return
+
+    threads = [
+        threading.Thread(
+            target=worker, args=(index,), name=f"ai-blog-{stage.name}-{n}", daemon=True
+        )
+        for index, stage in enumerate(stages)
+        for n in range(max(1, stage.workers))
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        for item in items:
+            if stop.is_set():
+                break
+            offer((item, item, None))
+            drain()
+    finally:
+        for _ in range(running[0]):
+            offer(_DONE)
+        while True:
+            entry = results.get()
+            if entry is _DONE:
+                break
+            report(entry)
+        for thread in threads:
+            thread.join()
+    if failures:
+        raise failures[0]
+    return started
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Awaitable, Callable, TypeVar
+
+from .errors import CircuitOpenError, OpenAIAuthError
+from .metrics import metrics
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+_STATE_GAUGE = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitBreaker:
+    """Stop calling a provider that keeps failing, and probe until it recovers.
+
+    The circuit opens after ``failure_threshold`` consecutive failures, or
+    when at least ``failure_rate`` of the last ``window`` calls failed (once
+    ``min_calls`` have been seen). While open, calls fail fast with
+    :class:`CircuitOpenError`. After ``reset_timeout`` seconds one probe call
+    is let through: success closes the circuit, failure re-opens it with the
+    timeout doubled up to ``max_reset_timeout``. Authentication errors are
+    not provider health failures and are not counted.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        failure_rate: float = 0.5,
+        window: int = 20,
+        min_calls: int = 10,
+        reset_timeout: float = 30.0,
+        max_reset_timeout: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._results: deque[bool] = deque(maxlen=window)
+        self._consecutive = 0
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._timeout = reset_timeout
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        with self._cond:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and self._clock() - self._opened_at >= self._timeout:
+            return HALF_OPEN
+        return self._state
+
+    def _set_state(self, state: str) -> None:
+        self._state = state
+        metrics.set("breaker.state", _STATE_GAUGE[state])
+        self._cond.notify_all()
+
+    def _open(self) -> None:
+        self._opened_at = self._clock()
+        self._results.clear()
+        self._consecutive = 0
+        metrics.inc("breaker.opened")
+        self._set_state(OPEN)
+
+    def before_call(self) -> bool:
+        """Reserve a call; returns True for a half-open probe.
+
+        Raises :class:`CircuitOpenError` while the circuit is open or a probe
+        is already in flight.
+        """
+        with self._cond:
+            state = self._current_state()
+            if state == CLOSED:
+                return False
+            if state == HALF_OPEN and not self._probing:
+                self._probing = True
+                self._state = HALF_OPEN
+                return True
+            metrics.inc("breaker.rejected")
+            retry_after = max(0.0, self._opened_at + self._timeout - self._clock())
+            raise CircuitOpenError(
+                f"Provider circuit is open; retry in {retry_after:.0f}s", retry_after
+            )
+
+    def record(self, ok: bool, probe: bool = False) -> None:
+        with self._cond:
+            if probe:
+                self._probing = False
+                if ok:
+                    self._timeout = self.reset_timeout
+                    self._results.clear()
+                    self._consecutive = 0
+                    self._set_state(CLOSED)
+                else:
+                    self._timeout = min(self._timeout * 2, self.max_reset_timeout)
+                    self._open()
+                return
+            if self._state != CLOSED:
+                return
+            self._results.append(ok)
+            self._consecutive = 0 if ok else self._consecutive + 1
+            failures = self._results.count(False)
+            if self._consecutive >= self.failure_threshold or (
+                len(self._results) >= self.min_calls
+                and failures >= self.failure_rate * len(self._results)
+            ):
+                self._open()
+
+    def _abandon(self, probe: bool) -> None:
+        # Cancelled, interrupted or rejected credentials: no verdict on the
+        # provider's health.
+        if probe:
+            with self._cond:
+                self._probing = False
+                self._cond.notify_all()
+
+    def call(self, fn: Callable[[], T]) -> T:
+        probe = self.before_call()
+        try:
+            result = fn()
+        except OpenAIAuthError:
+            self._abandon(probe)
+            raise
+        except Exception:
+            self.record(False, probe)
+            raise
+        except BaseException:
+            self._abandon(probe)
+            raise
+        self.record(True, probe)
+        return result
+
+    async def acall(self, fn: Callable[[], Awaitable[T]]) -> T:
+        probe = self.before_call()
+        try:
+            result = await fn()
+        except OpenAIAuthError:
+            self._abandon(probe)
+            raise
+        except Exception:
+            self.record(False, probe)
+            raise
+        except BaseException:
+            self._abandon(probe)
+            raise
+        self.record(True, probe)
+        return result
+
+    def wait_until_ready(self, timeout: float | None = None) -> bool:
+        """Block while the circuit is open or a probe is in flight.
+
+        Returns True once a call may be dispatched (the circuit is closed or
+        a probe slot is free), or False if ``timeout`` seconds pass first.
+        """
+        deadline = None if timeout is None else self._clock() + timeout
+        with self._cond:
+            while True:
+                state = self._current_state()
+                if state == CLOSED or (state == HALF_OPEN and not self._probing):
+                    return True
+                now = self._clock()
+                if deadline is not None and now >= deadline:
+                    return False
+                wait = None if self._probing else self._opened_at + self._timeout - now
+                if deadline is not None:
+                    wait = deadline - now if wait is None else min(wait, deadline - now)
+                self._cond.wait(timeout=max(0.01, wait) if wait is not None else None)
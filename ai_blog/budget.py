@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import math
+
+from . import prompts
+from .usage import Usage
+
+# Rough English average for current OpenAI tokenizers, rounded up to cover
+# Markdown syntax. Only used to size caps, never to bill.
+TOKENS_PER_WORD = 1.35
+# Room for the TITLE:/META:/BODY: header lines and headings.
+OVERHEAD_TOKENS = 200
+DEFAULT_MARGIN = 0.25
+
+# Calls that are not sized by the article's ``words``.
+OUTLINE_WORDS = 800
+SECTION_WORDS = 450
+
+# The closing sections every article must end with, in order. Early stop
+# never cuts into them, and if they are missing they are written by a
+# separate, smaller call.
+TAIL_HEADINGS = ("Decision checklist", "FAQs", "Conclusion")
+TAIL_RESERVE_WORDS = 350
+
+
+def output_token_cap(
+    words: int, margin: float = DEFAULT_MARGIN, overhead: int = OVERHEAD_TOKENS
+) -> int:
+    """Max output tokens for a reply of about ``words`` words."""
+    return math.ceil(max(words, 0) * TOKENS_PER_WORD * (1 + margin)) + overhead
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text.split()) * TOKENS_PER_WORD)
+
+
+def article_usage_guess(
+    topic: str, words: int, tone: str, audience: str, country: str
+) -> Usage:
+    """Pessimistic usage for one article: its prompt plus a full output cap."""
+    prompt = prompts.SYSTEM_MESSAGE + prompts.blog_user_prompt(
+        topic=topic, words=words, tone=tone, audience=audience, country=country
+    )
+    return Usage(
+        calls=1,
+        input_tokens=estimate_tokens(prompt),
+        output_tokens=output_token_cap(words),
+    )
+
+
+def _tail_index(heading: str) -> int | None:
+    name = heading.strip().lower()
+    for index, tail in enumerate(TAIL_HEADINGS):
+        # "FAQ", "FAQs" and "FAQs about X" all count, as in count_faqs.
+        if name.startswith(tail.lower().rstrip("s")):
+            return index
+    return None
+
+
+def missing_tail(body: str) -> list[str]:
+    """Closing sections that ``body`` does not have yet.
+
+    Once one closing section is present, only the ones after it are
+    reported, so a body that already reached its FAQs is not asked for a
+    second Decision checklist.
+    """
+    last = -1
+    for line in body.splitlines():
+        if line.startswith("## "):
+            index = _tail_index(line[3:])
+            if index is not None:
+                last = max(last, index)
+    return list(TAIL_HEADINGS[last + 1 :])
+
+
+def drop_last_section(body: str) -> str:
+    """``body`` without its last H2 section, which a cut-off reply left unfinished."""
+    lines = body.splitlines(keepends=True)
+    for index in range(len(lines) - 1, 0, -1):
+        if lines[index].startswith("## "):
+            return "".join(lines[:index]).rstrip() + "\n"
+    return body
+
+
+class SectionStop:
+    """Decide where to cut a streamed article that has run past its budget.
+
+    Text is fed in as it arrives. Once the body (after ``BODY:``) holds at
+    least ``words`` minus a reserve for the closing sections, the stream is
+    cut just before the next H2 heading, so the kept text always ends on a
+    whole section. Nothing is cut before ``min_sections`` H2 sections are
+    complete or after the first closing section has started.
+    """
+
+    def __init__(self, words: int, reserve: int | None = None, min_sections: int = 2):
+        if reserve is None:
+            reserve = min(TAIL_RESERVE_WORDS, words // 3)
+        self.limit = max(0, words - reserve)
+        self.min_sections = min_sections
+        self.stopped = False
+        self._buffer: list[str] = []
+        self._partial = ""
+        self._body = False
+        self._tail = False
+        self._words = 0
+        self._sections = 0
+
+    @property
+    def text(self) -> str:
+        """Everything kept so far (excludes the cut-off remainder)."""
+        return "".join(self._buffer) + ("" if self.stopped else self._partial)
+
+    def feed(self, delta: str) -> bool:
+        """Add streamed text; returns True once the stream should stop."""
+        if self.stopped:
+            return True
+        self._partial += delta
+        while not self._tail:
+            end = self._partial.find("\n")
+            if end < 0:
+                return False
+            line = self._partial[: end + 1]
+            if self._should_cut(line.rstrip("\n")):
+                self.stopped = True
+                self._partial = ""
+                return True
+            self._buffer.append(line)
+            self._partial = self._partial[end + 1 :]
+        # Inside the closing sections nothing is cut; stop scanning lines.
+        self._buffer.append(self._partial)
+        self._partial = ""
+        return False
+
+    def _should_cut(self, line: str) -> bool:
+        if not self._body:
+            self._body = line.startswith("BODY:")
+            return False
+        if line.startswith("## "):
+            if _tail_index(line[3:]) is not None:
+                self._tail = True
+                return False
+            if self._sections >= self.min_sections and self._words >= self.limit:
+                return True
+            self._sections += 1
+        self._words += len(line.split())
+        return False
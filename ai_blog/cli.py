@@ -1,4 +1,6 @@
+import json
 import os
+from contextlib import nullcontext
 from enum import Enum
 from pathlib import Path
 
@@ -6,12 +8,54 @@ import typer
 from dotenv import load_dotenv
 from rich.console import Console
 
-from .generator import generate_article, generate_outline, resolve_model, expand_section
-from .errors import OpenAIAuthError, OpenAIRateLimitError, MockDryRunRegressionError
+from .batch import Stage, run_pipeline
+from .breaker import CircuitBreaker
+from .dedupe import DEFAULT_THRESHOLD, find_duplicates, signatures_path
+from .budget import article_usage_guess
+from .errors import (
+    CircuitOpenError,
+    MockDryRunRegressionError,
+    OpenAIAuthError,
+    OpenAIRateLimitError,
+)
+from .fanout import FanoutSpecError, check_variants, fanout_article, parse_variant
+from .feeds import FEED_ITEMS, MAX_URLS, pages_from_index, write_feed, write_sitemap
+from .fingerprint import generation_fingerprint, is_stale
+from .generator import (
+    ArticleJob,
+    configure_breaker,
+    configure_hedging,
+    configure_limiter,
+    configure_pool,
+    expand_section,
+    fetch_article,
+    generate_article,
+    generate_outline,
+    prepare_article,
+    resolve_model,
+    save_article,
+)
+from .hedge import HedgePolicy, Hedger
+from .index import build_index, index_path
+from .limiter import AdaptiveLimiter
+from .links import LinksDependencyError, build_links, sidecar_path
+from .manifest import RETRY_NAME, append_manifest, append_retry, compact_manifest
 from .outline_parse import OutlineParseError, get_section, parse_outline_file
+from .pool import PoolConfigError, load_pool
+from .progress import BatchProgress, BatchStats
+from .server import Defaults, GenerationService, make_server
+from .shard import ShardSpecError, merge_outputs, parse_shard
+from .topics import TopicsParseError, iter_topic_rows
+from .usage import PriceConfigError, RunBudget, Usage, load_prices, price_for
 from .utils import slugify_topic
+from .watch import state_path, watch_topics
+from .workqueue import WorkQueue, default_worker_id, run_worker
 
 app = typer.Typer(help="Generate SEO-friendly Markdown blog posts.")
+queue_app = typer.Typer(help="Manage the SQLite work queue used by `worker`.")
+app.add_typer(queue_app, name="queue")
+audit_app = typer.Typer(help="Check generated articles across the output directory.")
+app.add_typer(audit_app, name="audit")
 console = Console()
 _DOTENV_LOADED = False
 
@@ -21,6 +65,13 @@ class Provider(str, Enum):
     mock = "mock"
 
 
+class TopicsFormat(str, Enum):
+    auto = "auto"
+    txt = "txt"
+    csv = "csv"
+    jsonl = "jsonl"
+
+
 def _load_dotenv() -> None:
     global _DOTENV_LOADED
     if _DOTENV_LOADED:
@@ -36,6 +87,11 @@ def _load_dotenv() -> None:
     _DOTENV_LOADED = True
 
 
+def _print_usage(usage: Usage, model: str | None = None, cost: float | None = None) -> None:
+    if usage.calls:
+        console.print(f"[cyan]Tokens:[/cyan] {usage.summary(model, cost)}")
+
+
 def _require_api_key() -> None:
     _load_dotenv()
     if not os.getenv("OPENAI_API_KEY"):
@@ -45,6 +101,25 @@ def _require_api_key() -> None:
         raise typer.Exit(code=2)
 
 
+def _setup_provider(provider: Provider, dry_run: bool, pool: Path | None) -> None:
+    if dry_run or provider != Provider.openai:
+        return
+    try:
+        load_prices()
+    except PriceConfigError as exc:
+        console.print(f"[red]{exc}[/red]")
+        raise typer.Exit(code=1)
+    if pool is None:
+        _require_api_key()
+        return
+    _load_dotenv()
+    try:
+        configure_pool(load_pool(pool))
+    except PoolConfigError as exc:
+        console.print(f"[red]{exc}[/red]")
+        raise typer.Exit(code=1)
+
+
 @app.command()
 def generate(
     topic: str = typer.Option(..., help="Topic or keyword for the post."),
@@ -58,6 +133,17 @@ def generate(
         Provider.openai, help="Content provider: openai or mock."
     ),
     dry_run: bool = typer.Option(False, help="Skip OpenAI calls and use sample output."),
+    stream: bool = typer.Option(
+        False,
+        help="Stream the reply and stop at a section boundary once the word budget is spent.",
+    ),
+    structured: bool = typer.Option(
+        False,
+        help="Request JSON (title, meta, sections, FAQs) and build the Markdown locally.",
+    ),
+    usage_frontmatter: bool = typer.Option(
+        False, help="Write token counts and estimated cost to each file's frontmatter."
+    ),
 ):
     if not dry_run and provider == Provider.openai:
         _require_api_key()
@@ -73,8 +159,12 @@ def generate(
             model=selected_model,
             provider=provider.value,
             dry_run=dry_run,
+            stream=stream,
+            structured=structured,
+            record_usage=usage_frontmatter,
         )
         console.print(f"[green]Saved:[/green] {article.path}")
+        _print_usage(article.usage, selected_model)
     except MockDryRunRegressionError:
         console.print("[red]Mock/Dry-run generator regression[/red]")
         raise typer.Exit(code=4)
@@ -95,7 +185,9 @@ def generate(
 
 @app.command()
 def batch(
-    topics: Path = typer.Option(..., help="Path to topics file (one per line)."),
+    topics: Path = typer.Option(
+        ..., help="Topics file (txt, csv or jsonl), or '-' to read from stdin."
+    ),
     words: int = typer.Option(1200, help="Target word count."),
     tone: str = typer.Option("friendly", help="Tone of voice."),
     audience: str = typer.Option("beginners", help="Target audience."),
@@ -106,6 +198,341 @@ def batch(
         Provider.openai, help="Content provider: openai or mock."
     ),
     dry_run: bool = typer.Option(False, help="Skip OpenAI calls and use sample output."),
+    stream: bool = typer.Option(
+        False,
+        help="Stream the reply and stop at a section boundary once the word budget is spent.",
+    ),
+    structured: bool = typer.Option(
+        False,
+        help="Request JSON (title, meta, sections, FAQs) and build the Markdown locally.",
+    ),
+    usage_frontmatter: bool = typer.Option(
+        False, help="Write token counts and estimated cost to each file's frontmatter."
+    ),
+    max_cost: float = typer.Option(
+        None,
+        help="Stop scheduling topics once the run's estimated cost (USD) would exceed this.",
+    ),
+    max_tokens: int = typer.Option(
+        None, help="Stop scheduling topics once the run's tokens would exceed this."
+    ),
+    topics_format: TopicsFormat = typer.Option(
+        TopicsFormat.auto, "--format", help="Topics format (auto-detected by default)."
+    ),
+    shard: str = typer.Option(
+        None, help="Only generate topics in shard i/N (0-based, by slug hash)."
+    ),
+    only_stale: bool = typer.Option(
+        False,
+        help="Skip topics whose existing file was generated with the current settings.",
+    ),
+    concurrency: int = typer.Option(
+        1, help="Topics generated in parallel (the upper bound with --adaptive)."
+    ),
+    adaptive: bool = typer.Option(
+        False,
+        help="Adapt the number of in-flight requests to 429s and latency (AIMD), "
+        "up to --concurrency.",
+    ),
+    pool: Path = typer.Option(
+        None,
+        envvar="AI_BLOG_POOL",
+        help="JSON file listing OpenAI-compatible endpoints/keys to balance across.",
+    ),
+    hedge: bool = typer.Option(
+        False, help="Send a duplicate request when a call runs unusually long."
+    ),
+    hedge_percentile: float = typer.Option(
+        0.95, help="Hedge once a call exceeds this percentile of observed latency."
+    ),
+    hedge_max_ratio: float = typer.Option(
+        0.1, help="Maximum share of calls that may be hedged (caps the extra spend)."
+    ),
+    hedge_model: str = typer.Option(None, help="Model to send hedged requests to."),
+    breaker: bool = typer.Option(
+        True, help="Pause dispatch while the provider keeps failing (circuit breaker)."
+    ),
+    breaker_max_pause: float = typer.Option(
+        600.0,
+        help="Give up after the provider has been unavailable this many seconds; "
+        "remaining topics are written to retry.jsonl.",
+    ),
+    progress: bool = typer.Option(
+        True,
+        help="Show progress: a live display on a terminal, periodic log lines otherwise.",
+    ),
+    progress_interval: float = typer.Option(
+        30.0, help="Seconds between progress lines when not on a terminal."
+    ),
+):
+    _setup_provider(provider, dry_run, pool)
+    selected_model = resolve_model(model)
+    spend = RunBudget(max_cost=max_cost, max_tokens=max_tokens)
+    if max_cost is not None and price_for(selected_model) is None:
+        console.print(
+            f"[red]No price known for model {selected_model}; --max-cost needs one. "
+            "Add it with AI_BLOG_PRICES.[/red]"
+        )
+        raise typer.Exit(code=1)
+    metered = spend.enabled and provider == Provider.openai and not dry_run
+    circuit = None
+    if breaker and provider == Provider.openai and not dry_run:
+        circuit = CircuitBreaker()
+        configure_breaker(circuit)
+    limiter = None
+    if adaptive and provider == Provider.openai and not dry_run:
+        limiter = AdaptiveLimiter(initial=min(4, concurrency), max_limit=concurrency)
+        configure_limiter(limiter)
+    hedger = None
+    if hedge:
+        hedger = Hedger(
+            HedgePolicy(
+                percentile=hedge_percentile, max_ratio=hedge_max_ratio, model=hedge_model
+            )
+        )
+        configure_hedging(hedger)
+    shard_spec = None
+    if shard:
+        try:
+            shard_spec = parse_shard(shard)
+        except ShardSpecError as exc:
+            console.print(f"[red]{exc}[/red]")
+            raise typer.Exit(code=1)
+    if str(topics) != "-" and not topics.exists():
+        console.print(f"[red]Topics file not found:[/red] {topics}")
+        raise typer.Exit(code=1)
+
+    rows = iter_topic_rows(
+        topics,
+        words=words,
+        tone=tone,
+        audience=audience,
+        country=country,
+        model=selected_model,
+        fmt=topics_format.value,
+    )
+    stats = BatchStats()
+    if progress and str(topics) != "-":
+        # A second streaming pass, on its own thread, gives the ETA a denominator.
+        stats.count_total(
+            lambda: sum(
+                1
+                for _ in iter_topic_rows(
+                    topics,
+                    words=words,
+                    tone=tone,
+                    audience=audience,
+                    country=country,
+                    model=selected_model,
+                    fmt=topics_format.value,
+                )
+            )
+        )
+    compact_manifest(out)
+    seen = 0
+    fresh = 0
+    skipped = 0
+    over_budget = 0
+    gave_up = False
+    budget_reached = False
+
+    def skip(row, record, reason):
+        append_manifest(out, dict(record, status="skipped", error=reason))
+        append_retry(out, row)
+
+    def items():
+        nonlocal seen, fresh, gave_up, skipped, over_budget, budget_reached
+        for row in rows:
+            seen += 1
+            slug = slugify_topic(row.topic)
+            if shard_spec is not None and not shard_spec.owns(slug):
+                stats.skip()
+                continue
+            if only_stale and not is_stale(
+                out / f"{slug}.md",
+                generation_fingerprint(
+                    "article",
+                    row.topic,
+                    row.words,
+                    row.tone,
+                    row.audience,
+                    row.country,
+                    row.model,
+                    provider.value,
+                    dry_run,
+                    structured=structured,
+                ),
+            ):
+                fresh += 1
+                stats.skip()
+                continue
+            record = {"slug": slug, "topic": row.topic, "path": f"{slug}.md"}
+            if shard_spec is not None:
+                record["shard"] = str(shard_spec)
+            if circuit is not None and not gave_up:
+                if circuit.state == "open":
+                    console.print("[yellow]Provider unavailable, pausing dispatch...[/yellow]")
+                gave_up = not circuit.wait_until_ready(breaker_max_pause)
+            if gave_up:
+                skipped += 1
+                stats.skip()
+                skip(row, record, "provider unavailable")
+                continue
+            if metered and not budget_reached:
+                guess = article_usage_guess(
+                    row.topic, row.words, row.tone, row.audience, row.country
+                )
+                budget_reached = not spend.admit(guess.total_tokens, guess.cost(row.model))
+            if budget_reached:
+                over_budget += 1
+                stats.skip()
+                skip(row, record, "budget reached")
+                continue
+            yield row, record
+
+    # Jobs by id(item), so a failed article's tokens still reach the budget.
+    jobs: dict[int, ArticleJob] = {}
+
+    def fetch(item):
+        row, _ = item
+        stats.start(item)
+        job = ArticleJob(
+            topic=row.topic,
+            words=row.words,
+            tone=row.tone,
+            audience=row.audience,
+            country=row.country,
+            out_dir=str(out),
+            model=row.model,
+            provider=provider.value,
+            dry_run=dry_run,
+            stream=stream,
+            structured=structured,
+            record_usage=usage_frontmatter,
+        )
+        jobs[id(item)] = job
+        return fetch_article(job)
+
+    def charge_hedges():
+        if hedger is not None:
+            for hedge_model, wasted in hedger.take_wasted().items():
+                spend.charge(wasted, hedge_model)
+
+    def on_result(item, article, exc):
+        nonlocal skipped
+        row, record = item
+        job = jobs.pop(id(item), None)
+        usage = job.usage if job is not None else Usage()
+        spend.record(usage, row.model)
+        charge_hedges()
+        if isinstance(exc, CircuitOpenError):
+            skipped += 1
+            stats.finish(item, "skipped")
+            skip(row, record, str(exc))
+            return
+        if exc is not None:
+            stats.finish(item, "failed", usage.total_tokens)
+            append_manifest(out, dict(record, status="failed", error=str(exc)))
+            console.print(f"[red]Failed:[/red] {row.topic} ({exc})")
+            return
+        stats.finish(item, "ok", usage.total_tokens)
+        append_manifest(out, dict(record, status="ok"))
+        suffix = f" [dim](limit {limiter.limit})[/dim]" if limiter is not None else ""
+        console.print(f"[green]Saved:[/green] {article.path}{suffix}")
+
+    display = nullcontext()
+    if progress:
+        display = BatchProgress(
+            stats,
+            console=console,
+            live=console.is_terminal,
+            log=lambda line: console.print(f"[cyan]Progress:[/cyan] {line}"),
+            interval=progress_interval,
+        )
+    try:
+        # fetch -> parse/validate/repair -> write, with bounded queues in
+        # between and a single write-behind thread.
+        with display:
+            run_pipeline(
+                items(),
+                [
+                    Stage("fetch", fetch, workers=max(1, concurrency)),
+                    Stage("prepare", prepare_article, workers=max(1, concurrency)),
+                    Stage("write", save_article, workers=1),
+                ],
+                fatal=(MockDryRunRegressionError, OpenAIAuthError, OpenAIRateLimitError),
+                on_result=on_result,
+            )
+    except TopicsParseError as exc:
+        console.print(f"[red]{exc}[/red]")
+        raise typer.Exit(code=1)
+    except MockDryRunRegressionError:
+        console.print("[red]Mock/Dry-run generator regression[/red]")
+        raise typer.Exit(code=4)
+    except OpenAIAuthError:
+        console.print(
+            "[red]Authentication failed. Please check OPENAI_API_KEY and try again.[/red]"
+        )
+        raise typer.Exit(code=2)
+    except OpenAIRateLimitError:
+        console.print(
+            "[red]Rate limit or quota exceeded. To fix:[/red]\n"
+            "- Check your OpenAI billing status and add a payment method\n"
+            "- Review usage and limits for your account\n"
+            "- Wait a few minutes and retry if you're rate-limited"
+        )
+        raise typer.Exit(code=3)
+
+    if not seen:
+        console.print("[red]No topics found in file.[/red]")
+        raise typer.Exit(code=1)
+    if fresh:
+        console.print(f"[cyan]Up to date:[/cyan] {fresh} topics skipped")
+    if hedger is not None:
+        hedger.close()
+        charge_hedges()
+    _print_usage(spend.usage, cost=spend.cost if spend.priced else None)
+    if hedger is not None:
+        console.print(f"[cyan]Hedging:[/cyan] {hedger.stats.summary()}")
+    if skipped:
+        console.print(
+            f"[yellow]Skipped:[/yellow] {skipped} topics while the provider was unavailable. "
+            f"Retry with --topics {out / RETRY_NAME}"
+        )
+    if over_budget:
+        console.print(
+            f"[yellow]Budget reached:[/yellow] {over_budget} topics not generated. "
+            f"Retry with --topics {out / RETRY_NAME}"
+        )
+    if gave_up:
+        raise typer.Exit(code=5)
+    if budget_reached:
+        raise typer.Exit(code=6)
+
+
+@app.command()
+def watch(
+    topics: Path = typer.Option(..., help="Topics file (txt, csv or jsonl) to watch."),
+    words: int = typer.Option(1200, help="Target word count."),
+    tone: str = typer.Option("friendly", help="Tone of voice."),
+    audience: str = typer.Option("beginners", help="Target audience."),
+    country: str = typer.Option("India", help="Target country/context."),
+    out: Path = typer.Option("./out", help="Output directory."),
+    model: str = typer.Option(None, help="OpenAI model (overrides env)."),
+    provider: Provider = typer.Option(
+        Provider.openai, help="Content provider: openai or mock."
+    ),
+    dry_run: bool = typer.Option(False, help="Skip OpenAI calls and use sample output."),
+    topics_format: TopicsFormat = typer.Option(
+        TopicsFormat.auto, "--format", help="Topics format (auto-detected by default)."
+    ),
+    interval: float = typer.Option(1.0, help="Seconds between checks of the topics file."),
+    debounce: float = typer.Option(
+        2.0, help="Seconds the file must stay unchanged before a run starts."
+    ),
+    once: bool = typer.Option(
+        False, help="Generate pending changes once and exit instead of watching."
+    ),
 ):
     if not dry_run and provider == Provider.openai:
         _require_api_key()
@@ -113,27 +540,395 @@ def batch(
     if not topics.exists():
         console.print(f"[red]Topics file not found:[/red] {topics}")
         raise typer.Exit(code=1)
+    compact_manifest(out)
 
-    lines = [line.strip() for line in topics.read_text(encoding="utf-8").splitlines()]
-    topic_list = [line for line in lines if line and not line.startswith("#")]
-    if not topic_list:
-        console.print("[red]No topics found in file.[/red]")
-        raise typer.Exit(code=1)
+    def read_rows():
+        return iter_topic_rows(
+            topics,
+            words=words,
+            tone=tone,
+            audience=audience,
+            country=country,
+            model=selected_model,
+            fmt=topics_format.value,
+        )
 
-    for t in topic_list:
+    def handle(slug, row):
+        record = {"slug": slug, "topic": row.topic, "path": f"{slug}.md"}
         try:
             article = generate_article(
-                topic=t,
-                words=words,
-                tone=tone,
-                audience=audience,
-                country=country,
+                topic=row.topic,
+                words=row.words,
+                tone=row.tone,
+                audience=row.audience,
+                country=row.country,
                 out_dir=str(out),
-                model=selected_model,
+                model=row.model,
                 provider=provider.value,
                 dry_run=dry_run,
             )
-            console.print(f"[green]Saved:[/green] {article.path}")
+        except (MockDryRunRegressionError, OpenAIAuthError, OpenAIRateLimitError):
+            raise
+        except Exception as exc:
+            append_manifest(out, dict(record, status="failed", error=str(exc)))
+            console.print(f"[red]Failed:[/red] {row.topic} ({exc})")
+            raise
+        append_manifest(out, dict(record, status="ok"))
+        console.print(f"[green]Saved:[/green] {article.path}")
+        _print_usage(article.usage, row.model)
+
+    def on_scan(changes):
+        console.print(
+            f"[cyan]Changed:[/cyan] {len(changes.rows)} topics "
+            f"({changes.unchanged} unchanged)"
+        )
+
+    if not once:
+        console.print(f"[cyan]Watching[/cyan] {topics} (Ctrl+C to stop)")
+    try:
+        watch_topics(
+            topics,
+            read_rows,
+            handle,
+            state_path(out),
+            interval=interval,
+            debounce=0 if once else debounce,
+            once=once,
+            fatal=(MockDryRunRegressionError, OpenAIAuthError, OpenAIRateLimitError),
+            on_scan=on_scan,
+        )
+    except KeyboardInterrupt:
+        pass
+    except TopicsParseError as exc:
+        console.print(f"[red]{exc}[/red]")
+        raise typer.Exit(code=1)
+    except MockDryRunRegressionError:
+        console.print("[red]Mock/Dry-run generator regression[/red]")
+        raise typer.Exit(code=4)
+    except OpenAIAuthError:
+        console.print(
+            "[red]Authentication failed. Please check OPENAI_API_KEY and try again.[/red]"
+        )
+        raise typer.Exit(code=2)
+    except OpenAIRateLimitError:
+        console.print(
+            "[red]Rate limit or quota exceeded. To fix:[/red]\n"
+            "- Check your OpenAI billing status and add a payment method\n"
+            "- Review usage and limits for your account\n"
+            "- Wait a few minutes and retry if you're rate-limited"
+        )
+        raise typer.Exit(code=3)
+
+
+@app.command()
+def index(
+    out: Path = typer.Argument(Path("./out"), help="Output directory to index."),
+    workers: int = typer.Option(8, help="Files read in parallel."),
+    body_stats: bool = typer.Option(
+        True, help="Count H2 headings and words (reads whole files, not just frontmatter)."
+    ),
+    show: bool = typer.Option(False, help="Print one line per indexed file."),
+):
+    if not out.is_dir():
+        console.print(f"[red]Not a directory:[/red] {out}")
+        raise typer.Exit(code=1)
+    report = build_index(out, workers=workers, body_stats=body_stats)
+    if show:
+        for entry in report.entries:
+            if entry.error:
+                console.print(f"[red]{entry.path}[/red] ({entry.error})")
+                continue
+            stats = "" if entry.word_count is None else (
+                f" h2={entry.h2_count} words={entry.word_count}"
+            )
+            console.print(f"{entry.path}: {entry.frontmatter.get('title', '')}{stats}")
+    console.print(
+        f"[green]Indexed:[/green] {len(report.entries)} files into {index_path(out)} "
+        f"({report.scanned} read, {report.reused} unchanged, {report.removed} removed)"
+    )
+
+
+@app.command()
+def links(
+    out: Path = typer.Argument(Path("./out"), help="Output directory with generated articles."),
+    top: int = typer.Option(5, help="Related articles to suggest per post."),
+    frontmatter: bool = typer.Option(
+        False, help="Also write the suggestions as a `related` slug list in each article."
+    ),
+    full: bool = typer.Option(
+        False, help="Rebuild from scratch instead of updating the previous run's index."
+    ),
+    workers: int = typer.Option(8, help="Files read in parallel."),
+):
+    if not out.is_dir():
+        console.print(f"[red]Not a directory:[/red] {out}")
+        raise typer.Exit(code=1)
+    try:
+        report = build_links(out, k=top, full=full, frontmatter=frontmatter, workers=workers)
+    except LinksDependencyError as exc:
+        console.print(f"[red]{exc}[/red]")
+        raise typer.Exit(code=1)
+    mode = "all" if report.full else f"{report.recomputed}"
+    console.print(
+        f"[green]Links:[/green] {len(report.suggestions)} articles into {sidecar_path(out)} "
+        f"({report.read} read, {report.reused} unchanged, {report.removed} removed; "
+        f"recomputed {mode})"
+    )
+    if frontmatter:
+        console.print(f"[cyan]Frontmatter:[/cyan] {report.updated_frontmatter} files updated")
+
+
+def _publishable_pages(out: Path, workers: int):
+    if not out.is_dir():
+        console.print(f"[red]Not a directory:[/red] {out}")
+        raise typer.Exit(code=1)
+    # Frontmatter-only refresh of the shared index: unchanged files are not read.
+    report = build_index(out, workers=workers, body_stats=False)
+    return pages_from_index(report.entries), report
+
+
+@app.command()
+def sitemap(
+    out: Path = typer.Argument(Path("./out"), help="Output directory with generated articles."),
+    base_url: str = typer.Option(
+        ..., help="URL articles are published under, e.g. https://example.com/blog."
+    ),
+    max_urls: int = typer.Option(MAX_URLS, help="URLs per sitemap file before splitting."),
+    workers: int = typer.Option(8, help="Files read in parallel."),
+):
+    pages, index_report = _publishable_pages(out, workers)
+    report = write_sitemap(out, base_url, pages, max_urls=max_urls)
+    console.print(
+        f"[green]Sitemap:[/green] {report.pages} URLs in {out / 'sitemap.xml'} "
+        f"({len(report.written)} files written, {report.unchanged} unchanged, "
+        f"{len(report.removed)} removed; {index_report.scanned} articles read)"
+    )
+
+
+@app.command()
+def feed(
+    out: Path = typer.Argument(Path("./out"), help="Output directory with generated articles."),
+    base_url: str = typer.Option(
+        ..., help="URL articles are published under, e.g. https://example.com/blog."
+    ),
+    title: str = typer.Option("Blog", help="Feed title."),
+    description: str = typer.Option("", help="Feed description."),
+    limit: int = typer.Option(FEED_ITEMS, help="Newest articles to include."),
+    workers: int = typer.Option(8, help="Files read in parallel."),
+):
+    pages, index_report = _publishable_pages(out, workers)
+    report = write_feed(out, base_url, pages, title=title, description=description, limit=limit)
+    state = "written" if report.written else "unchanged"
+    console.print(
+        f"[green]Feed:[/green] {min(limit, report.pages)} of {report.pages} articles in "
+        f"{out / 'feed.xml'} ({state}; {index_report.scanned} articles read)"
+    )
+
+
+@audit_app.command("duplicates")
+def audit_duplicates(
+    out: Path = typer.Argument(Path("./out"), help="Output directory to check."),
+    threshold: float = typer.Option(
+        DEFAULT_THRESHOLD, help="Report pairs whose estimated body similarity reaches this."
+    ),
+    workers: int = typer.Option(8, help="Files read in parallel."),
+    as_json: bool = typer.Option(False, "--json", help="Print the clusters as JSON lines."),
+):
+    if not out.is_dir():
+        console.print(f"[red]Not a directory:[/red] {out}")
+        raise typer.Exit(code=1)
+    if not 0 < threshold <= 1:
+        console.print("[red]--threshold must be between 0 and 1.[/red]")
+        raise typer.Exit(code=1)
+    report = find_duplicates(out, threshold=threshold, workers=workers)
+    for cluster in report.clusters:
+        if as_json:
+            typer.echo(
+                json.dumps(
+                    {
+                        "paths": cluster.paths,
+                        "pairs": [
+                            {"left": left, "right": right, "similarity": round(score, 3)}
+                            for left, right, score in cluster.pairs
+                        ],
+                    },
+                    ensure_ascii=True,
+                )
+            )
+            continue
+        console.print(
+            f"[yellow]Duplicates[/yellow] ({len(cluster.paths)} files, "
+            f"up to {cluster.max_similarity:.0%} similar):"
+        )
+        for left, right, score in cluster.pairs:
+            console.print(f"  {score:.0%}  {left} <-> {right}")
+    if not as_json:
+        console.print(
+            f"[green]Checked:[/green] {len(report.titles)} files, signatures in "
+            f"{signatures_path(out)} ({report.scanned} read, {report.reused} unchanged); "
+            f"{report.candidates} candidate pairs, {len(report.clusters)} clusters"
+        )
+    if report.clusters:
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def merge(
+    sources: list[Path] = typer.Argument(..., help="Per-shard output directories."),
+    out: Path = typer.Option(..., help="Destination directory for merged output."),
+    topics: Path = typer.Option(
+        None, help="Original topics file, used to report topics no shard produced."
+    ),
+    topics_format: TopicsFormat = typer.Option(
+        TopicsFormat.auto, "--format", help="Topics format (auto-detected by default)."
+    ),
+):
+    missing_dirs = [source for source in sources if not source.is_dir()]
+    if missing_dirs:
+        console.print(f"[red]Not a directory:[/red] {missing_dirs[0]}")
+        raise typer.Exit(code=1)
+
+    expected = None
+    if topics is not None:
+        try:
+            expected = {
+                slugify_topic(row.topic)
+                for row in iter_topic_rows(
+                    topics,
+                    words=0,
+                    tone="",
+                    audience="",
+                    country="",
+                    fmt=topics_format.value,
+                )
+            }
+        except TopicsParseError as exc:
+            console.print(f"[red]{exc}[/red]")
+            raise typer.Exit(code=1)
+
+    report = merge_outputs(sources, out, expected_slugs=expected)
+    console.print(f"[green]Merged:[/green] {report.merged} articles into {out}")
+    for slug, owners in sorted(report.overlaps.items()):
+        console.print(f"[yellow]Overlap:[/yellow] {slug} ({', '.join(owners)})")
+    for spec in report.missing_shards:
+        console.print(f"[yellow]Missing shard:[/yellow] {spec}")
+    for problem in report.bad_shards:
+        console.print(f"[red]Bad shard:[/red] {problem}")
+    for slug in report.failed:
+        console.print(f"[red]Gap (failed):[/red] {slug}")
+    for slug in report.missing:
+        console.print(f"[red]Gap (missing):[/red] {slug}")
+    if report.failed or report.missing or report.missing_shards or report.bad_shards:
+        raise typer.Exit(code=1)
+
+
+@queue_app.command("push")
+def queue_push(
+    topics: Path = typer.Option(
+        ..., help="Topics file (txt, csv or jsonl), or '-' to read from stdin."
+    ),
+    db: Path = typer.Option("./queue.db", help="SQLite queue file."),
+    words: int = typer.Option(1200, help="Target word count."),
+    tone: str = typer.Option("friendly", help="Tone of voice."),
+    audience: str = typer.Option("beginners", help="Target audience."),
+    country: str = typer.Option("India", help="Target country/context."),
+    model: str = typer.Option(None, help="OpenAI model stored with each task."),
+    topics_format: TopicsFormat = typer.Option(
+        TopicsFormat.auto, "--format", help="Topics format (auto-detected by default)."
+    ),
+):
+    rows = iter_topic_rows(
+        topics,
+        words=words,
+        tone=tone,
+        audience=audience,
+        country=country,
+        model=model,
+        fmt=topics_format.value,
+    )
+    try:
+        with WorkQueue(db) as queue:
+            added, skipped = queue.push(rows)
+    except TopicsParseError as exc:
+        console.print(f"[red]{exc}[/red]")
+        raise typer.Exit(code=1)
+    console.print(f"[green]Queued:[/green] {added} topics ({skipped} already queued)")
+
+
+@queue_app.command("stats")
+def queue_stats(db: Path = typer.Option("./queue.db", help="SQLite queue file.")):
+    if not db.exists():
+        console.print(f"[red]Queue not found:[/red] {db}")
+        raise typer.Exit(code=1)
+    with WorkQueue(db) as queue:
+        counts = queue.stats()
+    console.print(" ".join(f"{status}={count}" for status, count in counts.items()))
+
+
+@app.command()
+def worker(
+    db: Path = typer.Option("./queue.db", help="SQLite queue file."),
+    out: Path = typer.Option("./out", help="Output directory."),
+    model: str = typer.Option(None, help="OpenAI model (overrides env)."),
+    provider: Provider = typer.Option(
+        Provider.openai, help="Content provider: openai or mock."
+    ),
+    dry_run: bool = typer.Option(False, help="Skip OpenAI calls and use sample output."),
+    visibility_timeout: float = typer.Option(
+        600.0, help="Seconds a leased topic stays hidden from other workers."
+    ),
+    max_attempts: int = typer.Option(5, help="Attempts before a topic is marked dead."),
+    retry_delay: float = typer.Option(30.0, help="Base delay before a failed topic is retried."),
+    wait: bool = typer.Option(
+        False, help="Keep polling for new topics instead of exiting when the queue is empty."
+    ),
+    worker_id: str = typer.Option(None, help="Worker name (defaults to host:pid)."),
+    pool: Path = typer.Option(
+        None,
+        envvar="AI_BLOG_POOL",
+        help="JSON file listing OpenAI-compatible endpoints/keys to balance across.",
+    ),
+):
+    _setup_provider(provider, dry_run, pool)
+    selected_model = resolve_model(model)
+    if not db.exists():
+        console.print(f"[red]Queue not found:[/red] {db}")
+        raise typer.Exit(code=1)
+
+    def handle(row):
+        article = generate_article(
+            topic=row.topic,
+            words=row.words,
+            tone=row.tone,
+            audience=row.audience,
+            country=row.country,
+            out_dir=str(out),
+            model=row.model or selected_model,
+            provider=provider.value,
+            dry_run=dry_run,
+        )
+        return article.path
+
+    def on_event(kind, task, detail):
+        if kind == "done":
+            console.print(f"[green]Saved:[/green] {detail}")
+        elif kind == "lost":
+            console.print(f"[yellow]Lease lost:[/yellow] {task.row.topic} ({detail})")
+        else:
+            console.print(f"[red]Failed:[/red] {task.row.topic} ({detail})")
+
+    with WorkQueue(db, max_attempts=max_attempts) as queue:
+        try:
+            run_worker(
+                queue,
+                handle,
+                worker_id or default_worker_id(),
+                visibility_timeout=visibility_timeout,
+                retry_delay=retry_delay,
+                exit_when_idle=not wait,
+                fatal=(MockDryRunRegressionError, OpenAIAuthError, OpenAIRateLimitError),
+                on_event=on_event,
+            )
         except MockDryRunRegressionError:
             console.print("[red]Mock/Dry-run generator regression[/red]")
             raise typer.Exit(code=4)
@@ -150,8 +945,124 @@ def batch(
                 "- Wait a few minutes and retry if you're rate-limited"
             )
             raise typer.Exit(code=3)
-        except Exception as exc:
-            console.print(f"[red]Failed:[/red] {t} ({exc})")
+
+
+@app.command()
+def serve(
+    host: str = typer.Option("127.0.0.1", help="Interface to bind."),
+    port: int = typer.Option(8000, help="Port to listen on."),
+    workers: int = typer.Option(
+        4, help="Concurrent generation workers (the upper bound with --adaptive)."
+    ),
+    adaptive: bool = typer.Option(
+        False, help="Adapt in-flight provider requests to 429s and latency (AIMD)."
+    ),
+    words: int = typer.Option(1200, help="Default target word count."),
+    tone: str = typer.Option("friendly", help="Default tone of voice."),
+    audience: str = typer.Option("beginners", help="Default target audience."),
+    country: str = typer.Option("India", help="Default target country/context."),
+    out: Path = typer.Option("./out", help="Output directory."),
+    model: str = typer.Option(None, help="Default OpenAI model (overrides env)."),
+    provider: Provider = typer.Option(
+        Provider.openai, help="Content provider: openai or mock."
+    ),
+    dry_run: bool = typer.Option(False, help="Skip OpenAI calls and use sample output."),
+    pool: Path = typer.Option(
+        None,
+        envvar="AI_BLOG_POOL",
+        help="JSON file listing OpenAI-compatible endpoints/keys to balance across.",
+    ),
+):
+    _setup_provider(provider, dry_run, pool)
+    if adaptive and provider == Provider.openai and not dry_run:
+        configure_limiter(AdaptiveLimiter(initial=min(4, workers), max_limit=workers))
+    service = GenerationService(
+        out,
+        defaults=Defaults(
+            words=words,
+            tone=tone,
+            audience=audience,
+            country=country,
+            model=resolve_model(model),
+        ),
+        provider=provider.value,
+        dry_run=dry_run,
+        workers=workers,
+    )
+    server = make_server(service, host=host, port=port)
+    console.print(f"[green]Serving on[/green] http://{host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+@app.command()
+def fanout(
+    topic: str = typer.Option(..., help="Topic or keyword for the base post."),
+    variant: list[str] = typer.Option(
+        ...,
+        help="Variant to derive, e.g. 'country=US' or 'audience=experts,language=Hindi'. "
+        "Repeat for more variants.",
+    ),
+    words: int = typer.Option(1200, help="Target word count."),
+    tone: str = typer.Option("friendly", help="Tone of voice."),
+    audience: str = typer.Option("beginners", help="Base article audience."),
+    country: str = typer.Option("India", help="Base article country/context."),
+    out: Path = typer.Option("./out", help="Output directory."),
+    model: str = typer.Option(None, help="OpenAI model (overrides env)."),
+    provider: Provider = typer.Option(
+        Provider.openai, help="Content provider: openai or mock."
+    ),
+    dry_run: bool = typer.Option(False, help="Skip OpenAI calls and use sample output."),
+    concurrency: int = typer.Option(4, help="Adaptation calls in flight across all variants."),
+):
+    try:
+        variants = [parse_variant(spec) for spec in variant]
+        check_variants(variants)
+    except FanoutSpecError as exc:
+        console.print(f"[red]{exc}[/red]")
+        raise typer.Exit(code=1)
+    if not dry_run and provider == Provider.openai:
+        _require_api_key()
+    selected_model = resolve_model(model)
+    try:
+        result = fanout_article(
+            topic=topic,
+            words=words,
+            tone=tone,
+            audience=audience,
+            country=country,
+            variants=variants,
+            out_dir=str(out),
+            model=selected_model,
+            provider=provider.value,
+            dry_run=dry_run,
+            concurrency=concurrency,
+        )
+        console.print(f"[green]Saved:[/green] {result.base.path}")
+        for article in result.variants:
+            console.print(f"[green]Saved variant:[/green] {article.path}")
+        _print_usage(result.usage, selected_model)
+    except MockDryRunRegressionError:
+        console.print("[red]Mock/Dry-run generator regression[/red]")
+        raise typer.Exit(code=4)
+    except OpenAIAuthError:
+        console.print(
+            "[red]Authentication failed. Please check OPENAI_API_KEY and try again.[/red]"
+        )
+        raise typer.Exit(code=2)
+    except OpenAIRateLimitError:
+        console.print(
+            "[red]Rate limit or quota exceeded. To fix:[/red]\n"
+            "- Check your OpenAI billing status and add a payment method\n"
+            "- Review usage and limits for your account\n"
+            "- Wait a few minutes and retry if you're rate-limited"
+        )
+        raise typer.Exit(code=3)
 
 
 @app.command()
@@ -182,6 +1093,7 @@ def outline(
             dry_run=dry_run,
         )
         console.print(f"[green]Saved:[/green] {article.path}")
+        _print_usage(article.usage, selected_model)
     except MockDryRunRegressionError:
         console.print("[red]Mock/Dry-run generator regression[/red]")
         raise typer.Exit(code=4)
@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from .outline_parse import OutlineParseError, parse_frontmatter
+
+SIGNATURES_NAME = "minhash.jsonl"
+
+NUM_PERM = 128
+SHINGLE_WORDS = 5
+DEFAULT_THRESHOLD = 0.8
+# Keeps rotated values of empty bins above every real value in a bin.
+_BIN_BITS = 7
+_SPAN = 1 << (64 - _BIN_BITS)
+
+_WORD_RE = re.compile(r"[a-z0-9]+(?:'[a-z0-9]+)*")
+
+
+@dataclass
+class Signature:
+    path: str
+    mtime_ns: int
+    size: int
+    title: str = ""
+    shingle_words: int = SHINGLE_WORDS
+    minhash: list[int] | None = None
+    error: str | None = None
+
+
+@dataclass
+class DuplicateCluster:
+    paths: list[str]
+    # (path, path, estimated Jaccard similarity), highest first
+    pairs: list[tuple[str, str, float]] = field(default_factory=list)
+
+    @property
+    def max_similarity(self) -> float:
+        return max((score for _, _, score in self.pairs), default=1.0)
+
+
+@dataclass
+class DuplicateReport:
+    clusters: list[DuplicateCluster] = field(default_factory=list)
+    titles: dict[str, str] = field(default_factory=dict)
+    scanned: int = 0
+    reused: int = 0
+    compared: int = 0
+    candidates: int = 0
+
+
+def signatures_path(out_dir: str | Path) -> Path:
+    return Path(out_dir) / SIGNATURES_NAME
+
+
+def shingles(text: str, size: int = SHINGLE_WORDS) -> set[str]:
+    """Overlapping ``size``-word shingles of ``text`` (case and markup ignored)."""
+    words = _WORD_RE.findall(text.lower())
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i : i + size]) for i in range(len(words) - size + 1)}
+
+
+def minhash(items: set[str], num_perm: int = NUM_PERM) -> list[int]:
+    """One-permutation MinHash of ``items`` with ``num_perm`` bins.
+
+    Each item is hashed once; the low bits pick a bin and the rest is kept
+    if it is the smallest seen in that bin. Empty bins borrow the next
+    filled bin's value (rotation densification), so two sets agree on a bin
+    with probability equal to their Jaccard similarity, as with classic
+    MinHash, at the cost of one hash per item instead of ``num_perm``.
+    """
+    mask = num_perm - 1
+    bins: list[int | None] = [None] * num_perm
+    for item in items:
+        value = int.from_bytes(hashlib.blake2b(item.encode(), digest_size=8).digest(), "big")
+        index = value & mask
+        value >>= _BIN_BITS
+        if bins[index] is None or value < bins[index]:
+            bins[index] = value
+    if all(value is None for value in bins):
+        return []
+    signature = []
+    for index in range(num_perm):
+        step = 0
+        while bins[(index + step) % num_perm] is None:
+            step += 1
+        signature.append(bins[(index + step) % num_perm] + step * _SPAN)
+    return signature
+
+
+def similarity(left: list[int], right: list[int]) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    if not left or len(left) != len(right):
+        return 0.0
+    return sum(1 for a, b in zip(left, right) if a == b) / len(left)
+
+
+def lsh_bands(threshold: float, num_perm: int = NUM_PERM) -> tuple[int, int]:
+    """(bands, rows) for LSH with a candidate threshold near ``threshold``.
+
+    A pair becomes a candidate with probability ``1 - (1 - s**rows)**bands``,
+    which rises steeply around ``(1 / bands) ** (1 / rows)``. The most
+    selective split with that point at or below ``threshold`` is used.
+    """
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        if (1 / bands) ** (1 / rows) <= threshold:
+            best = (bands, rows)
+    return best
+
+
+def scan_file(path: str | Path, shingle_words: int = SHINGLE_WORDS) -> Signature | None:
+    file_path = Path(path)
+    try:
+        stat = file_path.stat()
+    except FileNotFoundError:
+        return None
+    entry = Signature(
+        path=file_path.name,
+        mtime_ns=stat.st_mtime_ns,
+        size=stat.st_size,
+        shingle_words=shingle_words,
+    )
+    try:
+        lines = file_path.read_text(encoding="utf-8").splitlines()
+        frontmatter, start = parse_frontmatter(lines)
+    except FileNotFoundError:
+        # Deleted after the directory was listed.
+        return None
+    except (OutlineParseError, UnicodeDecodeError) as exc:
+        entry.error = str(exc)
+        return entry
+    entry.title = frontmatter.get("title", "")
+    if frontmatter.get("kind") == "outline":
+        return entry
+    entry.minhash = minhash(shingles("\n".join(lines[start:]), shingle_words))
+    return entry
+
+
+def load_signatures(path: str | Path) -> dict[str, Signature]:
+    file_path = Path(path)
+    entries: dict[str, Signature] = {}
+    if not file_path.exists():
+        return entries
+    with file_path.open("r", encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                entry = Signature(**json.loads(line))
+            except (json.JSONDecodeError, TypeError):
+                continue
+            entries[entry.path] = entry
+    return entries
+
+
+def save_signatures(path: str | Path, entries: list[Signature]) -> None:
+    file_path = Path(path)
+    tmp_path = file_path.with_name(f".{file_path.name}.{os.getpid()}.tmp")
+    with tmp_path.open("w", encoding="utf-8") as handle:
+        for entry in entries:
+            handle.write(json.dumps(asdict(entry), ensure_ascii=True, sort_keys=True) + "\n")
+    os.replace(tmp_path, file_path)
+
+
+def _clusters(pairs: list[tuple[str, str, float]]) -> list[DuplicateCluster]:
+    parent: dict[str, str] = {}
+
+    def find(name: str) -> str:
+        parent.setdefault(name, name)
+        while parent[name] != name:
+            parent[name] = parent[parent[name]]
+            name = parent[name]
+        return name
+
+    for left, right, _ in pairs:
+        parent[find(left)] = find(right)
+    groups: dict[str, DuplicateCluster] = {}
+    for pair in sorted(pairs, key=lambda pair: -pair[2]):
+        root = find(pair[0])
+        groups.setdefault(root, DuplicateCluster(paths=[])).pairs.append(pair)
+    for cluster in groups.values():
+        cluster.paths = sorted({name for left, right, _ in cluster.pairs for name in (left, right)})
+    return sorted(groups.values(), key=lambda cluster: (-cluster.max_similarity, cluster.paths))
+
+
+def find_duplicates(
+    out_dir: str | Path,
+    threshold: float = DEFAULT_THRESHOLD,
+    workers: int = 8,
+    shingle_words: int = SHINGLE_WORDS,
+    path: str | Path | None = None,
+) -> DuplicateReport:
+    """Group articles in ``out_dir`` whose bodies are near-duplicates.
+
+    Bodies are split into word shingles and reduced to MinHash signatures,
+    cached in ``minhash.jsonl`` so only new or modified files are read (in
+    parallel on ``workers`` threads). Candidate pairs come from LSH bands,
+    so the work grows with the number of articles rather than its square.
+    Pairs whose estimated similarity reaches ``threshold`` are reported,
+    joined into clusters.
+    """
+    out = Path(out_dir)
+    target = Path(path) if path is not None else signatures_path(out)
+    previous = load_signatures(target)
+    report = DuplicateReport()
+    current: dict[str, Signature] = {}
+    pending: list[Path] = []
+
+    with os.scandir(out) as it:
+        for dirent in it:
+            if not dirent.name.endswith(".md") or not dirent.is_file():
+                continue
+            stat = dirent.stat()
+            old = previous.get(dirent.name)
+            if (
+                old is not None
+                and old.mtime_ns == stat.st_mtime_ns
+                and old.size == stat.st_size
+                and old.shingle_words == shingle_words
+                and (old.minhash is None or len(old.minhash) == NUM_PERM)
+            ):
+                current[dirent.name] = old
+                report.reused += 1
+            else:
+                pending.append(Path(dirent.path))
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            for entry in pool.map(lambda p: scan_file(p, shingle_words), pending):
+                if entry is not None:
+                    current[entry.path] = entry
+        report.scanned = len(pending)
+    entries = [current[name] for name in sorted(current)]
+    save_signatures(target, entries)
+
+    # Identical signatures (mock output, re-saved copies) are compared once.
+    groups: dict[tuple[int, ...], list[str]] = defaultdict(list)
+    for entry in entries:
+        report.titles[entry.path] = entry.title
+        if entry.minhash:
+            groups[tuple(entry.minhash)].append(entry.path)
+    pairs: list[tuple[str, str, float]] = []
+    for names in groups.values():
+        pairs.extend((names[0], other, 1.0) for other in names[1:])
+
+    bands, rows = lsh_bands(threshold)
+    representatives = [(names[0], list(signature)) for signature, names in groups.items()]
+    buckets: dict[tuple[int, tuple[int, ...]], list[int]] = defaultdict(list)
+    for index, (_, signature) in enumerate(representatives):
+        for band in range(bands):
+            buckets[(band, tuple(signature[band * rows : (band + 1) * rows]))].append(index)
+    seen: set[tuple[int, int]] = set()
+    for members in buckets.values():
+        for i, left in enumerate(members):
+            for right in members[i + 1 :]:
+                seen.add((left, right))
+    report.candidates = len(seen)
+    for left, right in seen:
+        score = similarity(representatives[left][1], representatives[right][1])
+        if score >= threshold:
+            pairs.append((representatives[left][0], representatives[right][0], score))
+    report.compared = len(representatives)
+    report.clusters = _clusters(pairs)
+    return report
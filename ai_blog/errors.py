@@ -8,3 +8,11 @@ class OpenAIRateLimitError(Exception):
 
 class MockDryRunRegressionError(Exception):
     """Raised when mock or dry-run output fails validation."""
+
+
+class CircuitOpenError(Exception):
+    """Raised when the provider circuit breaker is open and calls are paused."""
+
+    def __init__(self, message: str, retry_after: float = 0.0):
+        super().__init__(message)
+        self.retry_after = retry_after
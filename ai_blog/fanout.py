@@ -0,0 +1,384 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from . import prompts
+from .budget import output_token_cap
+from .fingerprint import generation_fingerprint
+from .generator import (
+    Article,
+    article_issues,
+    call_openai,
+    check_provider,
+    checked_repair,
+    local_repair,
+    openai_client,
+    openai_error_classes,
+    repair_body,
+    generate_article,
+)
+from .usage import Usage
+from .utils import (
+    ParsedOutput,
+    build_frontmatter,
+    ensure_out_dir,
+    parse_model_output,
+    slugify_topic,
+    trim_meta,
+    write_markdown,
+)
+
+VARIANT_FIELDS = ("country", "audience", "language")
+
+
+class FanoutSpecError(ValueError):
+    """Raised when a variant specification cannot be parsed."""
+
+
+@dataclass(frozen=True)
+class Variant:
+    country: str | None = None
+    audience: str | None = None
+    language: str | None = None
+
+    def resolve(self, country: str, audience: str) -> tuple[str, str]:
+        return self.country or country, self.audience or audience
+
+    def suffix(self) -> str:
+        return slugify_topic(
+            " ".join(value for value in (self.country, self.audience, self.language) if value)
+        )
+
+
+@dataclass
+class FanoutResult:
+    base: Article
+    variants: list[Article] = field(default_factory=list)
+
+    @property
+    def usage(self) -> Usage:
+        total = Usage()
+        total.add(self.base.usage)
+        for article in self.variants:
+            total.add(article.usage)
+        return total
+
+
+def parse_variant(spec: str) -> Variant:
+    """Parse ``country=US,audience=experts,language=Hindi`` (any subset)."""
+    values: dict[str, str] = {}
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        key, sep, value = part.partition("=")
+        key = key.strip().lower()
+        if not sep or key not in VARIANT_FIELDS or not value.strip():
+            raise FanoutSpecError(
+                f"Invalid variant {spec!r}: expected key=value pairs using "
+                f"{', '.join(VARIANT_FIELDS)}"
+            )
+        values[key] = value.strip()
+    if not values:
+        raise FanoutSpecError(f"Invalid variant {spec!r}: no fields given")
+    return Variant(**values)
+
+
+def check_variants(variants: list[Variant]) -> None:
+    """Raise :class:`FanoutSpecError` if two variants would share a file.
+
+    The variant slug is built from the field values only, so ``country=US``
+    and ``audience=us`` would overwrite each other.
+    """
+    seen: dict[str, Variant] = {}
+    for variant in variants:
+        suffix = variant.suffix()
+        if suffix in seen:
+            raise FanoutSpecError(
+                f"Variants {seen[suffix]} and {variant} would both be saved as '-{suffix}'"
+            )
+        seen[suffix] = variant
+
+
+def split_sections(body: str) -> list[str]:
+    """Split a body into the head (H1 and intro) and one chunk per H2 section."""
+    chunks: list[list[str]] = [[]]
+    for line in body.splitlines():
+        if line.startswith("## "):
+            chunks.append([])
+        chunks[-1].append(line)
+    return [
+        "\n".join(lines).strip()
+        for lines in chunks
+        if any(line.strip() for line in lines)
+    ]
+
+
+def _mock_adapt(text: str, replacements: list[tuple[str, str]]) -> str:
+    for old, new in replacements:
+        if not old or old == new:
+            continue
+        text = text.replace(old, new)
+        if old.title() != old:
+            text = text.replace(old.title(), new.title())
+    return text
+
+
+def _save_variant(
+    parsed: ParsedOutput,
+    body: str,
+    base: Article,
+    variant: Variant,
+    topic: str,
+    words: int,
+    tone: str,
+    audience: str,
+    country: str,
+    out_dir: str,
+    model: str,
+    provider: str,
+    dry_run: bool,
+    usage: Usage,
+) -> Article:
+    meta = trim_meta(parsed.meta_description, 155)
+    slug = f"{base.slug}-{variant.suffix()}"
+    frontmatter = build_frontmatter(
+        title=parsed.title,
+        slug=slug,
+        meta_description=meta,
+        topic=topic,
+        word_count_target=words,
+        kind="variant",
+        provider=provider,
+        dry_run=True if dry_run else None,
+        tone=tone,
+        audience=audience,
+        country=country,
+        model=model if provider == "openai" and not dry_run else None,
+        fingerprint=generation_fingerprint(
+            "variant",
+            topic,
+            words,
+            tone,
+            audience,
+            country,
+            model,
+            provider,
+            dry_run,
+            language=variant.language,
+        ),
+        language=variant.language,
+        base_slug=base.slug,
+    )
+    out_path = ensure_out_dir(out_dir) / f"{slug}.md"
+    write_markdown(out_path, frontmatter, body)
+    return Article(
+        title=parsed.title,
+        meta_description=meta,
+        body=body,
+        slug=slug,
+        path=str(out_path),
+        usage=usage,
+    )
+
+
+def adapt_article(
+    base: Article,
+    variant: Variant,
+    topic: str,
+    words: int,
+    tone: str,
+    audience: str,
+    country: str,
+    out_dir: str,
+    model: str,
+    provider: str = "openai",
+    dry_run: bool = False,
+    client: object | None = None,
+    concurrency: int = 4,
+    slots: threading.Semaphore | None = None,
+) -> Article:
+    """Rewrite ``base`` for ``variant`` section by section and save it.
+
+    ``audience`` and ``country`` are the base article's settings. Each H2
+    section is adapted by its own short call, run ``concurrency`` at a time;
+    the first call also adapts the title and meta description. ``slots``
+    bounds model calls shared with other variants being adapted at once.
+    """
+    check_provider(provider)
+    target_country, target_audience = variant.resolve(country, audience)
+    sections = split_sections(base.body)
+
+    if dry_run or provider == "mock":
+        replacements = [(country, target_country), (audience, target_audience)]
+        adapted = [_mock_adapt(section, replacements) for section in sections]
+        parsed = ParsedOutput(
+            title=_mock_adapt(base.title, replacements),
+            meta_description=_mock_adapt(base.meta_description, replacements),
+            body="\n\n".join(adapted),
+        )
+        article_issues(parsed.body, provider, dry_run)
+        return _save_variant(
+            parsed,
+            parsed.body,
+            base,
+            variant,
+            topic,
+            words,
+            tone,
+            target_audience,
+            target_country,
+            out_dir,
+            model,
+            provider,
+            dry_run,
+            Usage(),
+        )
+
+    if client is None:
+        client = openai_client()
+    auth_error_cls, rate_error_cls = openai_error_classes()
+    if slots is None:
+        slots = threading.BoundedSemaphore(max(1, concurrency))
+
+    def adapt(index: int) -> tuple[str, Usage]:
+        head = index == 0
+        user = prompts.adapt_user_prompt(
+            text=sections[index],
+            topic=topic,
+            tone=tone,
+            from_country=country,
+            from_audience=audience,
+            country=target_country,
+            audience=target_audience,
+            language=variant.language,
+            title=base.title if head else None,
+            meta=base.meta_description if head else None,
+        )
+        section_usage = Usage()
+        with slots:
+            raw = call_openai(
+                client,
+                auth_error_cls,
+                rate_error_cls,
+                model,
+                prompts.SYSTEM_MESSAGE,
+                user,
+                section_usage,
+                # Translated text usually needs several times the English tokens.
+                max_tokens=output_token_cap(
+                    len(sections[index].split()) * (3 if variant.language else 1)
+                ),
+                kind="adapt",
+            )
+        return raw.strip(), section_usage
+
+    usage = Usage()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        results = list(pool.map(adapt, range(len(sections))))
+    for _, section_usage in results:
+        usage.add(section_usage)
+
+    head = parse_model_output(results[0][0])
+    body = "\n\n".join([head.body.strip()] + [text for text, _ in results[1:]])
+    issues = article_issues(body, provider, dry_run)
+    if issues:
+        body, issues = local_repair(body, head.title)
+    if issues:
+        with slots:
+            repaired = repair_body(
+                client=client,
+                auth_error_cls=auth_error_cls,
+                rate_error_cls=rate_error_cls,
+                model=model,
+                topic=topic,
+                words=words,
+                tone=tone,
+                audience=target_audience,
+                country=target_country,
+                issues=issues,
+                body=body,
+                usage=usage,
+            )
+        body = checked_repair(repaired)
+
+    return _save_variant(
+        head,
+        body,
+        base,
+        variant,
+        topic,
+        words,
+        tone,
+        target_audience,
+        target_country,
+        out_dir,
+        model,
+        provider,
+        dry_run,
+        usage,
+    )
+
+
+def fanout_article(
+    topic: str,
+    words: int,
+    tone: str,
+    audience: str,
+    country: str,
+    variants: list[Variant],
+    out_dir: str,
+    model: str,
+    provider: str = "openai",
+    dry_run: bool = False,
+    client: object | None = None,
+    concurrency: int = 4,
+) -> FanoutResult:
+    """Generate one base article, then adapt it into each variant.
+
+    Variants are adapted concurrently; at most ``concurrency`` model calls
+    are in flight across all of them.
+    """
+    check_variants(variants)
+    if provider == "openai" and not dry_run and client is None:
+        client = openai_client()
+    base = generate_article(
+        topic=topic,
+        words=words,
+        tone=tone,
+        audience=audience,
+        country=country,
+        out_dir=out_dir,
+        model=model,
+        provider=provider,
+        dry_run=dry_run,
+        client=client,
+    )
+    # Variants are adapted at the same time, but share ``concurrency``
+    # model calls between them.
+    slots = threading.BoundedSemaphore(max(1, concurrency))
+
+    def adapt(variant: Variant) -> Article:
+        return adapt_article(
+            base,
+            variant,
+            topic=topic,
+            words=words,
+            tone=tone,
+            audience=audience,
+            country=country,
+            out_dir=out_dir,
+            model=model,
+            provider=provider,
+            dry_run=dry_run,
+            client=client,
+            concurrency=concurrency,
+            slots=slots,
+        )
+
+    result = FanoutResult(base=base)
+    if variants:
+        with ThreadPoolExecutor(max_workers=min(len(variants), max(1, concurrency))) as pool:
+            result.variants.extend(pool.map(adapt, variants))
+    return result
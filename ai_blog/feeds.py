@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import heapq
+import os
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from email.utils import format_datetime
+from pathlib import Path
+from urllib.parse import quote
+from xml.sax.saxutils import escape
+
+from .index import IndexEntry
+
+SITEMAP_NAME = "sitemap.xml"
+FEED_NAME = "feed.xml"
+# Limit per sitemap file from the sitemaps.org protocol.
+MAX_URLS = 50_000
+FEED_ITEMS = 50
+
+_SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+_SAFE_SLUG = re.compile(r"[a-z0-9_.-]*")
+
+
+@dataclass
+class Page:
+    slug: str
+    title: str
+    description: str
+    day: date
+
+
+@dataclass
+class FeedReport:
+    pages: int = 0
+    written: list[str] = field(default_factory=list)
+    unchanged: int = 0
+    removed: list[str] = field(default_factory=list)
+
+
+def _day(entry: IndexEntry) -> date:
+    try:
+        return date.fromisoformat(entry.frontmatter.get("date", ""))
+    except ValueError:
+        return datetime.fromtimestamp(entry.mtime_ns / 1e9, timezone.utc).date()
+
+
+def pages_from_index(entries: list[IndexEntry]) -> list[Page]:
+    """Publishable pages in the index: articles and variants, not outlines."""
+    pages = []
+    for entry in entries:
+        frontmatter = entry.frontmatter
+        if entry.error or frontmatter.get("kind") == "outline":
+            continue
+        slug = frontmatter.get("slug") or entry.path[: -len(".md")]
+        pages.append(
+            Page(
+                slug=slug,
+                title=frontmatter.get("title", slug),
+                description=frontmatter.get("meta_description", ""),
+                day=_day(entry),
+            )
+        )
+    return pages
+
+
+def _path(slug: str) -> str:
+    # slugify output needs no quoting; skipping quote() matters at millions of URLs.
+    return slug if _SAFE_SLUG.fullmatch(slug) else quote(slug)
+
+
+def page_url(base_url: str, slug: str) -> str:
+    return f"{base_url.rstrip('/')}/{_path(slug)}/"
+
+
+def _write_if_changed(path: Path, content: str) -> bool:
+    """Write ``content`` unless the file already holds it; True if written."""
+    data = content.encode("utf-8")
+    try:
+        if path.stat().st_size == len(data) and path.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        pass
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+    return True
+
+
+def _urlset(base_url: str, pages: list[Page]) -> str:
+    prefix = escape(base_url.rstrip("/"))
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>', f'<urlset xmlns="{_SITEMAP_NS}">']
+    for page in pages:
+        # Quoted paths contain no XML specials, so only the prefix is escaped.
+        lines.append(
+            f"<url><loc>{prefix}/{_path(page.slug)}/</loc>"
+            f"<lastmod>{page.day.isoformat()}</lastmod></url>"
+        )
+    lines.append("</urlset>")
+    return "\n".join(lines) + "\n"
+
+
+def write_sitemap(
+    out_dir: str | Path,
+    base_url: str,
+    pages: list[Page],
+    max_urls: int = MAX_URLS,
+) -> FeedReport:
+    """Write ``sitemap.xml`` for ``pages``, split into parts past ``max_urls``.
+
+    Pages are ordered oldest first (then by slug), so new articles land in
+    the last part and earlier parts keep their content. Parts are only
+    rewritten when their content changes. With more than ``max_urls`` pages,
+    ``sitemap.xml`` becomes a sitemap index of ``sitemap-N.xml`` files, and
+    parts left over from a larger run are removed.
+    """
+    out = Path(out_dir)
+    report = FeedReport(pages=len(pages))
+    ordered = sorted(pages, key=lambda page: (page.day, page.slug))
+    files: dict[str, str] = {}
+    if len(ordered) <= max_urls:
+        files[SITEMAP_NAME] = _urlset(base_url, ordered)
+    else:
+        index = [
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            f'<sitemapindex xmlns="{_SITEMAP_NS}">',
+        ]
+        for number, start in enumerate(range(0, len(ordered), max_urls), 1):
+            chunk = ordered[start : start + max_urls]
+            name = f"sitemap-{number}.xml"
+            files[name] = _urlset(base_url, chunk)
+            index.append(
+                f"<sitemap><loc>{escape(base_url.rstrip('/'))}/{name}</loc>"
+                f"<lastmod>{max(page.day for page in chunk).isoformat()}</lastmod></sitemap>"
+            )
+        index.append("</sitemapindex>")
+        files[SITEMAP_NAME] = "\n".join(index) + "\n"
+    for name, content in files.items():
+        if _write_if_changed(out / name, content):
+            report.written.append(name)
+        else:
+            report.unchanged += 1
+    for path in sorted(out.glob("sitemap-*.xml")):
+        if path.name not in files:
+            path.unlink()
+            report.removed.append(path.name)
+    return report
+
+
+def _rfc822(day: date) -> str:
+    return format_datetime(datetime(day.year, day.month, day.day, tzinfo=timezone.utc))
+
+
+def write_feed(
+    out_dir: str | Path,
+    base_url: str,
+    pages: list[Page],
+    title: str,
+    description: str = "",
+    limit: int = FEED_ITEMS,
+) -> FeedReport:
+    """Write an RSS 2.0 ``feed.xml`` with the ``limit`` newest pages."""
+    out = Path(out_dir)
+    report = FeedReport(pages=len(pages))
+    latest = heapq.nlargest(limit, pages, key=lambda page: (page.day, page.slug))
+    site = base_url.rstrip("/") + "/"
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<rss version="2.0">',
+        "<channel>",
+        f"<title>{escape(title)}</title>",
+        f"<link>{escape(site)}</link>",
+        f"<description>{escape(description)}</description>",
+    ]
+    if latest:
+        lines.append(f"<lastBuildDate>{_rfc822(latest[0].day)}</lastBuildDate>")
+    for page in latest:
+        url = escape(page_url(base_url, page.slug))
+        lines.append(
+            f"<item><title>{escape(page.title)}</title><link>{url}</link>"
+            f"<description>{escape(page.description)}</description>"
+            f'<guid isPermaLink="true">{url}</guid>'
+            f"<pubDate>{_rfc822(page.day)}</pubDate></item>"
+        )
+    lines.extend(["</channel>", "</rss>"])
+    if _write_if_changed(out / FEED_NAME, "\n".join(lines) + "\n"):
+        report.written.append(FEED_NAME)
+    else:
+        report.unchanged += 1
+    return report
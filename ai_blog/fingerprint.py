@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from functools import lru_cache
+from pathlib import Path
+
+from . import prompts
+from .outline_parse import OutlineParseError, read_frontmatter
+from .structured import ARTICLE_SCHEMA
+
+KINDS = ("article", "outline", "variant")
+
+# Placeholder values used to render the prompt builders, so that edits to the
+# f-string layout change the hash as well as edits to the instruction text.
+_PLACEHOLDERS = {
+    "topic": "{topic}",
+    "words": "{words}",
+    "tone": "{tone}",
+    "audience": "{audience}",
+    "country": "{country}",
+}
+
+
+def _digest(*parts: object) -> str:
+    raw = "\x1f".join("" if part is None else str(part) for part in parts)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+@lru_cache(maxsize=None)
+def prompt_hash(kind: str = "article") -> str:
+    """Hash of the prompt templates used to generate ``kind``."""
+    if kind == "article":
+        args = dict(_PLACEHOLDERS)
+        del args["words"]
+        rendered = [
+            prompts.blog_user_prompt(**_PLACEHOLDERS),
+            prompts.repair_user_prompt(issues=["{issue}"], body="{body}", **_PLACEHOLDERS),
+            prompts.finish_user_prompt(sections=["{section}"], body="{body}", **args),
+            prompts.blog_json_user_prompt(**_PLACEHOLDERS),
+            json.dumps(ARTICLE_SCHEMA, sort_keys=True),
+        ]
+    elif kind == "outline":
+        args = dict(_PLACEHOLDERS)
+        del args["words"]
+        rendered = [prompts.outline_user_prompt(**args)]
+    elif kind == "variant":
+        args = dict(
+            text="{text}",
+            topic="{topic}",
+            tone="{tone}",
+            from_country="{from_country}",
+            from_audience="{from_audience}",
+            country="{country}",
+            audience="{audience}",
+            language="{language}",
+        )
+        rendered = [
+            prompts.adapt_user_prompt(**args),
+            prompts.adapt_user_prompt(title="{title}", meta="{meta}", **args),
+            prompts.repair_user_prompt(issues=["{issue}"], body="{body}", **_PLACEHOLDERS),
+        ]
+    else:
+        raise ValueError(f"Unknown kind: {kind}")
+    return _digest(prompts.SYSTEM_MESSAGE, *rendered)
+
+
+def generation_fingerprint(
+    kind: str,
+    topic: str,
+    words: int,
+    tone: str,
+    audience: str,
+    country: str,
+    model: str | None,
+    provider: str = "openai",
+    dry_run: bool = False,
+    language: str | None = None,
+    structured: bool = False,
+) -> str:
+    """Hash of every setting that shapes a generated file.
+
+    The model and ``structured`` are ignored for mock and dry-run output,
+    which never calls it.
+    """
+    if dry_run or provider != "openai":
+        model = None
+        structured = False
+    parts = [
+        kind,
+        prompt_hash(kind),
+        topic,
+        words,
+        tone,
+        audience,
+        country,
+        model,
+        provider,
+        bool(dry_run),
+    ]
+    if language:
+        parts.append(language)
+    if structured:
+        parts.append("structured")
+    return _digest(*parts)
+
+
+def stored_fingerprint(path: str | Path) -> str | None:
+    """Read ``fingerprint`` from a file's frontmatter without reading the body."""
+    try:
+        return read_frontmatter(path).get("fingerprint")
+    except OutlineParseError:
+        return None
+
+
+def is_stale(path: str | Path, fingerprint: str) -> bool:
+    """True when ``path`` is missing or was generated with other settings."""
+    return stored_fingerprint(path) != fingerprint
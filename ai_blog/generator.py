@@ -1,19 +1,52 @@
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import os
 import random
 import re
-from dataclasses import dataclass
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field, replace
+from typing import Callable
 
 from . import prompts
-from .errors import OpenAIAuthError, OpenAIRateLimitError, MockDryRunRegressionError
+from .budget import (
+    OUTLINE_WORDS,
+    SECTION_WORDS,
+    TAIL_RESERVE_WORDS,
+    SectionStop,
+    drop_last_section,
+    estimate_tokens,
+    missing_tail,
+    output_token_cap,
+)
+from .breaker import CircuitBreaker
+from .errors import (
+    CircuitOpenError,
+    MockDryRunRegressionError,
+    OpenAIAuthError,
+    OpenAIRateLimitError,
+)
+from .fingerprint import generation_fingerprint
+from .hedge import Hedger
+from .limiter import AdaptiveLimiter
+from .metrics import metrics
+from .singleflight import SingleFlight
+from .structured import (
+    ARTICLE_SCHEMA,
+    SCHEMA_NAME,
+    StructuredOutputError,
+    parse_structured,
+)
+from .pool import ProviderPool
+from .usage import Usage
 from .utils import (
     ParsedOutput,
     build_frontmatter,
     ensure_out_dir,
     parse_model_output,
     slugify_topic,
+    normalize_body,
     trim_meta,
     validate_body,
     validate_outline,
@@ -28,9 +61,20 @@ class Article:
     body: str
     slug: str
     path: str
+    usage: Usage = field(default_factory=Usage)
+
 
+class Reply(str):
+    """Reply text that the output-token cap cut off before the model finished."""
 
-def _openai_error_classes():
+    def __new__(cls, text: str):
+        reply = super().__new__(cls, text)
+        reply.truncated = True
+        return reply
+
+
+def openai_error_classes():
+    """The SDK's (authentication, rate-limit) error classes."""
     try:
         from openai import AuthenticationError as OAAuthError
         from openai import RateLimitError as OARateLimitError
@@ -39,7 +83,42 @@ def _openai_error_classes():
     return OAAuthError, OARateLimitError
 
 
-def _openai_client():
+_POOL: ProviderPool | None = None
+_HEDGER: Hedger | None = None
+_BREAKER: CircuitBreaker | None = None
+_LIMITER: AdaptiveLimiter | None = None
+_ARTICLE_FLIGHTS = SingleFlight("generate")
+_SECTION_FLIGHTS = SingleFlight("expand")
+
+
+def configure_pool(pool: ProviderPool | None) -> None:
+    """Route synchronous OpenAI calls through ``pool`` (``None`` to disable)."""
+    global _POOL
+    _POOL = pool
+
+
+def configure_breaker(breaker: CircuitBreaker | None) -> None:
+    """Guard OpenAI calls with a circuit ``breaker`` (``None`` to disable)."""
+    global _BREAKER
+    _BREAKER = breaker
+
+
+def configure_limiter(limiter: AdaptiveLimiter | None) -> None:
+    """Cap concurrent synchronous OpenAI calls with an adaptive ``limiter``."""
+    global _LIMITER
+    _LIMITER = limiter
+
+
+def configure_hedging(hedger: Hedger | None) -> None:
+    """Hedge slow OpenAI calls with ``hedger`` (``None`` to disable)."""
+    global _HEDGER
+    _HEDGER = hedger
+
+
+def openai_client():
+    """The configured provider pool, or a new OpenAI client."""
+    if _POOL is not None:
+        return _POOL
     try:
         from openai import OpenAI
     except Exception as exc:
@@ -47,38 +126,379 @@ def _openai_client():
     return OpenAI()
 
 
-def _call_openai(
+def _async_openai_client():
+    try:
+        from openai import AsyncOpenAI
+    except Exception as exc:
+        raise RuntimeError("OpenAI SDK not available. Install openai.") from exc
+    return AsyncOpenAI()
+
+
+@asynccontextmanager
+async def _async_client(client, provider: str, dry_run: bool):
+    """Yield the client for an async call: ``client``, the pool, or a new
+    AsyncOpenAI that is closed on exit (``None`` for mock and dry runs)."""
+    if client is not None or dry_run or provider == "mock":
+        yield client
+    elif _POOL is not None:
+        yield _POOL
+    else:
+        async with _async_openai_client() as owned:
+            yield owned
+
+
+def call_openai(
+    client,
+    auth_error_cls,
+    rate_error_cls,
+    model: str,
+    system: str,
+    user: str,
+    usage: Usage | None = None,
+    max_tokens: int | None = None,
+    stop: Callable[[], SectionStop] | None = None,
+    schema: dict | None = None,
+    kind: str = "article",
+) -> str:
+    """Make one model call through the breaker, limiter, hedger and pool.
+
+    ``kind`` names the call (article, repair, finish, ...) for hedging,
+    which keeps a latency window per kind.
+    """
+    options = {"max_tokens": max_tokens, "stop": stop, "schema": schema}
+
+    def attempt() -> str:
+        if _HEDGER is not None:
+            return _HEDGER.call(
+                lambda c, m, u: _dispatch_call(
+                    c, auth_error_cls, rate_error_cls, m, system, user, u, **options
+                ),
+                client,
+                model,
+                usage,
+                kind,
+                _LIMITER,
+            )
+        return _dispatch_call(
+            client, auth_error_cls, rate_error_cls, model, system, user, usage, **options
+        )
+
+    def limited() -> str:
+        if _LIMITER is not None:
+            return _LIMITER.call(attempt)
+        return attempt()
+
+    if _BREAKER is not None:
+        return _BREAKER.call(limited)
+    return limited()
+
+
+def _dispatch_call(
+    client,
+    auth_error_cls,
+    rate_error_cls,
+    model: str,
+    system: str,
+    user: str,
+    usage: Usage | None = None,
+    max_tokens: int | None = None,
+    stop: Callable[[], SectionStop] | None = None,
+    schema: dict | None = None,
+) -> str:
+    options = {"max_tokens": max_tokens, "stop": stop, "schema": schema}
+    if isinstance(client, ProviderPool):
+        return client.call(
+            lambda member: _call_client(
+                member, auth_error_cls, rate_error_cls, model, system, user, usage, **options
+            )
+        )
+    return _call_client(
+        client, auth_error_cls, rate_error_cls, model, system, user, usage, **options
+    )
+
+
+def _request_options(max_tokens: int | None, schema: dict | None) -> tuple[dict, dict]:
+    """Extra create() arguments for the Responses and Chat Completions APIs."""
+    responses: dict = {}
+    chat: dict = {}
+    if max_tokens is not None:
+        responses["max_output_tokens"] = max_tokens
+        chat["max_tokens"] = max_tokens
+    if schema is not None:
+        json_schema = {"name": SCHEMA_NAME, "schema": schema, "strict": True}
+        responses["text"] = {"format": {"type": "json_schema", **json_schema}}
+        chat["response_format"] = {"type": "json_schema", "json_schema": json_schema}
+    return responses, chat
+
+
+def _stream_event(event) -> tuple[str | None, object | None]:
+    """The text delta and the final response (with usage) in one stream event.
+
+    Handles both Responses API events and Chat Completions chunks.
+    """
+    kind = getattr(event, "type", None)
+    if kind == "response.output_text.delta":
+        return event.delta, None
+    if kind in ("response.completed", "response.incomplete"):
+        return None, event.response
+    if kind is None:
+        final = event if getattr(event, "usage", None) is not None else None
+        choices = getattr(event, "choices", None) or []
+        delta = (getattr(choices[0].delta, "content", None) or "") if choices else ""
+        return delta, final
+    return None, None
+
+
+def _truncated(response) -> bool:
+    """Whether the output-token cap ended ``response`` (or a Chat stream chunk)."""
+    if getattr(response, "status", None) == "incomplete":
+        details = getattr(response, "incomplete_details", None)
+        return getattr(details, "reason", None) == "max_output_tokens"
+    choices = getattr(response, "choices", None) or []
+    return bool(choices) and getattr(choices[0], "finish_reason", None) == "length"
+
+
+def _reply(text: str | None, truncated: bool) -> str:
+    if not truncated:
+        return text
+    metrics.inc("budget.truncated")
+    return Reply(text or "")
+
+
+def _charge_stream(usage: Usage | None, final, stop: SectionStop) -> None:
+    # A stream that is cut early never reports usage, so its output tokens
+    # are estimated from the text received.
+    if usage is None:
+        return
+    if final is not None:
+        usage.add(Usage.from_response(final))
+    else:
+        usage.add(Usage(calls=1, output_tokens=estimate_tokens(stop.text)))
+
+
+def _read_stream(stream, stop: SectionStop, usage: Usage | None) -> str:
+    """Collect a streamed reply, closing the stream once ``stop`` says so."""
+    final = None
+    truncated = False
+    for event in stream:
+        delta, done = _stream_event(event)
+        if done is not None:
+            final = done
+        truncated = truncated or _truncated(event if done is None else done)
+        if delta is None:
+            continue
+        if stop.feed(delta):
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
+            metrics.inc("budget.early_stops")
+            break
+    _charge_stream(usage, final, stop)
+    return _reply(stop.text, truncated and not stop.stopped)
+
+
+async def _aread_stream(stream, stop: SectionStop, usage: Usage | None) -> str:
+    """Async :func:`_read_stream` for AsyncOpenAI streams."""
+    final = None
+    truncated = False
+    async for event in stream:
+        delta, done = _stream_event(event)
+        if done is not None:
+            final = done
+        truncated = truncated or _truncated(event if done is None else done)
+        if delta is None:
+            continue
+        if stop.feed(delta):
+            close = getattr(stream, "close", None)
+            if close is not None:
+                await close()
+            metrics.inc("budget.early_stops")
+            break
+    _charge_stream(usage, final, stop)
+    return _reply(stop.text, truncated and not stop.stopped)
+
+
+def _call_client(
     client,
     auth_error_cls,
     rate_error_cls,
     model: str,
     system: str,
     user: str,
+    usage: Usage | None = None,
+    max_tokens: int | None = None,
+    stop: Callable[[], SectionStop] | None = None,
+    schema: dict | None = None,
 ) -> str:
     messages = [
         {"role": "system", "content": system},
         {"role": "user", "content": user},
     ]
+    responses_cap, chat_cap = _request_options(max_tokens, schema)
     try:
-        response = client.responses.create(model=model, input=messages)
-        return response.output_text
+        if stop is not None:
+            stream = client.responses.create(
+                model=model, input=messages, stream=True, **responses_cap
+            )
+            return _read_stream(stream, stop(), usage)
+        response = client.responses.create(model=model, input=messages, **responses_cap)
+        text = response.output_text
+        if usage is not None:
+            usage.add(Usage.from_response(response))
+        return _reply(text, _truncated(response))
     except auth_error_cls as exc:
         raise OpenAIAuthError(str(exc)) from exc
     except rate_error_cls as exc:
         raise OpenAIRateLimitError(str(exc)) from exc
     except Exception:
         try:
-            response = client.chat.completions.create(model=model, messages=messages)
-            return response.choices[0].message.content
+            if stop is not None:
+                stream = client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    stream=True,
+                    stream_options={"include_usage": True},
+                    **chat_cap,
+                )
+                return _read_stream(stream, stop(), usage)
+            response = client.chat.completions.create(
+                model=model, messages=messages, **chat_cap
+            )
+            text = response.choices[0].message.content
+            if usage is not None:
+                usage.add(Usage.from_response(response))
+            return _reply(text, _truncated(response))
         except auth_error_cls as exc:
             raise OpenAIAuthError(str(exc)) from exc
         except rate_error_cls as exc:
             raise OpenAIRateLimitError(str(exc)) from exc
 
 
-def _topic_words(topic: str) -> list[str]:
-    words = re.findall(r"[a-zA-Z0-9]+", topic.lower())
-    stopwords = {
+async def _acall_openai(
+    client,
+    auth_error_cls,
+    rate_error_cls,
+    model: str,
+    system: str,
+    user: str,
+    usage: Usage | None = None,
+    max_tokens: int | None = None,
+    stop: Callable[[], SectionStop] | None = None,
+    schema: dict | None = None,
+    kind: str = "article",
+) -> str:
+    options = {"max_tokens": max_tokens, "stop": stop, "schema": schema}
+
+    async def attempt() -> str:
+        if _HEDGER is not None:
+            return await _HEDGER.acall(
+                lambda c, m, u: _adispatch_call(
+                    c, auth_error_cls, rate_error_cls, m, system, user, u, **options
+                ),
+                client,
+                model,
+                usage,
+                kind,
+                _LIMITER,
+            )
+        return await _adispatch_call(
+            client, auth_error_cls, rate_error_cls, model, system, user, usage, **options
+        )
+
+    async def limited() -> str:
+        if _LIMITER is not None:
+            return await _LIMITER.acall(attempt)
+        return await attempt()
+
+    if _BREAKER is not None:
+        return await _BREAKER.acall(limited)
+    return await limited()
+
+
+async def _adispatch_call(
+    client,
+    auth_error_cls,
+    rate_error_cls,
+    model: str,
+    system: str,
+    user: str,
+    usage: Usage | None = None,
+    max_tokens: int | None = None,
+    stop: Callable[[], SectionStop] | None = None,
+    schema: dict | None = None,
+) -> str:
+    options = {"max_tokens": max_tokens, "stop": stop, "schema": schema}
+    if isinstance(client, ProviderPool):
+        return await client.acall(
+            lambda member: _acall_client(
+                member, auth_error_cls, rate_error_cls, model, system, user, usage, **options
+            )
+        )
+    return await _acall_client(
+        client, auth_error_cls, rate_error_cls, model, system, user, usage, **options
+    )
+
+
+async def _acall_client(
+    client,
+    auth_error_cls,
+    rate_error_cls,
+    model: str,
+    system: str,
+    user: str,
+    usage: Usage | None = None,
+    max_tokens: int | None = None,
+    stop: Callable[[], SectionStop] | None = None,
+    schema: dict | None = None,
+) -> str:
+    messages = [
+        {"role": "system", "content": system},
+        {"role": "user", "content": user},
+    ]
+    responses_cap, chat_cap = _request_options(max_tokens, schema)
+    try:
+        if stop is not None:
+            stream = await client.responses.create(
+                model=model, input=messages, stream=True, **responses_cap
+            )
+            return await _aread_stream(stream, stop(), usage)
+        response = await client.responses.create(
+            model=model, input=messages, **responses_cap
+        )
+        text = response.output_text
+        if usage is not None:
+            usage.add(Usage.from_response(response))
+        return _reply(text, _truncated(response))
+    except auth_error_cls as exc:
+        raise OpenAIAuthError(str(exc)) from exc
+    except rate_error_cls as exc:
+        raise OpenAIRateLimitError(str(exc)) from exc
+    except Exception:
+        try:
+            if stop is not None:
+                stream = await client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    stream=True,
+                    stream_options={"include_usage": True},
+                    **chat_cap,
+                )
+                return await _aread_stream(stream, stop(), usage)
+            response = await client.chat.completions.create(
+                model=model, messages=messages, **chat_cap
+            )
+            text = response.choices[0].message.content
+            if usage is not None:
+                usage.add(Usage.from_response(response))
+            return _reply(text, _truncated(response))
+        except auth_error_cls as exc:
+            raise OpenAIAuthError(str(exc)) from exc
+        except rate_error_cls as exc:
+            raise OpenAIRateLimitError(str(exc)) from exc
+
+
+_STOPWORDS = frozenset(
+    {
         "the",
         "a",
         "an",
@@ -101,234 +521,244 @@ def _topic_words(topic: str) -> list[str]:
         "buy",
         "buying",
     }
-    filtered = [w for w in words if w not in stopwords]
-    if not filtered:
-        return ["quality", "budget", "features"]
-    seen: set[str] = set()
-    unique = []
-    for w in filtered:
-        if w not in seen:
-            seen.add(w)
-            unique.append(w)
-    return unique
+)
+_DEFAULT_TOPIC_WORDS = ("quality", "budget", "features")
+_WORD_RE = re.compile(r"[a-zA-Z0-9]+")
+
+
+def _topic_words(topic: str) -> list[str]:
+    words = _WORD_RE.findall(topic.lower())
+    # dict.fromkeys keeps first-seen order while dropping duplicates.
+    unique = list(dict.fromkeys(w for w in words if w not in _STOPWORDS))
+    return unique or list(_DEFAULT_TOPIC_WORDS)
 
 
 def _title_case(text: str) -> str:
     return " ".join(part.capitalize() for part in text.split())
 
 
-def _build_dry_run_output(
+# The mock generators below must stay byte-identical for a given seed: keep
+# the order of the random draws (and the template lists) unchanged.
+def _seeded_random(seed_base: str) -> tuple[int, random.Random]:
+    seed = int(hashlib.sha256(seed_base.encode("utf-8")).hexdigest()[:16], 16)
+    return seed, random.Random(seed)
+
+
+_ARTICLE_HEADINGS = (
+    "Key {word} features for {topic}",
+    "How {word} affects day-to-day use",
+    "Comparing {word} options in {country}",
+    "Balancing {word} with budget",
+    "Common mistakes with {word} and how to avoid them",
+    "Choosing {word} for long-term value",
+)
+_ARTICLE_TIPS = (
+    "If two options look similar, choose the one with better comfort and service support in India.",
+    "Compare real reviews for call quality and durability before you decide.",
+    "Prioritize everyday usability over flashy marketing specs.",
+    "Keep your top two picks and check warranty terms in India.",
+)
+_ARTICLE_QUICK = (
+    "Set a clear budget before comparing {topic} in {india}.",
+    "Focus on comfort and {word} performance for {audience}.",
+    "Prioritize reliable calls and day-to-day usability.",
+    "Choose brands with proven service support in {india}.",
+    "Shortlist 2-3 options and compare real-world reviews.",
+)
+_ARTICLE_MAIN = (
+    "Define a budget cap before comparing {topic} in {india}.",
+    "Prioritize {word} comfort and fit for {audience}.",
+    "Check battery life claims against real-world use.",
+    "Compare mic clarity and call quality for daily use.",
+    "Look for dependable warranty and service coverage in {india}.",
+    "Avoid overpaying for features you won't use.",
+    "Shortlist 2-3 options and compare value per feature.",
+)
+_ARTICLE_CHECKLIST = (
+    "Budget fits your range and value expectations",
+    "Comfortable fit for {audience} daily use",
+    "Balanced performance for {topic}",
+    "Warranty and service coverage in {india}",
+    "Return or replacement policy you trust",
+)
+_ARTICLE_FAQS = (
+    "What should I prioritize when choosing {topic} in {country}?",
+    "How do I compare {topic} options fairly?",
+    "Is it okay to choose the cheapest {topic} available?",
+    "What features matter most for {audience}?",
+    "How long should I expect {topic} to last?",
+    "Are warranties important for {topic} in {country}?",
+)
+
+
+def _iter_dry_run_body(
     topic: str,
-    words: int,
     tone: str,
     audience: str,
     country: str,
     banner: str,
     mode_label: str,
-) -> ParsedOutput:
-    seed_base = f"{topic}|{country}|{tone}|{audience}"
-    seed = int(hashlib.sha256(seed_base.encode("utf-8")).hexdigest()[:16], 16)
-    rnd = random.Random(seed)
-
-    topic_title = _title_case(topic)
-    title = f"{topic_title} in {country}: A {audience.title()} Guide"
-
-    meta = (
-        f"Learn how to choose {topic} in {country} with a quick checklist, "
-        f"key features, and FAQs for {audience}."
-    )
-
+    title: str,
+    seed: int,
+    rnd: random.Random,
+):
+    """Yield the mock article body as a handful of section-sized pieces."""
+    india_label = "India"
     words_list = _topic_words(topic)
-    num_sections = 5 + (seed % 2)
-    templates = [
-        "Key {word} features for {topic}",
-        "How {word} affects day-to-day use",
-        "Comparing {word} options in {country}",
-        "Balancing {word} with budget",
-        "Common mistakes with {word} and how to avoid them",
-        "Choosing {word} for long-term value",
+    word_count = len(words_list)
+    values = {"topic": topic, "audience": audience, "country": country, "india": india_label}
+
+    heading_templates = list(_ARTICLE_HEADINGS)
+    rnd.shuffle(heading_templates)
+    headings = [
+        heading_templates[i]
+        .format(topic=topic, country=country, word=words_list[i % word_count])
+        .replace("  ", " ")
+        for i in range(5 + (seed % 2))
     ]
-    rnd.shuffle(templates)
-
-    headings = []
-    for i in range(num_sections):
-        word = words_list[i % len(words_list)]
-        template = templates[i % len(templates)]
-        headings.append(
-            template.format(word=word, topic=topic, country=country).replace(
-                "  ", " "
-            )
+    faq_templates = list(_ARTICLE_FAQS)
+    rnd.shuffle(faq_templates)
+
+    if country.strip().lower() != "india":
+        region = f"{india_label} and {country}"
+    else:
+        region = india_label
+    intro_prefix = f"For {audience} in {region}, {topic} choices around "
+    intro_suffix = " should stay practical and value-focused."
+
+    def section(heading: str, templates: tuple[str, ...]) -> str:
+        options = list(templates)
+        rnd.shuffle(options)
+        count = 3 + rnd.randint(0, 2)
+        bullets = "\n- ".join(
+            options[i].format(word=words_list[i % word_count], **values) for i in range(count)
+        )
+        tip = rnd.choice(_ARTICLE_TIPS)
+        return (
+            f"## {heading}\n\n{intro_prefix}{heading.lower()}{intro_suffix}\n\n"
+            f"- {bullets}\n\nTip: {tip}\n\n"
         )
 
-    intro_variants = [
+    intro_variants = (
         banner,
-        (
-            f"This article demonstrates the required structure for a post "
-            f"about {topic} in {country}."
-        ),
-        (
-            f"It is written for {audience} in a {tone} tone and uses deterministic "
-            f"placeholders for stable tests."
-        ),
-        (
-            "Use it as a scaffold before generating a real article with live data."
-        ),
-    ]
-    intro_paragraphs = intro_variants[: 2 + (seed % 2)]
+        f"This article demonstrates the required structure for a post about {topic} in {country}.",
+        f"It is written for {audience} in a {tone} tone and uses deterministic placeholders for stable tests.",
+        "Use it as a scaffold before generating a real article with live data.",
+    )
+    yield f"# {title}\n\n"
+    for paragraph in intro_variants[: 2 + (seed % 2)]:
+        yield f"{paragraph}\n\n"
 
-    india_label = "India"
+    yield section("Quick answer", _ARTICLE_QUICK)
+    for heading in headings:
+        yield section(heading, _ARTICLE_MAIN)
+    yield section("Decision checklist", _ARTICLE_CHECKLIST)
 
-    def intro_sentence(section_label: str) -> str:
-        if country.strip().lower() != "india":
-            region = f"{india_label} and {country}"
-        else:
-            region = india_label
-        return (
-            f"For {audience} in {region}, {topic} choices around "
-            f"{section_label.lower()} should stay practical and value-focused."
-        )
+    yield section("FAQs", _ARTICLE_MAIN)
+    answer = (
+        f"For {topic} in {country}, focus on the basics first: comfort, "
+        f"reliability, and value for your budget."
+    )
+    for template in faq_templates[:5]:
+        yield f"Q: {template.format(**values)}\nA: {answer}\n\n"
+
+    yield section("Conclusion", _ARTICLE_MAIN)
+    yield (
+        f"This {mode_label.lower()} output shows the full structure for {topic} in {country}.\n"
+        f"If you want a tailored recommendation for {topic}, "
+        f"share your budget and priorities and we can refine the shortlist."
+    )
 
-    def pick_bullets(templates: list[str]) -> list[str]:
-        options = templates[:]
-        rnd.shuffle(options)
-        count = 3 + rnd.randint(0, 2)
-        bullets = []
-        for i in range(count):
-            word = words_list[i % len(words_list)]
-            bullets.append(
-                options[i % len(options)].format(
-                    topic=topic,
-                    audience=audience,
-                    country=country,
-                    india=india_label,
-                    word=word,
-                )
-            )
-        return bullets
 
-    tip_templates = [
-        "If two options look similar, choose the one with better comfort and service support in India.",
-        "Compare real reviews for call quality and durability before you decide.",
-        "Prioritize everyday usability over flashy marketing specs.",
-        "Keep your top two picks and check warranty terms in India.",
-    ]
+def _build_dry_run_output(
+    topic: str,
+    words: int,
+    tone: str,
+    audience: str,
+    country: str,
+    banner: str,
+    mode_label: str,
+) -> ParsedOutput:
+    seed, rnd = _seeded_random(f"{topic}|{country}|{tone}|{audience}")
 
-    quick_templates = [
-        "Set a clear budget before comparing {topic} in {india}.",
-        "Focus on comfort and {word} performance for {audience}.",
-        "Prioritize reliable calls and day-to-day usability.",
-        "Choose brands with proven service support in {india}.",
-        "Shortlist 2-3 options and compare real-world reviews.",
-    ]
+    title = f"{_title_case(topic)} in {country}: A {audience.title()} Guide"
+    meta = (
+        f"Learn how to choose {topic} in {country} with a quick checklist, "
+        f"key features, and FAQs for {audience}."
+    )
+    body = "".join(
+        _iter_dry_run_body(topic, tone, audience, country, banner, mode_label, title, seed, rnd)
+    ).strip()
+    return ParsedOutput(title=title, meta_description=meta, body=body)
 
-    main_templates = [
-        "Define a budget cap before comparing {topic} in {india}.",
-        "Prioritize {word} comfort and fit for {audience}.",
-        "Check battery life claims against real-world use.",
-        "Compare mic clarity and call quality for daily use.",
-        "Look for dependable warranty and service coverage in {india}.",
-        "Avoid overpaying for features you won't use.",
-        "Shortlist 2-3 options and compare value per feature.",
-    ]
 
-    checklist_templates = [
-        "Budget fits your range and value expectations",
-        "Comfortable fit for {audience} daily use",
-        "Balanced performance for {topic}",
-        "Warranty and service coverage in {india}",
-        "Return or replacement policy you trust",
-    ]
+_OUTLINE_HEADINGS = (
+    "Overview: {topic}",
+    "{word} priorities for {audience} in {country}",
+    "Budget and value factors in {country}",
+    "Comfort and daily use considerations",
+    "Performance and reliability checks",
+    "How to compare shortlists",
+    "Mistakes to avoid when buying",
+    "Decision checklist for {topic}",
+    "Where to buy and support in {country}",
+    "Future-proofing and long-term value",
+)
+_OUTLINE_BULLETS = (
+    "Define your budget and must-have features for {topic}.",
+    "Shortlist 2-3 options with solid reviews in {country}.",
+    "Compare real-world performance, not just specs.",
+    "Prioritize comfort and daily usability for {audience}.",
+    "Check warranty and service coverage in {country}.",
+    "Avoid features you won't use to keep value high.",
+)
+_OUTLINE_FAQS = (
+    "What should I look for when choosing {topic} in {country}?",
+    "How do I compare {topic} options quickly?",
+    "Which {topic} features matter most for {audience}?",
+    "Is the cheapest {topic} a good idea?",
+    "How long should {topic} typically last?",
+    "Where can I get support for {topic} in {country}?",
+    "What mistakes should I avoid when buying {topic}?",
+    "How do I balance price and quality for {topic}?",
+)
 
-    faq_templates = [
-        "What should I prioritize when choosing {topic} in {country}?",
-        "How do I compare {topic} options fairly?",
-        "Is it okay to choose the cheapest {topic} available?",
-        "What features matter most for {audience}?",
-        "How long should I expect {topic} to last?",
-        "Are warranties important for {topic} in {country}?",
-    ]
-    rnd.shuffle(faq_templates)
-    faqs = []
-    for i in range(5):
-        q = faq_templates[i].format(topic=topic, country=country, audience=audience)
-        a = (
-            f"For {topic} in {country}, focus on the basics first: comfort, "
-            f"reliability, and value for your budget."
+
+def _iter_dry_run_outline_body(
+    topic: str,
+    audience: str,
+    country: str,
+    mode_label: str,
+    title: str,
+    seed: int,
+    rnd: random.Random,
+):
+    """Yield the mock outline body one H2 section at a time."""
+    words_list = _topic_words(topic)
+    word_count = len(words_list)
+    values = {"topic": topic, "audience": audience, "country": country}
+    bullets = [template.format(**values) for template in _OUTLINE_BULLETS]
+
+    heading_templates = list(_OUTLINE_HEADINGS)
+    rnd.shuffle(heading_templates)
+    headings = [
+        heading_templates[i % len(heading_templates)].format(
+            word=words_list[i % word_count], **values
         )
-        faqs.append((q, a))
-
-    body_lines = [f"# {title}", ""]
-    for p in intro_paragraphs:
-        body_lines.append(p)
-        body_lines.append("")
-
-    body_lines.extend(["## Quick answer", ""])
-    body_lines.append(intro_sentence("Quick answer"))
-    body_lines.append("")
-    for bullet in pick_bullets(quick_templates):
-        body_lines.append(f"- {bullet}")
-    body_lines.append("")
-    body_lines.append(f"Tip: {rnd.choice(tip_templates)}")
-    body_lines.append("")
+        for i in range(8 + (seed % 2))
+    ]
+    faqs = [template.format(**values) for template in _OUTLINE_FAQS]
+    rnd.shuffle(faqs)
 
+    yield f"# {title}\n\n{mode_label} OUTPUT: Deterministic outline for {topic} in {country}.\n\n"
     for heading in headings:
-        body_lines.append(f"## {heading}")
-        body_lines.append("")
-        body_lines.append(intro_sentence(heading))
-        body_lines.append("")
-        for bullet in pick_bullets(main_templates):
-            body_lines.append(f"- {bullet}")
-        body_lines.append("")
-        body_lines.append(f"Tip: {rnd.choice(tip_templates)}")
-        body_lines.append("")
-
-    body_lines.extend(["## Decision checklist", ""])
-    body_lines.append(intro_sentence("Decision checklist"))
-    body_lines.append("")
-    for item in pick_bullets(checklist_templates):
-        body_lines.append(f"- {item}")
-    body_lines.append("")
-    body_lines.append(f"Tip: {rnd.choice(tip_templates)}")
-    body_lines.append("")
-
-    body_lines.extend(["## FAQs", ""])
-    body_lines.append(intro_sentence("FAQs"))
-    body_lines.append("")
-    for bullet in pick_bullets(main_templates):
-        body_lines.append(f"- {bullet}")
-    body_lines.append("")
-    body_lines.append(f"Tip: {rnd.choice(tip_templates)}")
-    body_lines.append("")
-    for q, a in faqs:
-        body_lines.append(f"Q: {q}")
-        body_lines.append(f"A: {a}")
-        body_lines.append("")
-
-    body_lines.extend(
-        [
-            "## Conclusion",
-            "",
-            intro_sentence("Conclusion"),
-            "",
-        ]
-    )
-    for bullet in pick_bullets(main_templates):
-        body_lines.append(f"- {bullet}")
-    body_lines.extend(
-        [
-            "",
-            f"Tip: {rnd.choice(tip_templates)}",
-            "",
-            f"This {mode_label.lower()} output shows the full structure for {topic} in {country}.",
-            (
-                f"If you want a tailored recommendation for {topic}, "
-                f"share your budget and priorities and we can refine the shortlist."
-            ),
-        ]
-    )
-
-    body = "\n".join(body_lines).strip()
-    return ParsedOutput(title=title, meta_description=meta, body=body)
+        options = list(bullets)
+        rnd.shuffle(options)
+        count = 3 + rnd.randint(0, 3)
+        listing = "\n- ".join(options[:count])
+        yield f"## {heading}\n- {listing}\n\n"
+    questions = "\n- ".join(faqs[: 5 + (seed % 4)])
+    yield f"## FAQs\n- {questions}"
 
 
 def _build_dry_run_outline(
@@ -338,86 +768,33 @@ def _build_dry_run_outline(
     country: str,
     mode_label: str,
 ) -> ParsedOutput:
-    seed_base = f"{topic}|{country}|{tone}|{audience}|outline"
-    seed = int(hashlib.sha256(seed_base.encode("utf-8")).hexdigest()[:16], 16)
-    rnd = random.Random(seed)
+    seed, rnd = _seeded_random(f"{topic}|{country}|{tone}|{audience}|outline")
 
-    topic_title = _title_case(topic)
-    title = f"{topic_title} in {country}: Outline"
+    title = f"{_title_case(topic)} in {country}: Outline"
     meta = f"Outline for {topic} in {country}, covering key sections and FAQs."
+    body = "".join(
+        _iter_dry_run_outline_body(topic, audience, country, mode_label, title, seed, rnd)
+    ).strip()
+    return ParsedOutput(title=title, meta_description=meta, body=body)
 
-    words_list = _topic_words(topic)
-    templates = [
-        "Overview: {topic}",
-        "{word} priorities for {audience} in {country}",
-        "Budget and value factors in {country}",
-        "Comfort and daily use considerations",
-        "Performance and reliability checks",
-        "How to compare shortlists",
-        "Mistakes to avoid when buying",
-        "Decision checklist for {topic}",
-        "Where to buy and support in {country}",
-        "Future-proofing and long-term value",
-    ]
-    rnd.shuffle(templates)
-    headings = []
-    total_sections = 8 + (seed % 2)
-    for i in range(total_sections):
-        word = words_list[i % len(words_list)]
-        headings.append(
-            templates[i % len(templates)].format(
-                topic=topic, word=word, audience=audience, country=country
-            )
-        )
-
-    bullet_templates = [
-        "Define your budget and must-have features for {topic}.",
-        "Shortlist 2-3 options with solid reviews in {country}.",
-        "Compare real-world performance, not just specs.",
-        "Prioritize comfort and daily usability for {audience}.",
-        "Check warranty and service coverage in {country}.",
-        "Avoid features you won't use to keep value high.",
-    ]
 
-    def bullets() -> list[str]:
-        options = bullet_templates[:]
-        rnd.shuffle(options)
-        count = 3 + rnd.randint(0, 3)
-        return [
-            options[i].format(topic=topic, audience=audience, country=country)
-            for i in range(count)
-        ]
-
-    faq_questions = [
-        f"What should I look for when choosing {topic} in {country}?",
-        f"How do I compare {topic} options quickly?",
-        f"Which {topic} features matter most for {audience}?",
-        f"Is the cheapest {topic} a good idea?",
-        f"How long should {topic} typically last?",
-        f"Where can I get support for {topic} in {country}?",
-        f"What mistakes should I avoid when buying {topic}?",
-        f"How do I balance price and quality for {topic}?",
-    ]
-    rnd.shuffle(faq_questions)
-    faq_questions = faq_questions[: 5 + (seed % 4)]
-
-    body_lines = [
-        f"# {title}",
-        "",
-        f"{mode_label} OUTPUT: Deterministic outline for {topic} in {country}.",
-        "",
-    ]
-    for heading in headings:
-        body_lines.append(f"## {heading}")
-        for bullet in bullets():
-            body_lines.append(f"- {bullet}")
-        body_lines.append("")
-    body_lines.append("## FAQs")
-    for q in faq_questions:
-        body_lines.append(f"- {q}")
-
-    body = "\n".join(body_lines).strip()
-    return ParsedOutput(title=title, meta_description=meta, body=body)
+_EXPAND_INTROS = (
+    "For {audience} in {country}, {topic} decisions around {heading} should be practical and easy to compare.",
+    "This section expands {heading} with clear, real-world criteria for {audience} in {country}.",
+    "{heading} matters because it affects everyday value and usability for {audience} in {country}.",
+)
+_EXPAND_DETAILS = (
+    "Keep your short list small and compare like-for-like features before deciding.",
+    "Focus on comfort, reliability, and after-sales support rather than just specs.",
+    "Use reviews that mention long-term use to validate the basics.",
+)
+_EXPAND_BULLETS = (
+    "Set a clear budget and prioritize must-have features.",
+    "Compare 2-3 options with consistent reviews.",
+    "Check warranty terms and service coverage in {country}.",
+    "Look for balanced performance that fits daily use.",
+    "Avoid paying extra for features you won't use.",
+)
 
 
 def _expand_mock_section(
@@ -428,98 +805,237 @@ def _expand_mock_section(
     audience: str,
     country: str,
 ) -> str:
-    seed_base = "|".join(
-        [
-            section_heading,
-            topic or "",
-            tone,
-            audience,
-            country,
-            "\n".join(section_body_lines),
-        ]
+    _, rnd = _seeded_random(
+        "|".join(
+            [
+                section_heading,
+                topic or "",
+                tone,
+                audience,
+                country,
+                "\n".join(section_body_lines),
+            ]
+        )
     )
-    seed = int(hashlib.sha256(seed_base.encode("utf-8")).hexdigest()[:16], 16)
-    rnd = random.Random(seed)
 
     heading = section_heading.strip()
     topic_label = topic or heading
 
-    intro_templates = [
-        "For {audience} in {country}, {topic} decisions around {heading} should be practical and easy to compare.",
-        "This section expands {heading} with clear, real-world criteria for {audience} in {country}.",
-        "{heading} matters because it affects everyday value and usability for {audience} in {country}.",
-    ]
-    detail_templates = [
-        "Keep your short list small and compare like-for-like features before deciding.",
-        "Focus on comfort, reliability, and after-sales support rather than just specs.",
-        "Use reviews that mention long-term use to validate the basics.",
-    ]
-    bullet_templates = [
-        "Set a clear budget and prioritize must-have features.",
-        "Compare 2-3 options with consistent reviews.",
-        "Check warranty terms and service coverage in {country}.",
-        "Look for balanced performance that fits daily use.",
-        "Avoid paying extra for features you won't use.",
-    ]
-
     source_bullets = [
-        line.strip()[2:].strip()
-        for line in section_body_lines
-        if line.strip().startswith("- ")
+        stripped[2:].strip()
+        for stripped in map(str.strip, section_body_lines)
+        if stripped.startswith("- ")
     ]
-
-    bullets = []
     if source_bullets:
-        options = source_bullets[:]
-        rnd.shuffle(options)
-        count = min(len(options), 5)
-        for item in options[:count]:
-            bullets.append(item)
+        rnd.shuffle(source_bullets)
+        bullets = source_bullets[:5]
     else:
-        options = bullet_templates[:]
-        rnd.shuffle(options)
-        count = 3 + rnd.randint(0, 2)
-        for i in range(count):
-            bullets.append(
-                options[i].format(
-                    topic=topic_label, heading=heading, audience=audience, country=country
-                )
-            )
+        bullets = [template.format(country=country) for template in _EXPAND_BULLETS]
+        rnd.shuffle(bullets)
+        bullets = bullets[: 3 + rnd.randint(0, 2)]
 
-    lines = [
-        f"## {heading}",
-        "",
-        rnd.choice(intro_templates).format(
-            audience=audience, country=country, topic=topic_label, heading=heading
-        ),
-        "",
-        rnd.choice(detail_templates),
-        "",
-    ]
-    for bullet in bullets:
-        lines.append(f"- {bullet}")
-    lines.extend(
-        [
-            "",
-            "Choose the option that best fits your daily use and budget.",
-        ]
+    intro = rnd.choice(_EXPAND_INTROS).format(
+        audience=audience, country=country, topic=topic_label, heading=heading
     )
-    return "\n".join(lines).strip()
+    detail = rnd.choice(_EXPAND_DETAILS)
+    listing = "\n- ".join(bullets)
+    return (
+        f"## {heading}\n\n{intro}\n\n{detail}\n\n- {listing}\n\n"
+        "Choose the option that best fits your daily use and budget."
+    ).strip()
 
 
-def _repair_body(
-    client,
-    auth_error_cls,
-    rate_error_cls,
-    model: str,
+def check_provider(provider: str) -> None:
+    """Raise ``ValueError`` for a provider other than openai or mock."""
+    if provider not in {"openai", "mock"}:
+        raise ValueError(f"Unknown provider: {provider}")
+
+
+def _mock_article(
+    topic: str, words: int, tone: str, audience: str, country: str, dry_run: bool
+) -> ParsedOutput:
+    mode_label = "DRY RUN" if dry_run else "MOCK"
+    banner = (
+        f"{mode_label} OUTPUT: Deterministic placeholder content for "
+        f"\"{topic}\" in {country}."
+    )
+    return _build_dry_run_output(topic, words, tone, audience, country, banner, mode_label)
+
+
+def article_issues(body: str, provider: str, dry_run: bool) -> list[str]:
+    """Validate a body; mock output must pass as-is, model output may be repaired."""
+    issues = validate_body(body)
+    if provider != "openai" or dry_run:
+        if issues:
+            raise MockDryRunRegressionError("Mock/Dry-run generator regression")
+        return issues
+    metrics.inc("repair.checked")
+    return issues
+
+
+def local_repair(body: str, title: str | None = None) -> tuple[str, list[str]]:
+    """Fix mechanical format slips in ``body`` without a model call.
+
+    Returns the normalized body and the issues left, which still need the
+    model repair call. ``repair.local_fixes`` and ``repair.model_calls``
+    count the two outcomes; over ``repair.checked`` they give the repair
+    rate.
+    """
+    fixed = normalize_body(body, title)
+    issues = validate_body(fixed)
+    metrics.inc("repair.model_calls" if issues else "repair.local_fixes")
+    return fixed, issues
+
+
+def checked_repair(repaired: str) -> str:
+    """Normalize a repair reply; raise ``ValueError`` if it still fails validation."""
+    body = normalize_body(repaired.strip())
+    issues = validate_body(body)
+    if issues:
+        raise ValueError(f"Validation failed after repair: {issues}")
+    return body
+
+
+def _save_article(
+    parsed: ParsedOutput,
+    body: str,
     topic: str,
     words: int,
     tone: str,
     audience: str,
     country: str,
-    issues: list[str],
-    body: str,
+    out_dir: str,
+    model: str,
+    provider: str,
+    dry_run: bool,
+    usage: Usage,
+    structured: bool = False,
+    record_usage: bool = False,
+) -> Article:
+    meta = trim_meta(parsed.meta_description, 155)
+    slug = slugify_topic(topic)
+    usage_fields = {}
+    if record_usage:
+        usage_fields = dict(
+            input_tokens=usage.input_tokens,
+            output_tokens=usage.output_tokens,
+            cached_tokens=usage.cached_tokens,
+            cost_usd=usage.cost(model),
+        )
+    frontmatter = build_frontmatter(
+        title=parsed.title,
+        slug=slug,
+        meta_description=meta,
+        topic=topic,
+        word_count_target=words,
+        provider=provider,
+        dry_run=True if dry_run else None,
+        tone=tone,
+        audience=audience,
+        country=country,
+        model=model if provider == "openai" and not dry_run else None,
+        fingerprint=generation_fingerprint(
+            "article",
+            topic,
+            words,
+            tone,
+            audience,
+            country,
+            model,
+            provider,
+            dry_run,
+            structured=structured,
+        ),
+        **usage_fields,
+    )
+
+    out_path = ensure_out_dir(out_dir) / f"{slug}.md"
+    write_markdown(out_path, frontmatter, body)
+
+    return Article(
+        title=parsed.title,
+        meta_description=meta,
+        body=body,
+        slug=slug,
+        path=str(out_path),
+        usage=usage,
+    )
+
+
+def _check_outline(body: str, provider: str, dry_run: bool) -> None:
+    if provider != "openai" or dry_run:
+        issues = validate_outline(body)
+        if issues:
+            raise MockDryRunRegressionError("Mock/Dry-run generator regression")
+
+
+def _save_outline(
+    parsed: ParsedOutput,
+    topic: str,
+    tone: str,
+    audience: str,
+    country: str,
+    out_dir: str,
+    model: str,
+    provider: str,
+    dry_run: bool,
+    usage: Usage,
+) -> Article:
+    meta = trim_meta(parsed.meta_description, 155)
+    slug = slugify_topic(topic) + "-outline"
+    frontmatter = build_frontmatter(
+        title=parsed.title,
+        slug=slug,
+        meta_description=meta,
+        topic=topic,
+        word_count_target=0,
+        kind="outline",
+        provider=provider,
+        dry_run=dry_run,
+        tone=tone,
+        audience=audience,
+        country=country,
+        model=model if provider == "openai" and not dry_run else None,
+        fingerprint=generation_fingerprint(
+            "outline", topic, 0, tone, audience, country, model, provider, dry_run
+        ),
+    )
+
+    out_path = ensure_out_dir(out_dir) / f"{slug}.md"
+    write_markdown(out_path, frontmatter, parsed.body)
+
+    return Article(
+        title=parsed.title,
+        meta_description=meta,
+        body=parsed.body,
+        slug=slug,
+        path=str(out_path),
+        usage=usage,
+    )
+
+
+def _finish_section(raw: str, section_heading: str) -> str:
+    text = raw.strip()
+    if not text.startswith("## "):
+        text = f"## {section_heading}\n\n{text}"
+    return text
+
+
+def repair_body(
+    client,
+    auth_error_cls,
+    rate_error_cls,
+    model: str,
+    topic: str,
+    words: int,
+    tone: str,
+    audience: str,
+    country: str,
+    issues: list[str],
+    body: str,
+    usage: Usage | None = None,
 ) -> str:
+    """Ask the model to fix ``issues`` in ``body``; returns the raw reply."""
     user = prompts.repair_user_prompt(
         topic=topic,
         words=words,
@@ -529,11 +1045,66 @@ def _repair_body(
         issues=issues,
         body=body,
     )
-    return _call_openai(
-        client, auth_error_cls, rate_error_cls, model, prompts.SYSTEM_MESSAGE, user
+    return call_openai(
+        client,
+        auth_error_cls,
+        rate_error_cls,
+        model,
+        prompts.SYSTEM_MESSAGE,
+        user,
+        usage,
+        max_tokens=output_token_cap(words),
+        kind="repair",
     )
 
 
+def _finish_body(
+    client,
+    auth_error_cls,
+    rate_error_cls,
+    model: str,
+    topic: str,
+    tone: str,
+    audience: str,
+    country: str,
+    body: str,
+    usage: Usage | None = None,
+    truncated: bool = False,
+) -> str:
+    """Append the closing sections a reply stopped short of.
+
+    Happens when a streamed reply was cut at its word budget, or when the
+    output-token cap ended it early. A ``truncated`` reply stopped mid-section,
+    so its last section is dropped first, even if it is the Conclusion.
+    """
+    if truncated:
+        body = drop_last_section(body)
+    # Closing sections written at the wrong level still count as present.
+    missing = missing_tail(normalize_body(body))
+    if not missing:
+        return body
+    user = prompts.finish_user_prompt(
+        topic=topic,
+        tone=tone,
+        audience=audience,
+        country=country,
+        sections=missing,
+        body=body,
+    )
+    tail = call_openai(
+        client,
+        auth_error_cls,
+        rate_error_cls,
+        model,
+        prompts.SYSTEM_MESSAGE,
+        user,
+        usage,
+        max_tokens=output_token_cap(TAIL_RESERVE_WORDS),
+        kind="finish",
+    )
+    return f"{body.rstrip()}\n\n{tail.strip()}"
+
+
 def generate_article(
     topic: str,
     words: int,
@@ -545,81 +1116,310 @@ def generate_article(
     provider: str = "openai",
     dry_run: bool = False,
     client: object | None = None,
+    stream: bool = False,
+    structured: bool = False,
+    record_usage: bool = False,
 ) -> Article:
-    if provider not in {"openai", "mock"}:
-        raise ValueError(f"Unknown provider: {provider}")
+    """Generate, validate and save one article.
+
+    Every model call is capped at an output-token budget derived from
+    ``words``. With ``stream=True`` the reply is streamed and cut at the
+    first section boundary past the budget; the closing sections are then
+    written by a short follow-up call. With ``structured=True`` the model
+    returns JSON for ARTICLE_SCHEMA and the Markdown is assembled locally
+    (``stream`` is ignored); the text prompt is the fallback. With
+    ``record_usage=True`` the article's tokens and estimated cost are
+    written to its frontmatter.
+    """
+    # Identical concurrent requests share one generation. Waiters get the
+    # same article with empty usage, since they caused no provider calls.
+    # Only callers passing the same client (or none) are merged, so nobody
+    # gets an article made with another caller's credentials.
+    key = (
+        id(client),
+        topic,
+        words,
+        tone,
+        audience,
+        country,
+        out_dir,
+        model,
+        provider,
+        dry_run,
+        stream,
+        structured,
+        record_usage,
+    )
+    article, shared = _ARTICLE_FLIGHTS.do(
+        key,
+        lambda: _generate_article(
+            topic,
+            words,
+            tone,
+            audience,
+            country,
+            out_dir,
+            model,
+            provider,
+            dry_run,
+            client,
+            stream,
+            structured,
+            record_usage,
+        ),
+    )
+    return replace(article, usage=Usage()) if shared else article
 
-    if dry_run or provider == "mock":
-        mode_label = "DRY RUN" if dry_run else "MOCK"
-        banner = (
-            f"{mode_label} OUTPUT: Deterministic placeholder content for "
-            f"\"{topic}\" in {country}."
-        )
-        parsed = _build_dry_run_output(
-            topic, words, tone, audience, country, banner, mode_label
-        )
-    else:
-        if client is None:
-            client = _openai_client()
-        auth_error_cls, rate_error_cls = _openai_error_classes()
-        user = prompts.blog_user_prompt(
-            topic=topic,
-            words=words,
-            tone=tone,
-            audience=audience,
-            country=country,
+
+@dataclass
+class ArticleJob:
+    """One article moving through :func:`fetch_article`,
+    :func:`prepare_article` and :func:`save_article`.
+
+    ``generate_article`` runs the three steps in a row; ``batch`` runs each
+    on its own threads so network calls, validation and disk writes overlap.
+    """
+
+    topic: str
+    words: int
+    tone: str
+    audience: str
+    country: str
+    out_dir: str
+    model: str
+    provider: str = "openai"
+    dry_run: bool = False
+    client: object | None = None
+    stream: bool = False
+    structured: bool = False
+    record_usage: bool = False
+    usage: Usage = field(default_factory=Usage)
+    raw: str | None = None
+    parsed: ParsedOutput | None = None
+
+    @property
+    def key(self) -> tuple:
+        return (
+            self.topic,
+            self.words,
+            self.tone,
+            self.audience,
+            self.country,
+            self.out_dir,
+            self.model,
+            self.provider,
+            self.dry_run,
+            self.stream,
+            self.structured,
         )
-        raw = _call_openai(
-            client, auth_error_cls, rate_error_cls, model, prompts.SYSTEM_MESSAGE, user
+
+
+def _fetch(job: ArticleJob) -> tuple[str | None, ParsedOutput | None]:
+    # Calls are charged to job.usage as they complete, so a job that fails
+    # later still reports what it spent.
+    if job.dry_run or job.provider == "mock":
+        parsed = _mock_article(
+            job.topic, job.words, job.tone, job.audience, job.country, job.dry_run
         )
-        parsed = parse_model_output(raw)
+        return None, parsed
+    if job.structured:
+        try:
+            return _fetch_structured(job, job.usage), None
+        except (OpenAIAuthError, OpenAIRateLimitError, CircuitOpenError):
+            raise
+        except Exception:
+            # Endpoint or model without JSON schema support.
+            metrics.inc("structured.fallbacks")
+    return _fetch_text(job, job.usage), None
+
+
+def _article_request(job: ArticleJob, structured: bool) -> tuple[str, dict]:
+    """The user prompt and call options for ``job``'s main call."""
+    fields = dict(
+        topic=job.topic,
+        words=job.words,
+        tone=job.tone,
+        audience=job.audience,
+        country=job.country,
+    )
+    options: dict = {"max_tokens": output_token_cap(job.words)}
+    if structured:
+        options["schema"] = ARTICLE_SCHEMA
+        return prompts.blog_json_user_prompt(**fields), options
+    if job.stream:
+        options["stop"] = lambda: SectionStop(job.words)
+    return prompts.blog_user_prompt(**fields), options
+
+
+def _fetch_structured(job: ArticleJob, usage: Usage) -> str:
+    auth_error_cls, rate_error_cls = openai_error_classes()
+    user, options = _article_request(job, structured=True)
+    return call_openai(
+        job.client,
+        auth_error_cls,
+        rate_error_cls,
+        job.model,
+        prompts.SYSTEM_MESSAGE,
+        user,
+        usage,
+        **options,
+    )
 
-    meta = trim_meta(parsed.meta_description, 155)
-    body = parsed.body
 
-    issues = validate_body(body)
-    if issues:
-        if provider == "openai" and not dry_run:
-            repaired = _repair_body(
-                client=client,
-                auth_error_cls=auth_error_cls,
-                rate_error_cls=rate_error_cls,
-                model=model,
-                topic=topic,
-                words=words,
-                tone=tone,
-                audience=audience,
-                country=country,
-                issues=issues,
-                body=body,
-            )
-            body = repaired.strip()
-            issues = validate_body(body)
-            if issues:
-                raise ValueError(f"Validation failed after repair: {issues}")
-        else:
-            raise MockDryRunRegressionError("Mock/Dry-run generator regression")
+def _fetch_text(job: ArticleJob, usage: Usage) -> str:
+    auth_error_cls, rate_error_cls = openai_error_classes()
+    user, options = _article_request(job, structured=False)
+    return call_openai(
+        job.client,
+        auth_error_cls,
+        rate_error_cls,
+        job.model,
+        prompts.SYSTEM_MESSAGE,
+        user,
+        usage,
+        **options,
+    )
 
-    slug = slugify_topic(topic)
-    frontmatter = build_frontmatter(
-        title=parsed.title,
-        slug=slug,
-        meta_description=meta,
-        topic=topic,
-        word_count_target=words,
-        dry_run=True if dry_run else None,
+
+def fetch_article(job: ArticleJob) -> ArticleJob:
+    """Make the main model call for ``job`` (or build the mock output).
+
+    Identical jobs in flight at the same time with the same client (or none)
+    share one call; only the job that made it has the call's usage.
+    """
+    check_provider(job.provider)
+    key = ("fetch", id(job.client)) + job.key
+    if job.provider == "openai" and not job.dry_run and job.client is None:
+        job.client = openai_client()
+    (raw, parsed), _ = _ARTICLE_FLIGHTS.do(key, lambda: _fetch(job))
+    job.raw = raw
+    job.parsed = parsed if parsed is None else replace(parsed)
+    return job
+
+
+def _parse_reply(raw: str, structured: bool) -> ParsedOutput | None:
+    """Parse a fetched reply; ``None`` when a structured run got neither form."""
+    if structured:
+        try:
+            parsed = parse_structured(raw)
+            metrics.inc("structured.assembled")
+            return parsed
+        except StructuredOutputError:
+            pass
+        try:
+            # A text reply, from the fallback or a model that ignored the schema.
+            return parse_model_output(raw)
+        except ValueError:
+            # Neither form parsed, so the whole article is fetched again.
+            metrics.inc("structured.fallbacks")
+            metrics.inc("structured.refetches")
+            return None
+    return parse_model_output(raw)
+
+
+def prepare_article(job: ArticleJob) -> ArticleJob:
+    """Parse, complete, validate and if needed repair the fetched reply."""
+    if job.raw is None:
+        article_issues(job.parsed.body, job.provider, job.dry_run)
+        return job
+
+    auth_error_cls, rate_error_cls = openai_error_classes()
+    parsed = _parse_reply(job.raw, job.structured)
+    if parsed is None:
+        job.raw = _fetch_text(job, job.usage)
+        parsed = parse_model_output(job.raw)
+    body = _finish_body(
+        job.client,
+        auth_error_cls,
+        rate_error_cls,
+        job.model,
+        job.topic,
+        job.tone,
+        job.audience,
+        job.country,
+        parsed.body,
+        job.usage,
+        getattr(job.raw, "truncated", False),
+    )
+    issues = article_issues(body, job.provider, job.dry_run)
+    if issues:
+        body, issues = local_repair(body, parsed.title)
+    if issues:
+        repaired = repair_body(
+            client=job.client,
+            auth_error_cls=auth_error_cls,
+            rate_error_cls=rate_error_cls,
+            model=job.model,
+            topic=job.topic,
+            words=job.words,
+            tone=job.tone,
+            audience=job.audience,
+            country=job.country,
+            issues=issues,
+            body=body,
+            usage=job.usage,
+        )
+        body = checked_repair(repaired)
+    parsed.body = body
+    job.parsed = parsed
+    return job
+
+
+def save_article(job: ArticleJob) -> Article:
+    """Write a prepared ``job`` to ``out_dir``."""
+    return _save_article(
+        job.parsed,
+        job.parsed.body,
+        job.topic,
+        job.words,
+        job.tone,
+        job.audience,
+        job.country,
+        job.out_dir,
+        job.model,
+        job.provider,
+        job.dry_run,
+        job.usage,
+        job.structured,
+        job.record_usage,
     )
 
-    out_path = ensure_out_dir(out_dir) / f"{slug}.md"
-    write_markdown(out_path, frontmatter, body)
 
-    return Article(
-        title=parsed.title,
-        meta_description=meta,
-        body=body,
-        slug=slug,
-        path=str(out_path),
+def _generate_article(
+    topic: str,
+    words: int,
+    tone: str,
+    audience: str,
+    country: str,
+    out_dir: str,
+    model: str,
+    provider: str = "openai",
+    dry_run: bool = False,
+    client: object | None = None,
+    stream: bool = False,
+    structured: bool = False,
+    record_usage: bool = False,
+) -> Article:
+    check_provider(provider)
+    if provider == "openai" and not dry_run and client is None:
+        client = openai_client()
+    job = ArticleJob(
+        topic,
+        words,
+        tone,
+        audience,
+        country,
+        out_dir,
+        model,
+        provider,
+        dry_run,
+        client,
+        stream,
+        structured,
+        record_usage,
     )
+    job.raw, job.parsed = _fetch(job)
+    return save_article(prepare_article(job))
 
 
 def generate_outline(
@@ -633,60 +1433,87 @@ def generate_outline(
     dry_run: bool = False,
     client: object | None = None,
 ) -> Article:
-    if provider not in {"openai", "mock"}:
-        raise ValueError(f"Unknown provider: {provider}")
+    check_provider(provider)
 
+    usage = Usage()
     if dry_run or provider == "mock":
         mode_label = "DRY RUN" if dry_run else "MOCK"
         parsed = _build_dry_run_outline(topic, tone, audience, country, mode_label)
     else:
         if client is None:
-            client = _openai_client()
-        auth_error_cls, rate_error_cls = _openai_error_classes()
+            client = openai_client()
+        auth_error_cls, rate_error_cls = openai_error_classes()
         user = prompts.outline_user_prompt(
             topic=topic,
             tone=tone,
             audience=audience,
             country=country,
         )
-        raw = _call_openai(
-            client, auth_error_cls, rate_error_cls, model, prompts.SYSTEM_MESSAGE, user
+        raw = call_openai(
+            client,
+            auth_error_cls,
+            rate_error_cls,
+            model,
+            prompts.SYSTEM_MESSAGE,
+            user,
+            usage,
+            max_tokens=output_token_cap(OUTLINE_WORDS),
+            kind="outline",
         )
         parsed = parse_model_output(raw)
 
-    meta = trim_meta(parsed.meta_description, 155)
-    body = parsed.body
-
-    if provider != "openai" or dry_run:
-        issues = validate_outline(body)
-        if issues:
-            raise MockDryRunRegressionError("Mock/Dry-run generator regression")
-
-    slug = slugify_topic(topic) + "-outline"
-    frontmatter = build_frontmatter(
-        title=parsed.title,
-        slug=slug,
-        meta_description=meta,
-        topic=topic,
-        word_count_target=0,
-        kind="outline",
-        provider=provider,
-        dry_run=dry_run,
+    _check_outline(parsed.body, provider, dry_run)
+    return _save_outline(
+        parsed, topic, tone, audience, country, out_dir, model, provider, dry_run, usage
     )
 
-    out_path = ensure_out_dir(out_dir) / f"{slug}.md"
-    write_markdown(out_path, frontmatter, body)
 
-    return Article(
-        title=parsed.title,
-        meta_description=meta,
-        body=body,
-        slug=slug,
-        path=str(out_path),
+def expand_section(
+    section_heading: str,
+    section_body_lines: list[str],
+    topic: str | None,
+    tone: str,
+    audience: str,
+    country: str,
+    model: str,
+    provider: str = "openai",
+    dry_run: bool = False,
+    client: object | None = None,
+    usage: Usage | None = None,
+) -> str:
+    # Only the caller whose request runs has its ``usage`` updated.
+    key = (
+        id(client),
+        section_heading,
+        tuple(section_body_lines),
+        topic,
+        tone,
+        audience,
+        country,
+        model,
+        provider,
+        dry_run,
+    )
+    content, _ = _SECTION_FLIGHTS.do(
+        key,
+        lambda: _expand_section(
+            section_heading,
+            section_body_lines,
+            topic,
+            tone,
+            audience,
+            country,
+            model,
+            provider,
+            dry_run,
+            client,
+            usage,
+        ),
     )
+    return content
 
 
-def expand_section(
+def _expand_section(
     section_heading: str,
     section_body_lines: list[str],
     topic: str | None,
@@ -697,9 +1524,9 @@ def expand_section(
     provider: str = "openai",
     dry_run: bool = False,
     client: object | None = None,
+    usage: Usage | None = None,
 ) -> str:
-    if provider not in {"openai", "mock"}:
-        raise ValueError(f"Unknown provider: {provider}")
+    check_provider(provider)
 
     if dry_run or provider == "mock":
         return _expand_mock_section(
@@ -712,8 +1539,8 @@ def expand_section(
         )
 
     if client is None:
-        client = _openai_client()
-    auth_error_cls, rate_error_cls = _openai_error_classes()
+        client = openai_client()
+    auth_error_cls, rate_error_cls = openai_error_classes()
     user = prompts.expand_user_prompt(
         section_heading=section_heading,
         section_body_lines=section_body_lines,
@@ -722,11 +1549,319 @@ def expand_section(
         audience=audience,
         country=country,
     )
-    raw = _call_openai(client, auth_error_cls, rate_error_cls, model, prompts.SYSTEM_MESSAGE, user)
-    text = raw.strip()
-    if not text.startswith("## "):
-        text = f"## {section_heading}\n\n{text}"
-    return text
+    raw = call_openai(
+        client,
+        auth_error_cls,
+        rate_error_cls,
+        model,
+        prompts.SYSTEM_MESSAGE,
+        user,
+        usage,
+        max_tokens=output_token_cap(SECTION_WORDS),
+        kind="expand",
+    )
+    return _finish_section(raw, section_heading)
+
+
+# Async API. These mirror generate_article/generate_outline/expand_section,
+# options included, and share their prompt, parsing, validation, repair and
+# write helpers, but await an AsyncOpenAI client so many generations can run
+# on one event loop. Calls go through the configured breaker, limiter, hedger
+# and provider pool, as in the sync path. Pass a shared ``client`` when running many at once; without one,
+# each call opens and closes its own. Cancelling a task cancels its in-flight
+# request and writes nothing, unless the final file write has already begun,
+# which then completes.
+
+
+async def _arepair_body(
+    client,
+    auth_error_cls,
+    rate_error_cls,
+    model: str,
+    topic: str,
+    words: int,
+    tone: str,
+    audience: str,
+    country: str,
+    issues: list[str],
+    body: str,
+    usage: Usage | None = None,
+) -> str:
+    user = prompts.repair_user_prompt(
+        topic=topic,
+        words=words,
+        tone=tone,
+        audience=audience,
+        country=country,
+        issues=issues,
+        body=body,
+    )
+    return await _acall_openai(
+        client,
+        auth_error_cls,
+        rate_error_cls,
+        model,
+        prompts.SYSTEM_MESSAGE,
+        user,
+        usage,
+        max_tokens=output_token_cap(words),
+        kind="repair",
+    )
+
+
+async def _afinish_body(
+    client,
+    auth_error_cls,
+    rate_error_cls,
+    model: str,
+    topic: str,
+    tone: str,
+    audience: str,
+    country: str,
+    body: str,
+    usage: Usage | None = None,
+    truncated: bool = False,
+) -> str:
+    if truncated:
+        body = drop_last_section(body)
+    missing = missing_tail(normalize_body(body))
+    if not missing:
+        return body
+    user = prompts.finish_user_prompt(
+        topic=topic,
+        tone=tone,
+        audience=audience,
+        country=country,
+        sections=missing,
+        body=body,
+    )
+    tail = await _acall_openai(
+        client,
+        auth_error_cls,
+        rate_error_cls,
+        model,
+        prompts.SYSTEM_MESSAGE,
+        user,
+        usage,
+        max_tokens=output_token_cap(TAIL_RESERVE_WORDS),
+        kind="finish",
+    )
+    return f"{body.rstrip()}\n\n{tail.strip()}"
+
+
+async def _afetch_request(job: ArticleJob, structured: bool) -> str:
+    auth_error_cls, rate_error_cls = openai_error_classes()
+    user, options = _article_request(job, structured)
+    return await _acall_openai(
+        job.client,
+        auth_error_cls,
+        rate_error_cls,
+        job.model,
+        prompts.SYSTEM_MESSAGE,
+        user,
+        job.usage,
+        **options,
+    )
+
+
+async def _afetch(job: ArticleJob) -> str:
+    if job.structured:
+        try:
+            return await _afetch_request(job, structured=True)
+        except (OpenAIAuthError, OpenAIRateLimitError, CircuitOpenError):
+            raise
+        except Exception:
+            metrics.inc("structured.fallbacks")
+    return await _afetch_request(job, structured=False)
+
+
+async def agenerate_article(
+    topic: str,
+    words: int,
+    tone: str,
+    audience: str,
+    country: str,
+    out_dir: str,
+    model: str,
+    provider: str = "openai",
+    dry_run: bool = False,
+    client: object | None = None,
+    stream: bool = False,
+    structured: bool = False,
+    record_usage: bool = False,
+) -> Article:
+    """Async :func:`generate_article`, with the same options.
+
+    Identical concurrent calls are not merged, unlike the sync function.
+    """
+    check_provider(provider)
+
+    async with _async_client(client, provider, dry_run) as client:
+        job = ArticleJob(
+            topic,
+            words,
+            tone,
+            audience,
+            country,
+            out_dir,
+            model,
+            provider,
+            dry_run,
+            client,
+            stream,
+            structured,
+            record_usage,
+        )
+        if dry_run or provider == "mock":
+            job.parsed = _mock_article(topic, words, tone, audience, country, dry_run)
+            article_issues(job.parsed.body, provider, dry_run)
+            return await asyncio.to_thread(save_article, job)
+
+        auth_error_cls, rate_error_cls = openai_error_classes()
+        job.raw = await _afetch(job)
+        parsed = _parse_reply(job.raw, structured)
+        if parsed is None:
+            job.raw = await _afetch_request(job, structured=False)
+            parsed = parse_model_output(job.raw)
+        body = await _afinish_body(
+            client,
+            auth_error_cls,
+            rate_error_cls,
+            model,
+            topic,
+            tone,
+            audience,
+            country,
+            parsed.body,
+            job.usage,
+            getattr(job.raw, "truncated", False),
+        )
+        issues = article_issues(body, provider, dry_run)
+        if issues:
+            body, issues = local_repair(body, parsed.title)
+        if issues:
+            repaired = await _arepair_body(
+                client=client,
+                auth_error_cls=auth_error_cls,
+                rate_error_cls=rate_error_cls,
+                model=model,
+                topic=topic,
+                words=words,
+                tone=tone,
+                audience=audience,
+                country=country,
+                issues=issues,
+                body=body,
+                usage=job.usage,
+            )
+            body = checked_repair(repaired)
+        parsed.body = body
+        job.parsed = parsed
+        return await asyncio.to_thread(save_article, job)
+
+
+async def agenerate_outline(
+    topic: str,
+    tone: str,
+    audience: str,
+    country: str,
+    out_dir: str,
+    model: str,
+    provider: str = "openai",
+    dry_run: bool = False,
+    client: object | None = None,
+) -> Article:
+    check_provider(provider)
+
+    async with _async_client(client, provider, dry_run) as client:
+        usage = Usage()
+        if dry_run or provider == "mock":
+            mode_label = "DRY RUN" if dry_run else "MOCK"
+            parsed = _build_dry_run_outline(topic, tone, audience, country, mode_label)
+        else:
+            auth_error_cls, rate_error_cls = openai_error_classes()
+            user = prompts.outline_user_prompt(
+                topic=topic,
+                tone=tone,
+                audience=audience,
+                country=country,
+            )
+            raw = await _acall_openai(
+                client,
+                auth_error_cls,
+                rate_error_cls,
+                model,
+                prompts.SYSTEM_MESSAGE,
+                user,
+                usage,
+                max_tokens=output_token_cap(OUTLINE_WORDS),
+                kind="outline",
+            )
+            parsed = parse_model_output(raw)
+
+        _check_outline(parsed.body, provider, dry_run)
+        return await asyncio.to_thread(
+            _save_outline,
+            parsed,
+            topic,
+            tone,
+            audience,
+            country,
+            out_dir,
+            model,
+            provider,
+            dry_run,
+            usage,
+        )
+
+
+async def aexpand_section(
+    section_heading: str,
+    section_body_lines: list[str],
+    topic: str | None,
+    tone: str,
+    audience: str,
+    country: str,
+    model: str,
+    provider: str = "openai",
+    dry_run: bool = False,
+    client: object | None = None,
+    usage: Usage | None = None,
+) -> str:
+    check_provider(provider)
+
+    async with _async_client(client, provider, dry_run) as client:
+        if dry_run or provider == "mock":
+            return _expand_mock_section(
+                section_heading=section_heading,
+                section_body_lines=section_body_lines,
+                topic=topic,
+                tone=tone,
+                audience=audience,
+                country=country,
+            )
+
+        auth_error_cls, rate_error_cls = openai_error_classes()
+        user = prompts.expand_user_prompt(
+            section_heading=section_heading,
+            section_body_lines=section_body_lines,
+            topic=topic,
+            tone=tone,
+            audience=audience,
+            country=country,
+        )
+        raw = await _acall_openai(
+            client,
+            auth_error_cls,
+            rate_error_cls,
+            model,
+            prompts.SYSTEM_MESSAGE,
+            user,
+            usage,
+            max_tokens=output_token_cap(SECTION_WORDS),
+            kind="expand",
+        )
+        return _finish_section(raw, section_heading)
 
 
 def resolve_model(cli_model: str | None) -> str:
@@ -0,0 +1,322 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+from .errors import OpenAIRateLimitError
+from .limiter import AdaptiveLimiter
+from .metrics import metrics
+from .usage import Usage
+
+
+class LatencyTracker:
+    """Rolling window of recent call latencies."""
+
+    def __init__(self, window: int = 200):
+        self._samples: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, p: float) -> float | None:
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, max(0, math.ceil(p * len(ordered)) - 1))
+        return ordered[index]
+
+
+@dataclass
+class HedgePolicy:
+    """When and where to send a duplicate request.
+
+    A hedge fires once a call has been running longer than ``percentile`` of
+    recent latencies (never sooner than ``min_delay``), at most for
+    ``max_ratio`` of all calls. ``model`` and ``client`` optionally send the
+    duplicate to another model or endpoint.
+    """
+
+    percentile: float = 0.95
+    min_samples: int = 20
+    min_delay: float = 1.0
+    max_ratio: float = 0.1
+    model: str | None = None
+    client: object | None = None
+
+
+@dataclass
+class HedgeStats:
+    calls: int = 0
+    hedged: int = 0
+    hedge_wins: int = 0
+    # Tokens billed for losing attempts, by the model they were sent to.
+    wasted: dict[str, Usage] = field(default_factory=dict)
+
+    def summary(self) -> str:
+        return (
+            f"{self.hedged} of {self.calls} calls hedged "
+            f"({self.hedge_wins} won by the hedge)"
+        )
+
+
+class Hedger:
+    """Run provider calls with a latency-triggered duplicate request.
+
+    Whichever attempt succeeds first wins; if one attempt fails, the other
+    is still awaited. Async losers are cancelled. A synchronous request
+    cannot be interrupted, so a losing thread is left to finish and its
+    result is discarded; its tokens are still billed, so they are added to
+    ``stats.wasted`` for :meth:`take_wasted` and to the ``hedge.wasted_*``
+    metrics.
+
+    Latencies are tracked per call ``kind`` (article, repair, finish,
+    outline, expand, adapt): a short finish call should not wait for the
+    article calls' p95, nor a long article call be hedged by theirs.
+
+    With a ``limiter``, the duplicate takes its own slot and holds it until
+    it finishes, even as a loser; when no slot is free the call is not
+    hedged.
+    """
+
+    def __init__(
+        self,
+        policy: HedgePolicy | None = None,
+        window: int = 200,
+        max_workers: int = 256,
+    ):
+        self.policy = policy or HedgePolicy()
+        self.stats = HedgeStats()
+        self._window = window
+        self._trackers: dict[str, LatencyTracker] = {}
+        self._lock = threading.Lock()
+        # Threads are started lazily, one per concurrent attempt.
+        self._pool = ThreadPoolExecutor(max_workers, thread_name_prefix="ai-blog-hedge")
+
+    def tracker(self, kind: str = "article") -> LatencyTracker:
+        """The latency window for calls of ``kind``."""
+        with self._lock:
+            tracker = self._trackers.get(kind)
+            if tracker is None:
+                tracker = self._trackers[kind] = LatencyTracker(self._window)
+            return tracker
+
+    def delay(self, kind: str = "article") -> float | None:
+        """Seconds to wait before hedging, or ``None`` while still calibrating."""
+        tracker = self.tracker(kind)
+        if len(tracker) < self.policy.min_samples:
+            return None
+        threshold = tracker.percentile(self.policy.percentile)
+        return max(self.policy.min_delay, threshold or 0.0)
+
+    def _start_call(self) -> None:
+        with self._lock:
+            self.stats.calls += 1
+        metrics.inc("hedge.calls")
+
+    def _take_hedge(self) -> bool:
+        with self._lock:
+            if self.stats.hedged + 1 > self.policy.max_ratio * self.stats.calls:
+                return False
+            self.stats.hedged += 1
+        metrics.inc("hedge.fired")
+        return True
+
+    def _hedge_slot(self, limiter: AdaptiveLimiter | None) -> tuple[bool, int | None]:
+        """Whether to hedge now, and the limiter token the duplicate holds."""
+        token = None
+        if limiter is not None:
+            token = limiter.try_acquire()
+            if token is None:
+                metrics.inc("hedge.no_slot")
+                return False, None
+        if not self._take_hedge():
+            if token is not None:
+                limiter.release(token, None)
+            return False, None
+        return True, token
+
+    @staticmethod
+    def _release_slot(limiter: AdaptiveLimiter, token: int, start: float, attempt) -> None:
+        # Runs when the duplicate's future or task is done, cancelled included.
+        if attempt.cancelled():
+            limiter.release(token, None)
+            return
+        error = attempt.exception()
+        limiter.release(
+            token,
+            None if error is not None else time.monotonic() - start,
+            rate_limited=isinstance(error, OpenAIRateLimitError),
+        )
+
+    def _won(self, hedge: bool) -> None:
+        if hedge:
+            with self._lock:
+                self.stats.hedge_wins += 1
+            metrics.inc("hedge.won")
+
+    def _target(self, client, model: str) -> tuple[object, str]:
+        return self.policy.client or client, self.policy.model or model
+
+    def _timed(self, fn, client, model: str, usage: Usage, tracker) -> str:
+        start = time.monotonic()
+        result = fn(client, model, usage)
+        if tracker is not None:
+            tracker.record(time.monotonic() - start)
+        return result
+
+    def _wasted(self, model: str, usage: Usage) -> None:
+        with self._lock:
+            self.stats.wasted.setdefault(model, Usage()).add(usage)
+        metrics.inc("hedge.wasted_input_tokens", usage.input_tokens)
+        metrics.inc("hedge.wasted_output_tokens", usage.output_tokens)
+
+    def take_wasted(self) -> dict[str, Usage]:
+        """Return and reset the losers' usage recorded since the last call."""
+        with self._lock:
+            wasted, self.stats.wasted = self.stats.wasted, {}
+        return wasted
+
+    def close(self) -> None:
+        """Wait for losing attempts still running, so their usage is recorded."""
+        self._pool.shutdown(wait=True)
+
+    def call(
+        self,
+        fn: Callable[[object, str, Usage], str],
+        client,
+        model: str,
+        usage: Usage | None = None,
+        kind: str = "article",
+        limiter: AdaptiveLimiter | None = None,
+    ) -> str:
+        """Call ``fn(client, model, usage)`` and hedge it if it runs long.
+
+        Only the primary attempt's latency is recorded, under ``kind``.
+        """
+        self._start_call()
+        tracker = self.tracker(kind)
+        delay = self.delay(kind)
+        attempt_usage = Usage()
+        if delay is None:
+            result = self._timed(fn, client, model, attempt_usage, tracker)
+            if usage is not None:
+                usage.add(attempt_usage)
+            return result
+
+        primary = self._pool.submit(self._timed, fn, client, model, attempt_usage, tracker)
+        attempts = {primary: (False, model, attempt_usage)}
+        done, _ = wait(attempts, timeout=delay)
+        hedge, token = (False, None) if done else self._hedge_slot(limiter)
+        if hedge:
+            hedge_client, hedge_model = self._target(client, model)
+            hedge_usage = Usage()
+            start = time.monotonic()
+            future = self._pool.submit(
+                self._timed, fn, hedge_client, hedge_model, hedge_usage, None
+            )
+            if token is not None:
+                future.add_done_callback(
+                    lambda f: self._release_slot(limiter, token, start, f)
+                )
+            attempts[future] = (True, hedge_model, hedge_usage)
+
+        error: BaseException | None = None
+        pending = set(attempts)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                exc = future.exception()
+                if exc is not None:
+                    error = error or exc
+                    continue
+                hedge, _, winner_usage = attempts[future]
+                self._won(hedge)
+                if usage is not None:
+                    usage.add(winner_usage)
+                for other in pending:
+                    other.cancel()
+                    _, loser_model, loser_usage = attempts[other]
+                    other.add_done_callback(
+                        lambda _f, m=loser_model, u=loser_usage: self._wasted(m, u)
+                    )
+                return future.result()
+        raise error
+
+    async def acall(
+        self,
+        fn: Callable[[object, str, Usage], Awaitable[str]],
+        client,
+        model: str,
+        usage: Usage | None = None,
+        kind: str = "article",
+        limiter: AdaptiveLimiter | None = None,
+    ) -> str:
+        """Async variant of :meth:`call`; the losing request is cancelled."""
+        self._start_call()
+        tracker = self.tracker(kind)
+        delay = self.delay(kind)
+
+        async def timed(client, model, attempt_usage, primary):
+            start = time.monotonic()
+            result = await fn(client, model, attempt_usage)
+            if primary:
+                tracker.record(time.monotonic() - start)
+            return result
+
+        attempt_usage = Usage()
+        if delay is None:
+            result = await timed(client, model, attempt_usage, True)
+            if usage is not None:
+                usage.add(attempt_usage)
+            return result
+
+        primary = asyncio.ensure_future(timed(client, model, attempt_usage, True))
+        attempts = {primary: (False, attempt_usage)}
+        try:
+            done, _ = await asyncio.wait(attempts, timeout=delay)
+            hedge, token = (False, None) if done else self._hedge_slot(limiter)
+            if hedge:
+                hedge_client, hedge_model = self._target(client, model)
+                hedge_usage = Usage()
+                start = time.monotonic()
+                task = asyncio.ensure_future(
+                    timed(hedge_client, hedge_model, hedge_usage, False)
+                )
+                if token is not None:
+                    task.add_done_callback(
+                        lambda t: self._release_slot(limiter, token, start, t)
+                    )
+                attempts[task] = (True, hedge_usage)
+
+            error: BaseException | None = None
+            pending = set(attempts)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is not None:
+                        error = error or task.exception()
+                        continue
+                    hedge, winner_usage = attempts[task]
+                    self._won(hedge)
+                    if usage is not None:
+                        usage.add(winner_usage)
+                    return task.result()
+            raise error
+        finally:
+            for task in attempts:
+                if not task.done():
+                    task.cancel()
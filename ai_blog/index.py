@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from .outline_parse import OutlineParseError, parse_frontmatter, read_frontmatter
+from .utils import count_h2
+
+INDEX_NAME = "index.jsonl"
+
+
+@dataclass
+class IndexEntry:
+    path: str
+    mtime_ns: int
+    size: int
+    frontmatter: dict[str, str]
+    h2_count: int | None = None
+    word_count: int | None = None
+    error: str | None = None
+
+
+@dataclass
+class IndexReport:
+    entries: list[IndexEntry] = field(default_factory=list)
+    scanned: int = 0
+    reused: int = 0
+    removed: int = 0
+
+
+def index_path(out_dir: str | Path) -> Path:
+    return Path(out_dir) / INDEX_NAME
+
+
+def scan_file(path: str | Path, body_stats: bool = True) -> IndexEntry | None:
+    """Index one Markdown file; ``None`` if it was deleted meanwhile.
+
+    With ``body_stats`` the file is read once to count H2 headings and body
+    words; without it only the frontmatter block is read.
+    """
+    file_path = Path(path)
+    try:
+        stat = file_path.stat()
+    except FileNotFoundError:
+        return None
+    entry = IndexEntry(
+        path=file_path.name, mtime_ns=stat.st_mtime_ns, size=stat.st_size, frontmatter={}
+    )
+    try:
+        if not body_stats:
+            entry.frontmatter = read_frontmatter(file_path)
+            return entry
+        lines = file_path.read_text(encoding="utf-8").splitlines()
+        entry.frontmatter, start = parse_frontmatter(lines)
+    except FileNotFoundError:
+        return None
+    except (OutlineParseError, UnicodeDecodeError) as exc:
+        if not file_path.exists():
+            return None
+        entry.error = str(exc)
+        return entry
+    body = "\n".join(lines[start:])
+    entry.h2_count = count_h2(body)
+    entry.word_count = len(body.split())
+    return entry
+
+
+def load_index(path: str | Path) -> dict[str, IndexEntry]:
+    file_path = Path(path)
+    if file_path.is_dir():
+        file_path = index_path(file_path)
+    entries: dict[str, IndexEntry] = {}
+    if not file_path.exists():
+        return entries
+    with file_path.open("r", encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                entry = IndexEntry(**json.loads(line))
+            except (json.JSONDecodeError, TypeError):
+                continue
+            entries[entry.path] = entry
+    return entries
+
+
+def save_index(path: str | Path, entries: list[IndexEntry]) -> None:
+    file_path = Path(path)
+    tmp_path = file_path.with_name(f".{file_path.name}.{os.getpid()}.tmp")
+    with tmp_path.open("w", encoding="utf-8") as handle:
+        for entry in entries:
+            handle.write(json.dumps(asdict(entry), ensure_ascii=True, sort_keys=True) + "\n")
+    os.replace(tmp_path, file_path)
+
+
+def build_index(
+    out_dir: str | Path,
+    workers: int = 8,
+    body_stats: bool = True,
+    path: str | Path | None = None,
+) -> IndexReport:
+    """Create or refresh the index of every ``*.md`` file in ``out_dir``.
+
+    Files whose size and mtime match the previous index are reused as-is;
+    only new or modified files are read, in parallel on ``workers`` threads.
+    """
+    out = Path(out_dir)
+    target = Path(path) if path is not None else index_path(out)
+    previous = load_index(target)
+    report = IndexReport()
+    current: dict[str, IndexEntry] = {}
+    pending: list[Path] = []
+
+    with os.scandir(out) as it:
+        for dirent in it:
+            if not dirent.name.endswith(".md") or not dirent.is_file():
+                continue
+            stat = dirent.stat()
+            old = previous.get(dirent.name)
+            if (
+                old is not None
+                and old.mtime_ns == stat.st_mtime_ns
+                and old.size == stat.st_size
+                and (old.word_count is not None or not body_stats or old.error)
+            ):
+                current[dirent.name] = old
+                report.reused += 1
+            else:
+                pending.append(Path(dirent.path))
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            for entry in pool.map(lambda p: scan_file(p, body_stats), pending):
+                if entry is not None:
+                    current[entry.path] = entry
+        report.scanned = len(pending)
+
+    report.removed = sum(1 for name in previous if name not in current)
+    report.entries = [current[name] for name in sorted(current)]
+    save_index(target, report.entries)
+    return report
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from typing import Awaitable, Callable, TypeVar
+
+from .errors import OpenAIRateLimitError
+from .metrics import metrics
+from .waiters import AsyncWaiters
+
+T = TypeVar("T")
+
+
+class AdaptiveLimiter:
+    """AIMD limit on concurrent provider calls.
+
+    The limit grows by ``increase`` after each full window of healthy calls
+    (``limit`` successes in a row) and is multiplied by ``decrease`` when a
+    call is rate limited or takes longer than ``latency_factor`` times the
+    running latency baseline. Calls that were already in flight when the
+    limit was cut do not cut it again, so one burst of 429s counts as a
+    single congestion signal.
+    """
+
+    def __init__(
+        self,
+        initial: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        increase: int = 1,
+        decrease: float = 0.5,
+        latency_factor: float = 3.0,
+        min_samples: int = 5,
+        max_retries: int = 3,
+        backoff: float = 1.0,
+        sleep: Callable[[float], None] = time.sleep,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self.min_samples = min_samples
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._sleep = sleep
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._waiters = AsyncWaiters(self._cond)
+        self._limit = float(max(min_limit, min(initial, max_limit)))
+        self._in_flight = 0
+        self._successes = 0
+        self._epoch = 0
+        self._baseline: float | None = None
+        self._samples = 0
+        self._publish()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _publish(self) -> None:
+        metrics.set("limiter.limit", int(self._limit))
+        metrics.set("limiter.in_flight", self._in_flight)
+
+    def acquire(self) -> int:
+        """Block until a slot is free; returns a token for :meth:`release`."""
+        with self._cond:
+            while self._in_flight >= int(self._limit):
+                self._cond.wait()
+            self._in_flight += 1
+            self._publish()
+            return self._epoch
+
+    def try_acquire(self) -> int | None:
+        """Take a slot only if one is free and nobody is waiting; else ``None``."""
+        with self._cond:
+            if self._waiters or self._in_flight >= int(self._limit):
+                return None
+            self._in_flight += 1
+            self._publish()
+            return self._epoch
+
+    async def aacquire(self) -> int:
+        """Async :meth:`acquire`: waits in line without blocking the event loop."""
+        first = False
+        while True:
+            with self._cond:
+                if (first or not self._waiters) and self._in_flight < int(self._limit):
+                    self._in_flight += 1
+                    self._publish()
+                    return self._epoch
+                future = self._waiters.add(first)
+            await self._waiters.wait(future)
+            first = True
+
+    def release(self, token: int, latency: float | None, rate_limited: bool = False) -> None:
+        """Return a slot. ``latency`` is ``None`` for calls that failed."""
+        with self._cond:
+            self._in_flight -= 1
+            spike = (
+                latency is not None
+                and self._baseline is not None
+                and self._samples >= self.min_samples
+                and latency > self.latency_factor * self._baseline
+            )
+            if latency is not None:
+                # Spikes feed the baseline too, so a lasting slowdown becomes
+                # the new normal instead of cutting the limit forever.
+                self._samples += 1
+                self._baseline = (
+                    latency
+                    if self._baseline is None
+                    else 0.9 * self._baseline + 0.1 * latency
+                )
+            if rate_limited or spike:
+                if token == self._epoch:
+                    self._limit = max(float(self.min_limit), self._limit * self.decrease)
+                    self._epoch += 1
+                    self._successes = 0
+                    metrics.inc("limiter.decreases")
+            elif latency is not None:
+                self._successes += 1
+                if self._successes >= int(self._limit) and self._limit < self.max_limit:
+                    self._limit = min(float(self.max_limit), self._limit + self.increase)
+                    self._successes = 0
+            self._publish()
+            self._cond.notify_all()
+            self._waiters.wake(int(self._limit) - self._in_flight)
+
+    def call(self, fn: Callable[[], T]) -> T:
+        """Run ``fn`` under the limit, retrying rate-limited calls with backoff."""
+        attempt = 0
+        while True:
+            token = self.acquire()
+            start = self._clock()
+            try:
+                result = fn()
+            except OpenAIRateLimitError:
+                self.release(token, None, rate_limited=True)
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+                self._sleep(self.backoff * (2 ** (attempt - 1)))
+                continue
+            except BaseException:
+                self.release(token, None)
+                raise
+            self.release(token, self._clock() - start)
+            return result
+
+    async def acall(self, fn: Callable[[], Awaitable[T]]) -> T:
+        """Async variant of :meth:`call`."""
+        attempt = 0
+        while True:
+            token = await self.aacquire()
+            start = self._clock()
+            try:
+                result = await fn()
+            except OpenAIRateLimitError:
+                self.release(token, None, rate_limited=True)
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+                await asyncio.sleep(self.backoff * (2 ** (attempt - 1)))
+                continue
+            except BaseException:
+                self.release(token, None)
+                raise
+            self.release(token, self._clock() - start)
+            return result
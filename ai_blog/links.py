@@ -0,0 +1,438 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .outline_parse import OutlineParseError, parse_frontmatter
+from .utils import write_markdown
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:
+    np = None
+    sparse = None
+
+LINKS_NAME = "links.npz"
+SIDECAR_NAME = "links.jsonl"
+
+# Hashed features need no vocabulary, so a new article never changes the
+# columns of the ones already indexed.
+N_FEATURES = 2**18
+TITLE_WEIGHT = 3.0
+HEADING_WEIGHT = 2.0
+# Terms in more than this share of articles carry no topical signal (and
+# make the similarity products dense). Only applied from MIN_DOCS_FOR_MAX_DF
+# articles up, as in a tiny corpus every shared word looks common.
+MAX_DF = 0.5
+MIN_DOCS_FOR_MAX_DF = 20
+# Each article is reduced to its highest-weighted terms. The rest add
+# little to the ranking but make every article overlap every other one,
+# which turns the sparse similarity products dense.
+MAX_TERMS = 32
+# Above this share of changed articles a full recompute is cheaper than
+# patching the previous suggestions.
+FULL_REBUILD_RATIO = 0.2
+# Dense similarity block size, in matrix cells (float32: 64 MB).
+BLOCK_CELLS = 2**24
+# Suggestions scoring below this share almost no vocabulary and are dropped.
+MIN_SCORE = 0.05
+# Files that are not standalone articles.
+SKIP_KINDS = {"outline", "variant"}
+
+_WORD_RE = re.compile(r"[a-z0-9][a-z0-9'-]*[a-z0-9]|[a-z0-9]")
+_HEADING_RE = re.compile(r"^#{1,6}\s+")
+
+
+class LinksDependencyError(RuntimeError):
+    """Raised when numpy or scipy is not installed."""
+
+
+def _require() -> None:
+    if np is None or sparse is None:
+        raise LinksDependencyError(
+            "Internal link suggestions need numpy and scipy: "
+            "pip install 'ai-blog-cli[links]'"
+        )
+
+
+@dataclass
+class LinkReport:
+    documents: int = 0
+    read: int = 0
+    reused: int = 0
+    removed: int = 0
+    recomputed: int = 0
+    full: bool = False
+    updated_frontmatter: int = 0
+    # path -> [(related path, score)], best first
+    suggestions: dict[str, list[tuple[str, float]]] = field(default_factory=dict)
+    titles: dict[str, str] = field(default_factory=dict)
+
+
+def links_path(out_dir: str | Path) -> Path:
+    return Path(out_dir) / LINKS_NAME
+
+
+def sidecar_path(out_dir: str | Path) -> Path:
+    return Path(out_dir) / SIDECAR_NAME
+
+
+def _features(title: str, body: str):
+    ids: list[int] = []
+    weights: list[float] = []
+
+    def add(text: str, weight: float) -> None:
+        for token in _WORD_RE.findall(text.lower()):
+            ids.append(zlib.crc32(token.encode()) & (N_FEATURES - 1))
+            weights.append(weight)
+
+    add(title, TITLE_WEIGHT)
+    for line in body.splitlines():
+        if _HEADING_RE.match(line):
+            add(_HEADING_RE.sub("", line), HEADING_WEIGHT)
+        else:
+            add(line, 1.0)
+    if not ids:
+        return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)
+    columns, inverse = np.unique(np.asarray(ids, dtype=np.int32), return_inverse=True)
+    values = np.bincount(inverse, weights=weights).astype(np.float32)
+    return columns, values
+
+
+@dataclass
+class _Doc:
+    name: str
+    mtime_ns: int
+    size: int
+    title: str = ""
+    slug: str = ""
+    active: bool = False
+    columns: object = None
+    values: object = None
+
+
+def _read_doc(path: Path) -> _Doc | None:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    doc = _Doc(name=path.name, mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+    doc.columns = np.zeros(0, dtype=np.int32)
+    doc.values = np.zeros(0, dtype=np.float32)
+    try:
+        lines = path.read_text(encoding="utf-8").splitlines()
+        frontmatter, start = parse_frontmatter(lines)
+    except FileNotFoundError:
+        # Deleted after the directory was listed.
+        return None
+    except (OutlineParseError, UnicodeDecodeError):
+        return doc
+    doc.title = frontmatter.get("title", "")
+    doc.slug = frontmatter.get("slug") or path.stem
+    if frontmatter.get("kind") in SKIP_KINDS:
+        return doc
+    doc.columns, doc.values = _features(doc.title, "\n".join(lines[start:]))
+    doc.active = bool(len(doc.columns))
+    return doc
+
+
+def _load_cache(path: Path, k: int) -> dict | None:
+    if not path.exists():
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            cache = {name: data[name] for name in data.files}
+    except (OSError, ValueError, KeyError):
+        return None
+    if cache.get("config") is None or tuple(cache["config"]) != (N_FEATURES, k):
+        return None
+    return cache
+
+
+def _save_cache(path: Path, docs: list[_Doc], counts, top, scores, k: int) -> None:
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with tmp_path.open("wb") as handle:
+        np.savez(
+            handle,
+            config=np.array([N_FEATURES, k], dtype=np.int64),
+            names=np.array([doc.name for doc in docs], dtype=str),
+            titles=np.array([doc.title for doc in docs], dtype=str),
+            slugs=np.array([doc.slug for doc in docs], dtype=str),
+            mtime_ns=np.array([doc.mtime_ns for doc in docs], dtype=np.int64),
+            size=np.array([doc.size for doc in docs], dtype=np.int64),
+            active=np.array([doc.active for doc in docs], dtype=bool),
+            data=counts.data,
+            indices=counts.indices,
+            indptr=counts.indptr,
+            top=top,
+            scores=scores,
+        )
+    os.replace(tmp_path, path)
+
+
+def _tfidf(counts, active):
+    """Sublinear TF-IDF rows of at most MAX_TERMS terms, with unit length."""
+    # Inactive rows have no terms, so they add nothing to ``df``.
+    n_active = int(active.sum())
+    df = np.bincount(counts.indices, minlength=N_FEATURES)
+    idf = np.log((1 + n_active) / (1 + df)) + 1.0
+    if n_active >= MIN_DOCS_FOR_MAX_DF:
+        idf[df > MAX_DF * n_active] = 0.0
+    matrix = counts.copy()
+    matrix.data = (1.0 + np.log(matrix.data)) * idf[matrix.indices]
+    # Rank terms within each row by weight and keep the first MAX_TERMS.
+    row_of = np.repeat(np.arange(matrix.shape[0]), np.diff(matrix.indptr))
+    order = np.lexsort((-matrix.data, row_of))
+    rank = np.arange(len(order)) - matrix.indptr[row_of[order]]
+    matrix.data[order[rank >= MAX_TERMS]] = 0.0
+    matrix.eliminate_zeros()
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.csr_matrix(sparse.diags(1.0 / norms) @ matrix, dtype=np.float32)
+
+
+def _top_k(similarity, k: int):
+    """Column indices and scores of the ``k`` best per row (-1/0 padded)."""
+    rows = similarity.shape[0]
+    top = np.full((rows, k), -1, dtype=np.int32)
+    scores = np.zeros((rows, k), dtype=np.float32)
+    take = min(k, similarity.shape[1])
+    if take == 0:
+        return top, scores
+    if take < similarity.shape[1]:
+        part = np.argpartition(-similarity, take - 1, axis=1)[:, :take]
+    else:
+        part = np.tile(np.arange(take), (rows, 1))
+    part_scores = np.take_along_axis(similarity, part, axis=1)
+    order = np.argsort(-part_scores, axis=1, kind="stable")
+    part = np.take_along_axis(part, order, axis=1)
+    part_scores = np.take_along_axis(part_scores, order, axis=1)
+    keep = part_scores > 0
+    top[:, :take] = np.where(keep, part, -1)
+    scores[:, :take] = np.where(keep, part_scores, 0.0)
+    return top, scores
+
+
+def _recompute(matrix, rows, active, k: int):
+    """Top-k for ``rows`` against every article, in dense row blocks."""
+    n = matrix.shape[0]
+    top = np.full((len(rows), k), -1, dtype=np.int32)
+    scores = np.zeros((len(rows), k), dtype=np.float32)
+    transposed = matrix.T.tocsc()
+    block = max(1, BLOCK_CELLS // max(n, 1))
+    for start in range(0, len(rows), block):
+        chunk = rows[start : start + block]
+        similarity = (matrix[chunk] @ transposed).toarray()
+        similarity[:, ~active] = -1.0
+        similarity[np.arange(len(chunk)), chunk] = -1.0
+        top[start : start + block], scores[start : start + block] = _top_k(similarity, k)
+    return top, scores
+
+
+def _patch(matrix, old_top, old_scores, changed, active, k: int):
+    """Merge newly scored ``changed`` articles into existing top-k lists.
+
+    Only pairs involving a changed article are rescored, ``n x block``
+    columns at a time so no product exceeds BLOCK_CELLS. Scores of
+    unchanged pairs are kept from the previous run, computed with that
+    run's IDF weights, so an incremental run is an approximation of a full
+    one; ``full=True`` rescores everything.
+    """
+    n = matrix.shape[0]
+    stale = np.isin(old_top, changed) | (old_top < 0)
+    top = np.where(stale, -1, old_top).astype(np.int32)
+    scores = np.where(stale, -1.0, old_scores).astype(np.float32)
+    block = max(1, BLOCK_CELLS // max(n, 1))
+    for start in range(0, len(changed), block):
+        cols = changed[start : start + block]
+        fresh = (matrix @ matrix[cols].T).toarray()
+        fresh[np.arange(n)[:, None] == cols[None, :]] = -1.0
+        fresh[:, ~active[cols]] = -1.0
+        candidates = np.concatenate([top, np.broadcast_to(cols, (n, len(cols)))], axis=1)
+        order, scores = _top_k(np.concatenate([scores, fresh], axis=1), k)
+        top = np.where(order >= 0, np.take_along_axis(candidates, np.maximum(order, 0), 1), -1)
+        # Empty slots must lose to any real score in the next block.
+        scores = np.where(top >= 0, scores, -1.0).astype(np.float32)
+    return top.astype(np.int32), np.maximum(scores, 0.0)
+
+
+def _write_related(path: Path, slugs: list[str]) -> None:
+    lines = path.read_text(encoding="utf-8").splitlines()
+    _, start = parse_frontmatter(lines)
+    if start == 0:
+        return
+    head = [line for line in lines[1 : start - 1] if not line.startswith("related:")]
+    head.append(f"related: {json.dumps(slugs, ensure_ascii=True)}")
+    write_markdown(path, "\n".join(["---", *head, "---"]), "\n".join(lines[start:]))
+
+
+def build_links(
+    out_dir: str | Path,
+    k: int = 5,
+    full: bool = False,
+    frontmatter: bool = False,
+    workers: int = 8,
+    path: str | Path | None = None,
+) -> LinkReport:
+    """Suggest the ``k`` most related articles for every article in ``out_dir``.
+
+    Articles are hashed TF-IDF vectors over title, headings and body,
+    compared by cosine similarity in blocked sparse matrix products. Term
+    counts and the previous suggestions are cached in ``links.npz``; only
+    new or modified files are read, and unless ``full`` (or many files
+    changed) only the lists those files can affect are recomputed; scores
+    between unchanged articles then keep their old IDF weights, so
+    incremental results can differ slightly from a full run. The
+    suggestions are written to ``links.jsonl`` and, with ``frontmatter``,
+    to a ``related`` list of slugs in each changed article.
+    """
+    _require()
+    out = Path(out_dir)
+    target = Path(path) if path is not None else links_path(out)
+    cache = None if full else _load_cache(target, k)
+    report = LinkReport()
+
+    cached: dict[str, int] = {}
+    if cache is not None:
+        cached = {str(name): i for i, name in enumerate(cache["names"])}
+        old_counts = sparse.csr_matrix(
+            (cache["data"], cache["indices"], cache["indptr"]),
+            shape=(len(cache["names"]), N_FEATURES),
+        )
+
+    docs: dict[str, _Doc] = {}
+    pending: list[Path] = []
+    with os.scandir(out) as it:
+        for dirent in it:
+            if not dirent.name.endswith(".md") or not dirent.is_file():
+                continue
+            stat = dirent.stat()
+            row = cached.get(dirent.name)
+            if (
+                row is not None
+                and cache["mtime_ns"][row] == stat.st_mtime_ns
+                and cache["size"][row] == stat.st_size
+            ):
+                span = slice(old_counts.indptr[row], old_counts.indptr[row + 1])
+                docs[dirent.name] = _Doc(
+                    name=dirent.name,
+                    mtime_ns=stat.st_mtime_ns,
+                    size=stat.st_size,
+                    title=str(cache["titles"][row]),
+                    slug=str(cache["slugs"][row]),
+                    active=bool(cache["active"][row]),
+                    columns=old_counts.indices[span],
+                    values=old_counts.data[span],
+                )
+                report.reused += 1
+            else:
+                pending.append(Path(dirent.path))
+    if pending:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            for doc in pool.map(_read_doc, pending):
+                if doc is not None:
+                    docs[doc.name] = doc
+        report.read = len(pending)
+    report.removed = sum(1 for name in cached if name not in docs)
+
+    ordered = [docs[name] for name in sorted(docs)]
+    n = len(ordered)
+    report.documents = n
+    counts = sparse.csr_matrix(
+        (
+            np.concatenate([doc.values for doc in ordered] or [np.zeros(0, np.float32)]),
+            np.concatenate([doc.columns for doc in ordered] or [np.zeros(0, np.int32)]),
+            np.concatenate([[0], np.cumsum([len(doc.columns) for doc in ordered])]),
+        ),
+        shape=(n, N_FEATURES),
+        dtype=np.float32,
+    )
+    active = np.array([doc.active for doc in ordered], dtype=bool)
+    matrix = _tfidf(counts, active)
+
+    position = {doc.name: i for i, doc in enumerate(ordered)}
+    changed = sorted(position[path.name] for path in pending if path.name in position)
+    top = np.full((n, k), -1, dtype=np.int32)
+    scores = np.zeros((n, k), dtype=np.float32)
+    if cache is not None and len(changed) + report.removed <= FULL_REBUILD_RATIO * n:
+        remap = np.array(
+            [position.get(str(name), -1) for name in cache["names"]] + [-1], dtype=np.int32
+        )
+        lost: set[int] = set()
+        for name, i in position.items():
+            row = cached.get(name)
+            if row is None:
+                continue
+            top[i] = remap[cache["top"][row]]
+            scores[i] = cache["scores"][row]
+            if ((top[i] < 0) & (cache["top"][row] >= 0)).any():
+                # A suggestion was removed; find a replacement.
+                lost.add(i)
+        if changed:
+            top, scores = _patch(matrix, top, scores, np.asarray(changed), active, k)
+        redo = np.asarray(sorted(lost.union(changed)), dtype=np.int64)
+        if len(redo):
+            top[redo], scores[redo] = _recompute(matrix, redo, active, k)
+        report.recomputed = len(redo)
+    elif n:
+        report.full = True
+        top, scores = _recompute(matrix, np.arange(n), active, k)
+        report.recomputed = n
+    top[~active] = -1
+    scores[~active] = 0.0
+
+    previous: dict[str, list[str]] = {}
+    if cache is not None:
+        for name, row in cached.items():
+            previous[name] = [
+                str(cache["names"][j])
+                for j, score in zip(cache["top"][row], cache["scores"][row])
+                if j >= 0 and score >= MIN_SCORE
+            ]
+    read = {path.name for path in pending}
+    for i, doc in enumerate(ordered):
+        if not doc.active:
+            continue
+        related = [
+            (ordered[j].name, float(score))
+            for j, score in zip(top[i], scores[i])
+            if j >= 0 and score >= MIN_SCORE
+        ]
+        report.suggestions[doc.name] = related
+        report.titles[doc.name] = doc.title
+        names = [name for name, _ in related]
+        if frontmatter and (doc.name in read or previous.get(doc.name) != names):
+            file_path = out / doc.name
+            _write_related(file_path, [ordered[position[name]].slug for name in names])
+            # The body is unchanged, so the cached features stay valid.
+            stat = file_path.stat()
+            doc.mtime_ns, doc.size = stat.st_mtime_ns, stat.st_size
+            report.updated_frontmatter += 1
+
+    write_sidecar(sidecar_path(out), report)
+    _save_cache(target, ordered, counts, top, scores, k)
+    return report
+
+
+def write_sidecar(path: str | Path, report: LinkReport) -> None:
+    """Write one JSON line per article with its suggested links."""
+    file_path = Path(path)
+    tmp_path = file_path.with_name(f".{file_path.name}.{os.getpid()}.tmp")
+    with tmp_path.open("w", encoding="utf-8") as handle:
+        for name, related in report.suggestions.items():
+            record = {
+                "path": name,
+                "title": report.titles.get(name, ""),
+                "links": [
+                    {"path": other, "title": report.titles.get(other, ""), "score": round(score, 4)}
+                    for other, score in related
+                ],
+            }
+            handle.write(json.dumps(record, ensure_ascii=True) + "\n")
+    os.replace(tmp_path, file_path)
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Iterator
+
+from .topics import TopicRow
+
+MANIFEST_NAME = "manifest.jsonl"
+RETRY_NAME = "retry.jsonl"
+
+_WRITE_LOCK = threading.Lock()
+
+
+def manifest_path(out_dir: str | Path) -> Path:
+    return Path(out_dir) / MANIFEST_NAME
+
+
+def append_manifest(out_dir: str | Path, record: dict) -> None:
+    """Append one JSON record to the output directory's manifest."""
+    path = manifest_path(out_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    line = json.dumps(record, ensure_ascii=True, sort_keys=True)
+    with _WRITE_LOCK:
+        with path.open("a", encoding="utf-8") as handle:
+            handle.write(line + "\n")
+
+
+def write_manifest(out_dir: str | Path, records: list[dict]) -> None:
+    """Replace the output directory's manifest with ``records``, atomically."""
+    path = manifest_path(out_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with _WRITE_LOCK:
+        with tmp_path.open("w", encoding="utf-8") as handle:
+            for record in records:
+                handle.write(json.dumps(record, ensure_ascii=True, sort_keys=True) + "\n")
+        os.replace(tmp_path, path)
+
+
+def latest_records(records: list[dict]) -> list[dict]:
+    """Collapse manifest records to the ones that still matter for each slug.
+
+    Keeps each slug's last record, plus its last ``ok`` record when a later
+    attempt did not succeed (that article is still on disk), in file order.
+    Records without a slug are dropped.
+    """
+    last: dict[str, int] = {}
+    last_ok: dict[str, int] = {}
+    for n, record in enumerate(records):
+        slug = record.get("slug")
+        if not slug:
+            continue
+        last[slug] = n
+        if record.get("status") == "ok":
+            last_ok[slug] = n
+    keep = set(last.values()) | set(last_ok.values())
+    return [record for n, record in enumerate(records) if n in keep]
+
+
+def compact_manifest(out_dir: str | Path) -> None:
+    """Rewrite the manifest with :func:`latest_records`, if that shrinks it.
+
+    Runs append to the manifest, so ``batch`` and ``watch`` compact it when
+    they start; it stays bounded by the number of slugs rather than runs.
+    """
+    records = list(read_manifest(out_dir))
+    kept = latest_records(records)
+    if len(kept) < len(records):
+        write_manifest(out_dir, kept)
+
+
+def append_retry(out_dir: str | Path, row: TopicRow) -> Path:
+    """Record a topic that was not attempted, as a JSONL topics row."""
+    path = Path(out_dir) / RETRY_NAME
+    path.parent.mkdir(parents=True, exist_ok=True)
+    record = {
+        "topic": row.topic,
+        "words": row.words,
+        "tone": row.tone,
+        "audience": row.audience,
+        "country": row.country,
+    }
+    if row.model:
+        record["model"] = row.model
+    with _WRITE_LOCK:
+        with path.open("a", encoding="utf-8") as handle:
+            handle.write(json.dumps(record, ensure_ascii=True) + "\n")
+    return path
+
+
+def read_manifest(path: str | Path) -> Iterator[dict]:
+    """Yield manifest records, skipping blank or truncated lines."""
+    file_path = Path(path)
+    if file_path.is_dir():
+        file_path = file_path / MANIFEST_NAME
+    if not file_path.exists():
+        return
+    with file_path.open("r", encoding="utf-8") as handle:
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(record, dict):
+                yield record
@@ -23,7 +23,8 @@ class OutlineDoc:
     sections: list[OutlineSection]
 
 
-def _parse_frontmatter(lines: list[str]) -> tuple[dict[str, str], int]:
+def parse_frontmatter(lines: list[str]) -> tuple[dict[str, str], int]:
+    """Parse a leading ``---`` block; returns its fields and the body's first line."""
     if not lines or lines[0].strip() != "---":
         return {}, 0
     end = None
@@ -34,8 +35,12 @@ def _parse_frontmatter(lines: list[str]) -> tuple[dict[str, str], int]:
     if end is None:
         raise OutlineParseError("Frontmatter started but not closed")
 
+    return _frontmatter_fields(lines[1:end]), end + 1
+
+
+def _frontmatter_fields(lines: list[str]) -> dict[str, str]:
     fm: dict[str, str] = {}
-    for line in lines[1:end]:
+    for line in lines:
         if not line.strip() or ":" not in line:
             continue
         key, value = line.split(":", 1)
@@ -47,7 +52,34 @@ def _parse_frontmatter(lines: list[str]) -> tuple[dict[str, str], int]:
             except Exception:
                 pass
         fm[key] = value
-    return fm, end + 1
+    return fm
+
+
+def read_frontmatter(path: str | Path, max_bytes: int = 65536) -> dict[str, str]:
+    """Read only the leading ``---`` block of a file.
+
+    The file is read line by line and reading stops at the closing
+    delimiter, so the body is never loaded. Returns ``{}`` when the file has
+    no frontmatter; raises if the block is not closed within ``max_bytes``.
+    """
+    file_path = Path(path)
+    try:
+        handle = file_path.open("r", encoding="utf-8")
+    except FileNotFoundError as exc:
+        raise OutlineParseError(f"File not found: {file_path}") from exc
+    with handle:
+        if handle.readline(max_bytes).strip() != "---":
+            return {}
+        lines: list[str] = []
+        read = 0
+        for line in handle:
+            if line.strip() == "---":
+                return _frontmatter_fields(lines)
+            read += len(line)
+            if read > max_bytes:
+                break
+            lines.append(line)
+    raise OutlineParseError("Frontmatter started but not closed")
 
 
 def parse_outline_file(path: str | Path) -> OutlineDoc:
@@ -58,7 +90,7 @@ def parse_outline_file(path: str | Path) -> OutlineDoc:
     text = file_path.read_text(encoding="utf-8")
     lines = text.splitlines()
 
-    frontmatter, start_idx = _parse_frontmatter(lines)
+    frontmatter, start_idx = parse_frontmatter(lines)
 
     title = None
     sections: list[OutlineSection] = []
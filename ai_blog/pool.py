@@ -0,0 +1,348 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Awaitable, Callable, TypeVar
+
+from .errors import OpenAIAuthError, OpenAIRateLimitError
+from .metrics import metrics
+from .waiters import AsyncWaiters
+
+T = TypeVar("T")
+
+
+class PoolConfigError(ValueError):
+    """Raised when a provider pool file is invalid."""
+
+
+@dataclass
+class PoolMember:
+    """One OpenAI-compatible endpoint/key and its live load and health."""
+
+    name: str
+    base_url: str | None = None
+    api_key: str | None = None
+    api_key_env: str | None = None
+    organization: str | None = None
+    weight: float = 1.0
+    max_in_flight: int | None = None
+    rpm: float | None = None
+    client: object | None = field(default=None, repr=False)
+    async_client: object | None = field(default=None, repr=False)
+
+    in_flight: int = field(default=0, init=False)
+    consecutive_failures: int = field(default=0, init=False)
+    unhealthy_until: float = field(default=0.0, init=False)
+    disabled: bool = field(default=False, init=False)
+    _tokens: float = field(default=0.0, init=False, repr=False)
+    _refilled_at: float | None = field(default=None, init=False, repr=False)
+
+    def _client_options(self) -> dict:
+        api_key = self.api_key
+        if api_key is None and self.api_key_env:
+            api_key = os.getenv(self.api_key_env)
+        return {"api_key": api_key, "base_url": self.base_url, "organization": self.organization}
+
+    def get_client(self):
+        if self.client is None:
+            try:
+                from openai import OpenAI
+            except Exception as exc:
+                raise RuntimeError("OpenAI SDK not available. Install openai.") from exc
+            self.client = OpenAI(**self._client_options())
+        return self.client
+
+    def get_async_client(self):
+        if self.async_client is None:
+            try:
+                from openai import AsyncOpenAI
+            except Exception as exc:
+                raise RuntimeError("OpenAI SDK not available. Install openai.") from exc
+            self.async_client = AsyncOpenAI(**self._client_options())
+        return self.async_client
+
+    def _refill(self, now: float) -> None:
+        if self.rpm is None:
+            return
+        per_second = self.rpm / 60.0
+        burst = max(1.0, per_second)
+        if self._refilled_at is None:
+            self._tokens = burst
+        else:
+            self._tokens = min(burst, self._tokens + (now - self._refilled_at) * per_second)
+        self._refilled_at = now
+
+    def _ready_at(self, now: float) -> float:
+        """Earliest time this member can take another request."""
+        if self.disabled:
+            return float("inf")
+        ready = max(now, self.unhealthy_until)
+        if self.rpm is not None and self._tokens < 1:
+            ready = max(ready, now + (1 - self._tokens) * 60.0 / self.rpm)
+        return ready
+
+    def _available(self, now: float) -> bool:
+        if self.max_in_flight is not None and self.in_flight >= self.max_in_flight:
+            return False
+        return self._ready_at(now) <= now
+
+
+class ProviderPool:
+    """Spread requests over several OpenAI-compatible endpoints or API keys.
+
+    Each call goes to the healthy member with the lowest in-flight load
+    relative to its ``weight`` that is under its ``max_in_flight`` and
+    ``rpm`` limits; callers block until one is free. A member that returns
+    a rate-limit error is cooled down and the request is retried on another
+    member. ``failure_threshold`` consecutive errors of any other kind take
+    a member out for ``cooldown`` seconds, doubling while it keeps failing.
+    """
+
+    def __init__(
+        self,
+        members: list[PoolMember],
+        failure_threshold: int = 3,
+        cooldown: float = 30.0,
+        max_cooldown: float = 600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if not members:
+            raise PoolConfigError("A provider pool needs at least one member")
+        names = [member.name for member in members]
+        if len(set(names)) != len(names):
+            raise PoolConfigError("Provider pool member names must be unique")
+        self.members = members
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._waiters = AsyncWaiters(self._cond)
+
+    def _reserve(self, exclude: set[str]) -> PoolMember | float | None:
+        """Reserve a member, or return how long to wait (``None``: until notified).
+
+        The caller holds ``_cond``.
+        """
+        now = self._clock()
+        candidates = []
+        for member in self.members:
+            if member.name in exclude:
+                continue
+            member._refill(now)
+            if member._available(now):
+                candidates.append(member)
+        if candidates:
+            member = min(candidates, key=lambda m: (m.in_flight + 1) / m.weight)
+            member.in_flight += 1
+            if member.rpm is not None:
+                member._tokens -= 1
+            metrics.set(f"pool.{member.name}.in_flight", member.in_flight)
+            return member
+        usable = [m for m in self.members if m.name not in exclude and not m.disabled]
+        if not usable:
+            raise OpenAIAuthError("No usable provider pool members")
+        ready = min(m._ready_at(now) for m in usable)
+        return max(0.01, ready - now) if ready > now else None
+
+    def _exhausted(self, tried: set[str]) -> bool:
+        """Whether every member has been tried or disabled by an auth failure."""
+        with self._cond:
+            return all(m.name in tried or m.disabled for m in self.members)
+
+    def acquire(self, exclude: set[str] = frozenset()) -> PoolMember:
+        """Block until a member can take a request, and reserve it."""
+        with self._cond:
+            while True:
+                reserved = self._reserve(exclude)
+                if isinstance(reserved, PoolMember):
+                    return reserved
+                self._cond.wait(timeout=reserved)
+
+    async def aacquire(self, exclude: set[str] = frozenset()) -> PoolMember:
+        """Async :meth:`acquire`: waits in line without blocking the event loop.
+
+        Only rpm refills and cooldowns are waited out on a timer; otherwise
+        a task sleeps until :meth:`release` wakes it.
+        """
+        first = False
+        while True:
+            with self._cond:
+                reserved = None if self._waiters and not first else self._reserve(exclude)
+                if isinstance(reserved, PoolMember):
+                    if self._waiters:
+                        # Capacity may be left for the next task in line.
+                        self._waiters.wake()
+                    return reserved
+                future = self._waiters.add(first)
+            await self._waiters.wait(future, timeout=reserved)
+            first = True
+
+    def release(
+        self,
+        member: PoolMember,
+        ok: bool,
+        rate_limited: bool = False,
+        auth_failed: bool = False,
+    ) -> None:
+        with self._cond:
+            member.in_flight -= 1
+            metrics.set(f"pool.{member.name}.in_flight", member.in_flight)
+            if ok:
+                member.consecutive_failures = 0
+            elif auth_failed:
+                member.disabled = True
+            elif rate_limited:
+                member.unhealthy_until = self._clock() + self.cooldown
+            else:
+                member.consecutive_failures += 1
+                over = member.consecutive_failures - self.failure_threshold
+                if over >= 0:
+                    delay = min(self.cooldown * (2 ** over), self.max_cooldown)
+                    member.unhealthy_until = self._clock() + delay
+            self._cond.notify_all()
+            self._waiters.wake()
+
+    def call(self, fn: Callable[[object], T]) -> T:
+        """Run ``fn(client)`` on the least-loaded member, failing over on 429s."""
+        tried: set[str] = set()
+        rate_error: OpenAIRateLimitError | None = None
+        while True:
+            try:
+                member = self.acquire(exclude=tried)
+            except OpenAIAuthError:
+                # Every member left was disabled while we waited.
+                if rate_error is not None:
+                    raise rate_error from None
+                raise
+            metrics.inc(f"pool.{member.name}.calls")
+            try:
+                result = fn(member.get_client())
+            except (OpenAIRateLimitError, OpenAIAuthError) as exc:
+                rate_limited = isinstance(exc, OpenAIRateLimitError)
+                self.release(
+                    member,
+                    ok=False,
+                    rate_limited=rate_limited,
+                    auth_failed=not rate_limited,
+                )
+                metrics.inc(f"pool.{member.name}.failures")
+                if rate_limited:
+                    rate_error = exc
+                tried.add(member.name)
+                if self._exhausted(tried):
+                    # Quota exhaustion is the real cause when any member hit it.
+                    if rate_error is not None:
+                        raise rate_error
+                    raise
+                continue
+            except BaseException:
+                self.release(member, ok=False)
+                metrics.inc(f"pool.{member.name}.failures")
+                raise
+            self.release(member, ok=True)
+            return result
+
+    async def acall(self, fn: Callable[[object], Awaitable[T]]) -> T:
+        """Async :meth:`call`; ``fn`` gets the member's AsyncOpenAI client."""
+        tried: set[str] = set()
+        rate_error: OpenAIRateLimitError | None = None
+        while True:
+            try:
+                member = await self.aacquire(exclude=tried)
+            except OpenAIAuthError:
+                # Every member left was disabled while we waited.
+                if rate_error is not None:
+                    raise rate_error from None
+                raise
+            metrics.inc(f"pool.{member.name}.calls")
+            try:
+                result = await fn(member.get_async_client())
+            except (OpenAIRateLimitError, OpenAIAuthError) as exc:
+                rate_limited = isinstance(exc, OpenAIRateLimitError)
+                self.release(
+                    member,
+                    ok=False,
+                    rate_limited=rate_limited,
+                    auth_failed=not rate_limited,
+                )
+                metrics.inc(f"pool.{member.name}.failures")
+                if rate_limited:
+                    rate_error = exc
+                tried.add(member.name)
+                if self._exhausted(tried):
+                    # Quota exhaustion is the real cause when any member hit it.
+                    if rate_error is not None:
+                        raise rate_error
+                    raise
+                continue
+            except BaseException:
+                self.release(member, ok=False)
+                metrics.inc(f"pool.{member.name}.failures")
+                raise
+            self.release(member, ok=True)
+            return result
+
+    def snapshot(self) -> list[dict]:
+        now = self._clock()
+        with self._cond:
+            return [
+                {
+                    "name": m.name,
+                    "in_flight": m.in_flight,
+                    "healthy": not m.disabled and m.unhealthy_until <= now,
+                    "consecutive_failures": m.consecutive_failures,
+                }
+                for m in self.members
+            ]
+
+
+_MEMBER_FIELDS = (
+    "name",
+    "base_url",
+    "api_key",
+    "api_key_env",
+    "organization",
+    "weight",
+    "max_in_flight",
+    "rpm",
+)
+
+
+def load_pool(path: str | Path) -> ProviderPool:
+    """Load a pool from JSON: ``{"members": [{"name": ..., ...}], "cooldown": 30}``."""
+    file_path = Path(path)
+    try:
+        data = json.loads(file_path.read_text(encoding="utf-8"))
+    except FileNotFoundError as exc:
+        raise PoolConfigError(f"Pool file not found: {file_path}") from exc
+    except json.JSONDecodeError as exc:
+        raise PoolConfigError(f"Invalid pool file {file_path}: {exc.msg}") from exc
+    if isinstance(data, list):
+        data = {"members": data}
+    if not isinstance(data, dict) or not isinstance(data.get("members"), list):
+        raise PoolConfigError("Pool file must contain a 'members' list")
+
+    members = []
+    for i, raw in enumerate(data["members"], start=1):
+        if not isinstance(raw, dict):
+            raise PoolConfigError(f"Pool member {i} must be an object")
+        unknown = set(raw) - set(_MEMBER_FIELDS)
+        if unknown:
+            raise PoolConfigError(f"Pool member {i}: unknown fields {sorted(unknown)}")
+        config = dict(raw)
+        config.setdefault("name", config.get("base_url") or f"member-{i}")
+        if float(config.get("weight", 1.0)) <= 0:
+            raise PoolConfigError(f"Pool member {i}: weight must be positive")
+        members.append(PoolMember(**config))
+
+    options = {
+        key: data[key]
+        for key in ("failure_threshold", "cooldown", "max_cooldown")
+        if key in data
+    }
+    return ProviderPool(members, **options)
@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from .hedge import LatencyTracker
+
+
+@dataclass
+class ProgressSnapshot:
+    elapsed: float
+    total: int | None
+    completed: int
+    failed: int
+    skipped: int
+    in_flight: int
+    per_minute: float
+    tokens_per_minute: float
+    p50: float | None
+    p95: float | None
+    eta: float | None
+
+    @property
+    def done(self) -> int:
+        return self.completed + self.failed + self.skipped
+
+
+def _duration(seconds: float | None) -> str:
+    if seconds is None:
+        return "-"
+    seconds = int(round(seconds))
+    if seconds >= 3600:
+        return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m {seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+def format_snapshot(snap: ProgressSnapshot) -> str:
+    """One-line summary, used for plain logs and under the live bar."""
+    of = f"/{snap.total}" if snap.total is not None else ""
+    latency = (
+        f"p50 {snap.p50:.1f}s p95 {snap.p95:.1f}s" if snap.p50 is not None else "p50 - p95 -"
+    )
+    return (
+        f"{snap.completed}{of} done, {snap.failed} failed, {snap.in_flight} running, "
+        f"{snap.skipped} skipped | {snap.per_minute:.1f} articles/min, "
+        f"{snap.tokens_per_minute:.0f} tokens/min | {latency} | "
+        f"elapsed {_duration(snap.elapsed)}, ETA {_duration(snap.eta)}"
+    )
+
+
+class BatchStats:
+    """Thread-safe tallies for a running batch.
+
+    ``start(item)`` is called when an article begins and ``finish(item,
+    outcome, tokens)`` when its result is reported; the time in between is
+    the article's latency. Topics that never start (up to date, another
+    shard, over budget) are counted with :meth:`skip`. ``total`` is the
+    number of topics in the feed, when known, and enables the ETA; it can
+    be filled in later with :meth:`count_total`.
+    """
+
+    def __init__(
+        self,
+        total: int | None = None,
+        window: int = 500,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.total = total
+        self._clock = clock
+        self._began = clock()
+        self._lock = threading.Lock()
+        self._started: dict[int, float] = {}
+        self._latency = LatencyTracker(window)
+        self.completed = 0
+        self.failed = 0
+        self.skipped = 0
+        self.tokens = 0
+
+    def start(self, item) -> None:
+        with self._lock:
+            self._started[id(item)] = self._clock()
+
+    def finish(self, item, outcome: str = "ok", tokens: int = 0) -> None:
+        """Record a result; ``outcome`` is "ok", "failed" or "skipped"."""
+        now = self._clock()
+        with self._lock:
+            began = self._started.pop(id(item), None)
+            if outcome == "ok":
+                self.completed += 1
+            elif outcome == "failed":
+                self.failed += 1
+            else:
+                self.skipped += 1
+            self.tokens += tokens
+        if began is not None and outcome != "skipped":
+            self._latency.record(now - began)
+
+    def skip(self, count: int = 1) -> None:
+        with self._lock:
+            self.skipped += count
+
+    def count_total(self, count: Callable[[], int]) -> threading.Thread:
+        """Set ``total`` from ``count()`` on a background thread.
+
+        The batch does not wait for the count, so a long feed starts at
+        once and the ETA appears when the count finishes. If ``count``
+        raises, ``total`` stays unknown; the batch reports the error itself
+        when it reaches the bad row.
+        """
+
+        def run() -> None:
+            try:
+                total = count()
+            except Exception:
+                return
+            with self._lock:
+                self.total = total
+
+        thread = threading.Thread(target=run, name="ai-blog-count", daemon=True)
+        thread.start()
+        return thread
+
+    def snapshot(self) -> ProgressSnapshot:
+        now = self._clock()
+        with self._lock:
+            completed, failed, skipped = self.completed, self.failed, self.skipped
+            in_flight = len(self._started)
+            tokens = self.tokens
+            total = self.total
+        elapsed = max(now - self._began, 1e-9)
+        finished = completed + failed
+        eta = None
+        if total is not None and finished:
+            remaining = max(total - finished - skipped, 0)
+            eta = remaining * elapsed / finished
+        return ProgressSnapshot(
+            elapsed=elapsed,
+            total=total,
+            completed=completed,
+            failed=failed,
+            skipped=skipped,
+            in_flight=in_flight,
+            per_minute=finished * 60 / elapsed,
+            tokens_per_minute=tokens * 60 / elapsed,
+            p50=self._latency.percentile(0.5),
+            p95=self._latency.percentile(0.95),
+            eta=eta,
+        )
+
+
+class BatchProgress:
+    """Show :class:`BatchStats` while a batch runs.
+
+    With ``live`` a rich progress display is redrawn ``refresh`` times a
+    second from rich's own thread, so workers never wait on rendering.
+    Otherwise (cron, pipes) ``log`` gets one plain line every ``interval``
+    seconds and a last one on exit. rich is only imported for the live
+    display.
+    """
+
+    def __init__(
+        self,
+        stats: BatchStats,
+        console=None,
+        live: bool = False,
+        log: Callable[[str], None] = print,
+        interval: float = 30.0,
+        refresh: float = 2.0,
+    ):
+        self.stats = stats
+        self.console = console
+        self.live = live
+        self.log = log
+        self.interval = interval
+        self.refresh = refresh
+        self._display = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _render(self):
+        from rich.console import Group
+        from rich.progress_bar import ProgressBar
+        from rich.text import Text
+
+        snap = self.stats.snapshot()
+        line = Text(format_snapshot(snap), style="cyan")
+        if snap.total is None:
+            return line
+        bar = ProgressBar(total=max(snap.total, 1), completed=min(snap.done, snap.total))
+        return Group(bar, line)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.log(format_snapshot(self.stats.snapshot()))
+
+    def __enter__(self) -> BatchProgress:
+        if self.live:
+            from rich.live import Live
+
+            self._display = Live(
+                console=self.console,
+                refresh_per_second=self.refresh,
+                get_renderable=self._render,
+            )
+            self._display.start()
+        elif self.interval > 0:
+            self._thread = threading.Thread(
+                target=self._run, name="ai-blog-progress", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self._display is not None:
+            self._display.stop()
+            self._display = None
+            return
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.log(format_snapshot(self.stats.snapshot()))
@@ -1,19 +1,21 @@
+# Prompts are laid out static-first: the system message and the fixed
+# instructions come before any per-topic values, so requests in a batch share
+# the longest possible prefix. The shared prefix is only about 200 tokens,
+# below OpenAI's 1024-token minimum for prompt caching, so today nothing is
+# cached; the layout only pays off with providers that cache shorter
+# prefixes, or if the instructions grow past the minimum. Padding them to
+# qualify would cost more than the cache discount saves. Keep variable fields
+# at the end when editing these templates.
+
 SYSTEM_MESSAGE = (
     "You are an expert SEO writer and editor. "
     "You write clear, factual, and helpful blog posts in Markdown. "
     "Follow structure requirements exactly."
 )
 
-
-def blog_user_prompt(topic, words, tone, audience, country):
-    return f"""
-Write a complete SEO-friendly blog post in Markdown.
-
-Topic: {topic}
-Target words: {words}
-Tone: {tone}
-Audience: {audience}
-Country: {country}
+BLOG_INSTRUCTIONS = """
+Write a complete SEO-friendly blog post in Markdown for the topic and settings
+given at the end of this message.
 
 OUTPUT REQUIREMENTS (STRICT ORDER):
 1) H1 title
@@ -35,15 +37,27 @@ BODY:
 Ensure the body contains at least 5 H2 headings and FAQs have at least 5 Q/A pairs.
 """.strip()
 
+BLOG_JSON_INSTRUCTIONS = """
+Write a complete SEO-friendly blog post for the topic and settings given at
+the end of this message, as a JSON object matching the response schema.
 
-def outline_user_prompt(topic, tone, audience, country):
-    return f"""
-Create a concise blog outline in Markdown for the topic below.
+Fields:
+- title: the post title (plain text)
+- meta: meta description, 155 chars max
+- intro: short intro, 2-4 paragraphs of Markdown without headings
+- quick_answer: 3-6 bullet points answering the topic directly (plain text)
+- sections: 5-8 sections, each with a heading (plain text, no "#") and useful
+  Markdown content that uses no H1 or H2 headings
+- checklist: decision checklist bullet points (plain text)
+- faqs: 5-8 question/answer pairs (plain text)
+- conclusion: 1-2 short paragraphs with a CTA in the last paragraph
 
-Topic: {topic}
-Tone: {tone}
-Audience: {audience}
-Country: {country}
+Return ONLY the JSON object.
+""".strip()
+
+OUTLINE_INSTRUCTIONS = """
+Create a concise blog outline in Markdown for the topic given at the end of
+this message.
 
 Output a Markdown outline with:
 - H1 title
@@ -58,11 +72,112 @@ BODY:
 <markdown outline>
 """.strip()
 
+REPAIR_INSTRUCTIONS = """
+Fix the Markdown body at the end of this message to resolve the listed
+formatting issues.
+
+Rules:
+- Keep existing content where possible.
+- Ensure at least 5 H2 headings.
+- Ensure the FAQs section has 5-8 Q/A pairs in Q:/A: format.
+- Do not include frontmatter, title line, or meta description.
+
+Return ONLY the corrected Markdown body (no extra labels).
+""".strip()
+
+FINISH_INSTRUCTIONS = """
+The blog post at the end of this message was cut short to stay within its
+word budget. Write ONLY the closing H2 sections listed below it, in that order,
+so the post ends properly. Do not repeat or continue earlier sections.
+
+Section rules:
+- "Decision checklist": bullet points.
+- "FAQs": 5-8 Q/A pairs in this format:
+  Q: ...
+  A: ...
+- "Conclusion": 1-2 short paragraphs with a CTA in the last paragraph.
+
+Return ONLY the Markdown for those sections, each starting with its "## " heading.
+""".strip()
+
+EXPAND_INSTRUCTIONS = """
+Expand the section given at the end of this message into a clear,
+SEO-friendly Markdown section.
+
+Requirements:
+- Output Markdown only.
+- Start with the exact H2 heading line given below on the first line.
+- 2-4 short paragraphs plus an optional bullet list.
+- Keep it concise and practical.
+""".strip()
+
+ADAPT_INSTRUCTIONS = """
+Adapt the Markdown taken from an existing blog post, given at the end of this
+message, for the target country, audience and language listed below it.
+
+Rules:
+- Keep the heading levels, structure, bullet lists and the Q:/A: format.
+- Change examples, prices, currencies, retailers, regulations and wording so
+  they fit the target country and audience.
+- If a target language is given, translate everything except the "Q:" and
+  "A:" labels and the "## FAQs" heading.
+- Keep roughly the same length. Do not add new sections.
+""".strip()
+
+ADAPT_HEAD_FORMAT = """
+This part is the start of the post. Adapt the title and meta description too.
+
+Return EXACTLY in this format:
+TITLE: <title>
+META: <meta description, 155 chars max>
+BODY:
+<adapted markdown>
+""".strip()
+
+ADAPT_SECTION_FORMAT = """
+Return ONLY the adapted Markdown section, starting with its heading line.
+""".strip()
+
+
+def blog_user_prompt(topic, words, tone, audience, country):
+    return f"""
+{BLOG_INSTRUCTIONS}
+
+Topic: {topic}
+Target words: {words}
+Tone: {tone}
+Audience: {audience}
+Country: {country}
+""".strip()
+
+
+def blog_json_user_prompt(topic, words, tone, audience, country):
+    return f"""
+{BLOG_JSON_INSTRUCTIONS}
+
+Topic: {topic}
+Target words: {words}
+Tone: {tone}
+Audience: {audience}
+Country: {country}
+""".strip()
+
+
+def outline_user_prompt(topic, tone, audience, country):
+    return f"""
+{OUTLINE_INSTRUCTIONS}
+
+Topic: {topic}
+Tone: {tone}
+Audience: {audience}
+Country: {country}
+""".strip()
+
 
 def repair_user_prompt(topic, words, tone, audience, country, issues, body):
     issues_str = "\n".join(f"- {i}" for i in issues)
     return f"""
-Fix the Markdown body to resolve the formatting issues below.
+{REPAIR_INSTRUCTIONS}
 
 Topic: {topic}
 Target words: {words}
@@ -73,15 +188,25 @@ Country: {country}
 Issues:
 {issues_str}
 
-Rules:
-- Keep existing content where possible.
-- Ensure at least 5 H2 headings.
-- Ensure the FAQs section has 5-8 Q/A pairs in Q:/A: format.
-- Do not include frontmatter, title line, or meta description.
+BODY TO FIX:
+{body}
+""".strip()
 
-Return ONLY the corrected Markdown body (no extra labels).
 
-BODY TO FIX:
+def finish_user_prompt(topic, tone, audience, country, sections, body):
+    sections_str = "\n".join(f"- {s}" for s in sections)
+    return f"""
+{FINISH_INSTRUCTIONS}
+
+Topic: {topic}
+Tone: {tone}
+Audience: {audience}
+Country: {country}
+
+Sections to write:
+{sections_str}
+
+POST SO FAR:
 {body}
 """.strip()
 
@@ -97,20 +222,48 @@ def expand_user_prompt(
     notes = "\n".join(section_body_lines).strip() or "No additional notes."
     topic_line = f"Topic: {topic}" if topic else "Topic: (not provided)"
     return f"""
-Expand the section below into a clear, SEO-friendly Markdown section.
+{EXPAND_INSTRUCTIONS}
 
 {topic_line}
 Tone: {tone}
 Audience: {audience}
 Country: {country}
 
-Section heading: {section_heading}
+Heading line: ## {section_heading}
 Section notes:
 {notes}
+""".strip()
 
-Requirements:
-- Output Markdown only.
-- Start with \"## {section_heading}\" on the first line.
-- 2-4 short paragraphs plus an optional bullet list.
-- Keep it concise and practical.
+
+def adapt_user_prompt(
+    text,
+    topic,
+    tone,
+    from_country,
+    from_audience,
+    country,
+    audience,
+    language=None,
+    title=None,
+    meta=None,
+):
+    head = title is not None
+    fmt = ADAPT_HEAD_FORMAT if head else ADAPT_SECTION_FORMAT
+    language_line = f"Target language: {language}" if language else "Target language: unchanged"
+    head_lines = f"Original title: {title}\nOriginal meta: {meta}\n\n" if head else ""
+    return f"""
+{ADAPT_INSTRUCTIONS}
+
+{fmt}
+
+Topic: {topic}
+Tone: {tone}
+Original country: {from_country}
+Original audience: {from_audience}
+Target country: {country}
+Target audience: {audience}
+{language_line}
+
+{head_lines}MARKDOWN TO ADAPT:
+{text}
 """.strip()
@@ -0,0 +1,383 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+from .errors import (
+    CircuitOpenError,
+    MockDryRunRegressionError,
+    OpenAIAuthError,
+    OpenAIRateLimitError,
+)
+from .generator import (
+    Article,
+    openai_client,
+    expand_section,
+    generate_article,
+    generate_outline,
+)
+from .metrics import metrics
+from .outline_parse import OutlineParseError, get_section, parse_outline_file
+from .topics import TopicRow, TopicsParseError, row_from_record
+
+
+class RequestError(Exception):
+    """Raised for invalid API requests; carries the HTTP status to return."""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass
+class Defaults:
+    words: int = 1200
+    tone: str = "friendly"
+    audience: str = "beginners"
+    country: str = "India"
+    model: str = "gpt-4o-mini"
+
+
+@dataclass
+class Job:
+    id: str
+    total: int
+    status: str = "queued"
+    done: int = 0
+    failed: int = 0
+    results: list[dict] = field(default_factory=list)
+    created_at: float = field(default_factory=time.time)
+    finished_at: float | None = None
+
+
+def _article_json(article: Article, include_body: bool = True) -> dict:
+    data = {
+        "title": article.title,
+        "slug": article.slug,
+        "meta_description": article.meta_description,
+        "path": article.path,
+        "usage": asdict(article.usage),
+    }
+    if include_body:
+        data["body"] = article.body
+    return data
+
+
+class GenerationService:
+    """Long-lived state shared by every request: warm client and worker pool.
+
+    Generation work runs on a fixed pool of ``workers`` threads, so at most
+    that many provider calls are in flight; extra requests and batch jobs
+    wait in the pool's queue. Finished jobs are kept for ``job_ttl`` seconds,
+    and at most ``max_jobs`` of them, so polling clients can collect results
+    without the job table growing for the life of the process.
+    """
+
+    def __init__(
+        self,
+        out_dir: str | Path,
+        defaults: Defaults | None = None,
+        provider: str = "openai",
+        dry_run: bool = False,
+        workers: int = 4,
+        client: object | None = None,
+        job_ttl: float = 3600.0,
+        max_jobs: int = 1000,
+    ):
+        self.out_dir = str(out_dir)
+        self.defaults = defaults or Defaults()
+        self.provider = provider
+        self.dry_run = dry_run
+        if client is None and provider == "openai" and not dry_run:
+            client = openai_client()
+        self.client = client
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ai-blog")
+        self._jobs: dict[str, Job] = {}
+        self._jobs_lock = threading.Lock()
+        self._outstanding = 0
+        self.job_ttl = job_ttl
+        self.max_jobs = max_jobs
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _row(self, payload: dict) -> TopicRow:
+        d = self.defaults
+        try:
+            row = row_from_record(payload, d.words, d.tone, d.audience, d.country, d.model)
+        except TopicsParseError as exc:
+            raise RequestError(str(exc)) from exc
+        if row is None:
+            raise RequestError("'topic' is required")
+        return row
+
+    def _outline_path(self, name) -> Path:
+        """Resolve an outline file name inside ``out_dir``; nothing outside it."""
+        if not isinstance(name, str) or Path(name).is_absolute():
+            raise RequestError("'outline' must be a path relative to the output directory")
+        root = Path(self.out_dir).resolve()
+        path = (root / name).resolve()
+        if not path.is_relative_to(root):
+            raise RequestError("'outline' must be inside the output directory")
+        return path
+
+    def _submit(self, fn, *args, **kwargs):
+        with self._jobs_lock:
+            self._outstanding += 1
+            metrics.set("server.outstanding", self._outstanding)
+        future = self._pool.submit(fn, *args, **kwargs)
+        future.add_done_callback(self._finished)
+        return future
+
+    def _finished(self, _future) -> None:
+        with self._jobs_lock:
+            self._outstanding -= 1
+            metrics.set("server.outstanding", self._outstanding)
+
+    def _run(self, name: str, fn, *args, **kwargs):
+        metrics.inc(f"server.{name}.requests")
+        start = time.monotonic()
+        try:
+            return self._submit(fn, *args, **kwargs).result()
+        finally:
+            metrics.observe(f"server.{name}.latency", time.monotonic() - start)
+
+    def _generate_row(self, row: TopicRow) -> Article:
+        return generate_article(
+            topic=row.topic,
+            words=row.words,
+            tone=row.tone,
+            audience=row.audience,
+            country=row.country,
+            out_dir=self.out_dir,
+            model=row.model,
+            provider=self.provider,
+            dry_run=self.dry_run,
+            client=self.client,
+        )
+
+    def generate(self, payload: dict) -> Article:
+        return self._run("generate", self._generate_row, self._row(payload))
+
+    def outline(self, payload: dict) -> Article:
+        row = self._row(payload)
+        return self._run(
+            "outline",
+            generate_outline,
+            topic=row.topic,
+            tone=row.tone,
+            audience=row.audience,
+            country=row.country,
+            out_dir=self.out_dir,
+            model=row.model,
+            provider=self.provider,
+            dry_run=self.dry_run,
+            client=self.client,
+        )
+
+    def expand(self, payload: dict) -> str:
+        d = self.defaults
+        topic = payload.get("topic")
+        if payload.get("outline"):
+            try:
+                doc = parse_outline_file(self._outline_path(payload["outline"]))
+                section = get_section(doc, int(payload.get("section", 0)))
+            except (OutlineParseError, ValueError) as exc:
+                raise RequestError(str(exc)) from exc
+            heading, notes = section.heading, section.body_lines
+            topic = topic or doc.frontmatter.get("topic") or doc.title
+        else:
+            heading = str(payload.get("heading") or "").strip()
+            if not heading:
+                raise RequestError("'heading' or 'outline' and 'section' are required")
+            notes = payload.get("notes") or []
+            if isinstance(notes, str):
+                notes = notes.splitlines()
+        return self._run(
+            "expand",
+            expand_section,
+            section_heading=heading,
+            section_body_lines=list(notes),
+            topic=topic,
+            tone=payload.get("tone") or d.tone,
+            audience=payload.get("audience") or d.audience,
+            country=payload.get("country") or d.country,
+            model=payload.get("model") or d.model,
+            provider=self.provider,
+            dry_run=self.dry_run,
+            client=self.client,
+        )
+
+    def submit_job(self, payload: dict) -> Job:
+        items = payload.get("topics")
+        if not isinstance(items, list) or not items:
+            raise RequestError("'topics' must be a non-empty list")
+        rows = [
+            self._row(item if isinstance(item, dict) else {"topic": item})
+            for item in items
+        ]
+        job = Job(id=uuid.uuid4().hex, total=len(rows))
+        with self._jobs_lock:
+            self._prune_jobs()
+            self._jobs[job.id] = job
+        metrics.inc("server.jobs.submitted")
+        for row in rows:
+            self._submit(self._run_job_row, job, row)
+        return job
+
+    def _prune_jobs(self) -> None:
+        """Drop finished jobs past ``job_ttl`` or beyond ``max_jobs``; lock held."""
+        finished = sorted(
+            (job for job in self._jobs.values() if job.finished_at is not None),
+            key=lambda job: job.finished_at,
+        )
+        cutoff = time.time() - self.job_ttl
+        excess = len(finished) - self.max_jobs
+        for n, job in enumerate(finished):
+            if n < excess or job.finished_at < cutoff:
+                del self._jobs[job.id]
+                metrics.inc("server.jobs.evicted")
+
+    def _run_job_row(self, job: Job, row: TopicRow) -> None:
+        with self._jobs_lock:
+            if job.status == "queued":
+                job.status = "running"
+        try:
+            article = self._generate_row(row)
+            result = {"topic": row.topic, "status": "ok", **_article_json(article, False)}
+        except Exception as exc:
+            result = {"topic": row.topic, "status": "failed", "error": str(exc)}
+        with self._jobs_lock:
+            job.results.append(result)
+            if result["status"] == "ok":
+                job.done += 1
+            else:
+                job.failed += 1
+            if job.done + job.failed == job.total:
+                job.status = "finished"
+                job.finished_at = time.time()
+
+    def job(self, job_id: str) -> dict:
+        with self._jobs_lock:
+            self._prune_jobs()
+            job = self._jobs.get(job_id)
+            if job is None:
+                raise RequestError(f"Unknown job: {job_id}", status=404)
+            return asdict(job)
+
+
+def _error_status(exc: Exception) -> int:
+    if isinstance(exc, RequestError):
+        return exc.status
+    if isinstance(exc, OpenAIRateLimitError):
+        return 429
+    if isinstance(exc, CircuitOpenError):
+        return 503
+    if isinstance(exc, OpenAIAuthError):
+        return 502
+    if isinstance(exc, MockDryRunRegressionError):
+        return 500
+    return 422
+
+
+def make_handler(service: GenerationService):
+    class Handler(BaseHTTPRequestHandler):
+        server_version = "ai-blog"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status: int, body: bytes, content_type: str) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_json(self, status: int, data) -> None:
+            self._send(status, json.dumps(data).encode("utf-8"), "application/json")
+
+        def _send_markdown(self, path: str | None, text: str | None = None) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/markdown; charset=utf-8")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            if path is not None:
+                with open(path, "rb") as handle:
+                    for chunk in iter(lambda: handle.read(16384), b""):
+                        self.wfile.write(chunk)
+            else:
+                self.wfile.write(text.encode("utf-8"))
+            self.close_connection = True
+
+        def _payload(self) -> dict:
+            length = int(self.headers.get("Content-Length") or 0)
+            if not length:
+                return {}
+            try:
+                data = json.loads(self.rfile.read(length))
+            except json.JSONDecodeError as exc:
+                raise RequestError(f"Invalid JSON: {exc.msg}") from exc
+            if not isinstance(data, dict):
+                raise RequestError("Request body must be a JSON object")
+            return data
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            try:
+                if url.path == "/health":
+                    self._send_json(200, {"status": "ok"})
+                elif url.path == "/metrics":
+                    self._send_json(200, metrics.snapshot())
+                elif url.path.startswith("/jobs/"):
+                    self._send_json(200, service.job(url.path[len("/jobs/"):]))
+                else:
+                    self._send_json(404, {"error": "Not found"})
+            except RequestError as exc:
+                self._send_json(exc.status, {"error": str(exc)})
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            markdown = parse_qs(url.query).get("format") == ["markdown"]
+            try:
+                payload = self._payload()
+                if url.path == "/generate":
+                    article = service.generate(payload)
+                    if markdown:
+                        return self._send_markdown(article.path)
+                    self._send_json(200, _article_json(article))
+                elif url.path == "/outline":
+                    article = service.outline(payload)
+                    if markdown:
+                        return self._send_markdown(article.path)
+                    self._send_json(200, _article_json(article))
+                elif url.path == "/expand":
+                    content = service.expand(payload)
+                    if markdown:
+                        return self._send_markdown(None, content)
+                    self._send_json(200, {"content": content})
+                elif url.path == "/jobs":
+                    job = service.submit_job(payload)
+                    self._send_json(202, {"id": job.id, "total": job.total})
+                else:
+                    self._send_json(404, {"error": "Not found"})
+            except Exception as exc:
+                metrics.inc("server.errors")
+                self._send_json(_error_status(exc), {"error": str(exc)})
+
+    return Handler
+
+
+def make_server(
+    service: GenerationService, host: str = "127.0.0.1", port: int = 8000
+) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    server.daemon_threads = True
+    return server
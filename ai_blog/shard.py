@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import hashlib
+import shutil
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .manifest import latest_records, read_manifest, write_manifest
+from .utils import ensure_out_dir
+
+
+class ShardSpecError(ValueError):
+    """Raised when a ``--shard i/N`` value is malformed."""
+
+
+@dataclass(frozen=True)
+class Shard:
+    index: int
+    count: int
+
+    def __str__(self) -> str:
+        return f"{self.index}/{self.count}"
+
+    def owns(self, slug: str) -> bool:
+        return shard_for_slug(slug, self.count) == self.index
+
+
+def parse_shard(spec: str) -> Shard:
+    """Parse ``"i/N"`` (0-based index) into a :class:`Shard`."""
+    try:
+        index_str, count_str = spec.split("/", 1)
+        index, count = int(index_str), int(count_str)
+    except ValueError as exc:
+        raise ShardSpecError(f"Invalid shard {spec!r}; expected i/N, e.g. 0/4") from exc
+    if count < 1 or not 0 <= index < count:
+        raise ShardSpecError(f"Invalid shard {spec!r}; need 0 <= i < N")
+    return Shard(index=index, count=count)
+
+
+def shard_for_slug(slug: str, count: int) -> int:
+    """Stable shard assignment based on a hash of the slug, not line order."""
+    digest = hashlib.sha256(slug.encode("utf-8")).hexdigest()[:16]
+    return int(digest, 16) % count
+
+
+@dataclass
+class MergeReport:
+    merged: int = 0
+    overlaps: dict[str, list[str]] = field(default_factory=dict)
+    failed: list[str] = field(default_factory=list)
+    missing: list[str] = field(default_factory=list)
+    missing_shards: list[str] = field(default_factory=list)
+    bad_shards: list[str] = field(default_factory=list)
+
+
+def _source_records(source: Path) -> list[dict]:
+    """One record per slug: the latest success, else the latest attempt."""
+    by_slug: dict[str, dict] = {}
+    for record in latest_records(list(read_manifest(source))):
+        if record.get("status") == "ok" or record["slug"] not in by_slug:
+            by_slug[record["slug"]] = record
+    if by_slug:
+        return list(by_slug.values())
+    # Directories produced without a manifest still merge by file name.
+    return [
+        {"slug": path.stem, "path": path.name, "status": "ok"}
+        for path in sorted(source.glob("*.md"))
+    ]
+
+
+def merge_outputs(
+    sources: list[Path],
+    dest: Path,
+    expected_slugs: set[str] | None = None,
+) -> MergeReport:
+    """Combine per-shard output directories and manifests into ``dest``.
+
+    The first source to provide a slug wins; copies in other sources are
+    reported as overlaps. Slugs that only ever failed, and expected slugs
+    that no shard produced, are reported as gaps, and unparsable ``shard``
+    values as bad shards. With ``expected_slugs``, shards that own at least
+    one of them but left no records are reported as missing; a shard that
+    owned no topics is not expected to write anything. ``dest``'s manifest
+    is replaced with the merged records.
+    """
+    dest = ensure_out_dir(dest)
+    report = MergeReport()
+    merged: list[dict] = []
+    owner: dict[str, str] = {}
+    failed: dict[str, str] = {}
+    shard_specs: set[str] = set()
+    seen_specs: set[str] = set()
+    shard_count = None
+
+    for source in sources:
+        for record in _source_records(source):
+            slug = record.get("slug")
+            if not slug:
+                continue
+            spec = str(record.get("shard") or "")
+            if spec and spec not in seen_specs:
+                seen_specs.add(spec)
+                try:
+                    shard_count = parse_shard(spec).count
+                    shard_specs.add(spec)
+                except ShardSpecError as exc:
+                    report.bad_shards.append(f"{source}: {exc}")
+            if record.get("status") != "ok":
+                failed.setdefault(slug, str(source))
+                continue
+            if slug in owner:
+                if owner[slug] != str(source):
+                    report.overlaps.setdefault(slug, [owner[slug]]).append(str(source))
+                continue
+            src_file = source / record.get("path", f"{slug}.md")
+            if not src_file.exists():
+                failed.setdefault(slug, str(source))
+                continue
+            target = dest / src_file.name
+            if src_file.resolve() != target.resolve():
+                shutil.copy2(src_file, target)
+            owner[slug] = str(source)
+            merged.append(dict(record, path=target.name, source=str(source)))
+            report.merged += 1
+
+    write_manifest(dest, merged)
+
+    report.failed = sorted(slug for slug in failed if slug not in owner)
+    if expected_slugs is not None:
+        report.missing = sorted(
+            slug for slug in expected_slugs if slug not in owner and slug not in failed
+        )
+    if shard_count is not None and expected_slugs is not None:
+        owners = {shard_for_slug(slug, shard_count) for slug in expected_slugs}
+        report.missing_shards = [
+            f"{i}/{shard_count}"
+            for i in sorted(owners)
+            if f"{i}/{shard_count}" not in shard_specs
+        ]
+    return report
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import json
+import re
+
+from .utils import ParsedOutput
+
+SCHEMA_NAME = "blog_article"
+
+_STRINGS = {"type": "array", "items": {"type": "string"}}
+
+# JSON schema for --structured replies. Every field is required and no
+# extra keys are allowed, as strict structured outputs need. The item
+# counts match BLOG_INSTRUCTIONS (5-8 sections and FAQ pairs).
+ARTICLE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "title": {"type": "string"},
+        "meta": {"type": "string"},
+        "intro": {"type": "string"},
+        "quick_answer": _STRINGS,
+        "sections": {
+            "type": "array",
+            "minItems": 5,
+            "maxItems": 8,
+            "items": {
+                "type": "object",
+                "properties": {
+                    "heading": {"type": "string"},
+                    "content": {"type": "string"},
+                },
+                "required": ["heading", "content"],
+                "additionalProperties": False,
+            },
+        },
+        "checklist": _STRINGS,
+        "faqs": {
+            "type": "array",
+            "minItems": 5,
+            "maxItems": 8,
+            "items": {
+                "type": "object",
+                "properties": {
+                    "question": {"type": "string"},
+                    "answer": {"type": "string"},
+                },
+                "required": ["question", "answer"],
+                "additionalProperties": False,
+            },
+        },
+        "conclusion": {"type": "string"},
+    },
+    "required": [
+        "title",
+        "meta",
+        "intro",
+        "quick_answer",
+        "sections",
+        "checklist",
+        "faqs",
+        "conclusion",
+    ],
+    "additionalProperties": False,
+}
+
+_TOP_HEADING_RE = re.compile(r"^#{1,2}(?=\s)", re.MULTILINE)
+_BULLET_RE = re.compile(r"^\s*(?:[-*+]|\d+[.)])\s+")
+
+
+class StructuredOutputError(ValueError):
+    """Raised when a structured reply is not valid JSON for ARTICLE_SCHEMA."""
+
+
+def _text(data: dict, key: str) -> str:
+    value = data.get(key)
+    if not isinstance(value, str) or not value.strip():
+        raise StructuredOutputError(f"Structured output field {key!r} must be a non-empty string")
+    return value.strip()
+
+
+def _list(data: dict, key: str) -> list:
+    value = data.get(key)
+    if not isinstance(value, list) or not value:
+        raise StructuredOutputError(f"Structured output field {key!r} must be a non-empty list")
+    return value
+
+
+def _content(text: str) -> str:
+    # H1/H2 lines inside a field would break the section structure.
+    return _TOP_HEADING_RE.sub("###", text.strip())
+
+
+def _bullets(items: list) -> str:
+    return "\n".join(f"- {_BULLET_RE.sub('', str(item)).strip()}" for item in items)
+
+
+def _one_line(text: str) -> str:
+    return " ".join(str(text).split())
+
+
+def assemble_markdown(data: dict) -> ParsedOutput:
+    """Build the article Markdown from a structured reply.
+
+    The layout matches BLOG_INSTRUCTIONS, so the H1, the H2 sections and the
+    Q:/A: FAQ lines are in the form validate_body checks for. The counts it
+    checks hold when the endpoint enforces the schema's ``minItems``; a reply
+    with fewer FAQ pairs is assembled as is and repaired like a text reply.
+    """
+    if not isinstance(data, dict):
+        raise StructuredOutputError("Structured output must be a JSON object")
+    title = _one_line(_text(data, "title"))
+    parts = [f"# {title}", _content(_text(data, "intro"))]
+    parts.append(f"## Quick answer\n\n{_bullets(_list(data, 'quick_answer'))}")
+    for section in _list(data, "sections"):
+        if not isinstance(section, dict):
+            raise StructuredOutputError("Each section must be an object")
+        heading = _one_line(_text(section, "heading")).lstrip("# ")
+        parts.append(f"## {heading}\n\n{_content(_text(section, 'content'))}")
+    parts.append(f"## Decision checklist\n\n{_bullets(_list(data, 'checklist'))}")
+    pairs = []
+    for faq in _list(data, "faqs"):
+        if not isinstance(faq, dict):
+            raise StructuredOutputError("Each FAQ must be an object")
+        pairs.append(f"Q: {_one_line(_text(faq, 'question'))}\nA: {_one_line(_text(faq, 'answer'))}")
+    parts.append("## FAQs\n\n" + "\n\n".join(pairs))
+    parts.append(f"## Conclusion\n\n{_content(_text(data, 'conclusion'))}")
+    return ParsedOutput(
+        title=title,
+        meta_description=_one_line(_text(data, "meta")),
+        body="\n\n".join(parts),
+    )
+
+
+def parse_structured(raw: str) -> ParsedOutput:
+    """Parse a JSON reply (optionally in a ```json fence) into an article."""
+    text = raw.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+        text = text.rsplit("```", 1)[0]
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError as exc:
+        raise StructuredOutputError(f"Structured output is not valid JSON: {exc}") from exc
+    return assemble_markdown(data)
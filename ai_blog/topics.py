@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import csv
+import json
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Iterator
+
+FORMATS = ("auto", "txt", "csv", "jsonl")
+OVERRIDE_FIELDS = ("words", "tone", "audience", "country", "model")
+
+
+class TopicsParseError(Exception):
+    """Raised when a topics file or stream cannot be parsed."""
+
+
+@dataclass
+class TopicRow:
+    topic: str
+    words: int
+    tone: str
+    audience: str
+    country: str
+    model: str | None = None
+    line: int = 0
+
+
+def _detect_format(path: Path | None, first_line: str) -> str:
+    if path is not None:
+        suffix = path.suffix.lower()
+        if suffix == ".csv":
+            return "csv"
+        if suffix in {".jsonl", ".ndjson"}:
+            return "jsonl"
+        if suffix == ".txt":
+            return "txt"
+    if first_line.lstrip().startswith("{"):
+        return "jsonl"
+    return "txt"
+
+
+def _peek(stream: IO[str]) -> tuple[str, Iterator[str]]:
+    first = ""
+    for line in stream:
+        first = line
+        break
+
+    def chained() -> Iterator[str]:
+        if first:
+            yield first
+        yield from stream
+
+    return first, chained()
+
+
+def _coerce_words(value: object, line_no: int) -> int:
+    try:
+        words = int(str(value).strip())
+    except ValueError as exc:
+        raise TopicsParseError(f"Line {line_no}: invalid words value {value!r}") from exc
+    if words <= 0:
+        raise TopicsParseError(f"Line {line_no}: words must be positive")
+    return words
+
+
+def row_from_record(
+    record: dict,
+    words: int,
+    tone: str,
+    audience: str,
+    country: str,
+    model: str | None = None,
+    line: int = 0,
+) -> TopicRow | None:
+    """Build a row from a mapping with ``topic`` and optional overrides."""
+    defaults = {
+        "words": words,
+        "tone": tone,
+        "audience": audience,
+        "country": country,
+        "model": model,
+    }
+    return _build_row(record, line, defaults)
+
+
+def _build_row(record: dict, line_no: int, defaults: dict) -> TopicRow | None:
+    topic = str(record.get("topic") or "").strip()
+    if not topic:
+        return None
+    values = dict(defaults)
+    for field in OVERRIDE_FIELDS:
+        raw = record.get(field)
+        if raw is None or str(raw).strip() == "":
+            continue
+        values[field] = (
+            _coerce_words(raw, line_no) if field == "words" else str(raw).strip()
+        )
+    return TopicRow(topic=topic, line=line_no, **values)
+
+
+def _iter_txt(lines: Iterator[str], defaults: dict) -> Iterator[TopicRow]:
+    for line_no, line in enumerate(lines, start=1):
+        topic = line.strip()
+        if not topic or topic.startswith("#"):
+            continue
+        yield TopicRow(topic=topic, line=line_no, **defaults)
+
+
+def _iter_jsonl(lines: Iterator[str], defaults: dict) -> Iterator[TopicRow]:
+    for line_no, line in enumerate(lines, start=1):
+        text = line.strip()
+        if not text or text.startswith("#"):
+            continue
+        try:
+            record = json.loads(text)
+        except json.JSONDecodeError as exc:
+            raise TopicsParseError(f"Line {line_no}: invalid JSON ({exc.msg})") from exc
+        if isinstance(record, str):
+            record = {"topic": record}
+        if not isinstance(record, dict):
+            raise TopicsParseError(f"Line {line_no}: expected a JSON object")
+        row = _build_row(record, line_no, defaults)
+        if row is not None:
+            yield row
+
+
+def _iter_csv(lines: Iterator[str], defaults: dict) -> Iterator[TopicRow]:
+    reader = csv.DictReader(lines)
+    if reader.fieldnames is None:
+        return
+    fields = [name.strip().lower() for name in reader.fieldnames]
+    if "topic" not in fields:
+        raise TopicsParseError("CSV header must include a 'topic' column")
+    reader.fieldnames = fields
+    for record in reader:
+        topic = (record.get("topic") or "").strip()
+        if topic.startswith("#"):
+            continue
+        row = _build_row(record, reader.line_num, defaults)
+        if row is not None:
+            yield row
+
+
+def iter_topic_rows(
+    source: str | Path,
+    words: int,
+    tone: str,
+    audience: str,
+    country: str,
+    model: str | None = None,
+    fmt: str = "auto",
+    stdin: IO[str] | None = None,
+) -> Iterator[TopicRow]:
+    """Lazily yield topic rows from a txt/csv/jsonl file, or stdin for ``-``.
+
+    Rows are read one line at a time so arbitrarily large feeds run in
+    constant memory. CSV and JSONL rows may override ``words``, ``tone``,
+    ``audience``, ``country`` and ``model``; missing values use the defaults.
+    """
+    if fmt not in FORMATS:
+        raise TopicsParseError(f"Unknown topics format: {fmt}")
+    defaults = {
+        "words": words,
+        "tone": tone,
+        "audience": audience,
+        "country": country,
+        "model": model,
+    }
+
+    if str(source) == "-":
+        yield from _iter_stream(stdin or sys.stdin, None, fmt, defaults)
+        return
+
+    path = Path(source)
+    if not path.exists():
+        raise TopicsParseError(f"Topics file not found: {path}")
+    with path.open("r", encoding="utf-8", newline="") as handle:
+        yield from _iter_stream(handle, path, fmt, defaults)
+
+
+def _iter_stream(
+    stream: IO[str], path: Path | None, fmt: str, defaults: dict
+) -> Iterator[TopicRow]:
+    first, lines = _peek(stream)
+    if fmt == "auto":
+        fmt = _detect_format(path, first)
+    if fmt == "csv":
+        yield from _iter_csv(lines, defaults)
+    elif fmt == "jsonl":
+        yield from _iter_jsonl(lines, defaults)
+    else:
+        yield from _iter_txt(lines, defaults)
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+
+# USD per million tokens: (input, cached input, output). Matched by the
+# longest model-name prefix, so dated snapshots use their family's price.
+# Override or extend with AI_BLOG_PRICES='{"model": [in, cached, out]}'.
+PRICES: dict[str, tuple[float, float, float]] = {
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4.1-nano": (0.10, 0.025, 0.40),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "gpt-4.1": (2.00, 0.50, 8.00),
+    "gpt-5-nano": (0.05, 0.005, 0.40),
+    "gpt-5-mini": (0.25, 0.025, 2.00),
+    "gpt-5": (1.25, 0.125, 10.00),
+    "o4-mini": (1.10, 0.275, 4.40),
+}
+
+
+class PriceConfigError(ValueError):
+    """Raised when ``AI_BLOG_PRICES`` is not valid."""
+
+
+@lru_cache(maxsize=4)
+def _price_table(override: str | None) -> dict[str, tuple[float, float, float]]:
+    prices = dict(PRICES)
+    if not override:
+        return prices
+    hint = 'AI_BLOG_PRICES must be a JSON object like {"model": [input, cached, output]}'
+    try:
+        data = json.loads(override)
+    except json.JSONDecodeError as exc:
+        raise PriceConfigError(f"{hint}: {exc.msg}") from exc
+    if not isinstance(data, dict):
+        raise PriceConfigError(hint)
+    for name, value in data.items():
+        if (
+            not isinstance(value, list)
+            or len(value) != 3
+            or not all(isinstance(n, (int, float)) and not isinstance(n, bool) for n in value)
+        ):
+            raise PriceConfigError(f"{hint}; bad entry for {name!r}: {value!r}")
+        prices[name] = tuple(value)
+    return prices
+
+
+def load_prices() -> dict[str, tuple[float, float, float]]:
+    """The price table with ``AI_BLOG_PRICES`` applied, parsed once per value.
+
+    Raises :class:`PriceConfigError` if the override is malformed.
+    """
+    return _price_table(os.getenv("AI_BLOG_PRICES"))
+
+
+def price_for(model: str | None) -> tuple[float, float, float] | None:
+    """Per-million-token prices for ``model``, or ``None`` if unknown."""
+    if not model:
+        return None
+    prices = load_prices()
+    matches = [name for name in prices if model == name or model.startswith(name + "-")]
+    if not matches:
+        return None
+    return prices[max(matches, key=len)]
+
+
+def _get(obj, name: str, default=None):
+    if obj is None:
+        return default
+    if isinstance(obj, dict):
+        return obj.get(name, default)
+    return getattr(obj, name, default)
+
+
+@dataclass
+class Usage:
+    """Token counts reported by the provider, summed over one or more calls."""
+
+    calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cached_tokens: int = 0
+
+    @classmethod
+    def from_response(cls, response) -> Usage:
+        """Read usage from a Responses API or Chat Completions response."""
+        usage = _get(response, "usage")
+        if usage is None:
+            return cls(calls=1)
+        input_tokens = _get(usage, "input_tokens")
+        if input_tokens is None:
+            input_tokens = _get(usage, "prompt_tokens", 0)
+        output_tokens = _get(usage, "output_tokens")
+        if output_tokens is None:
+            output_tokens = _get(usage, "completion_tokens", 0)
+        details = _get(usage, "input_tokens_details") or _get(
+            usage, "prompt_tokens_details"
+        )
+        return cls(
+            calls=1,
+            input_tokens=int(input_tokens or 0),
+            output_tokens=int(output_tokens or 0),
+            cached_tokens=int(_get(details, "cached_tokens", 0) or 0),
+        )
+
+    def add(self, other: Usage) -> None:
+        self.calls += other.calls
+        self.input_tokens += other.input_tokens
+        self.output_tokens += other.output_tokens
+        self.cached_tokens += other.cached_tokens
+
+    @property
+    def total_tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+    @property
+    def cache_hit_ratio(self) -> float:
+        if not self.input_tokens:
+            return 0.0
+        return self.cached_tokens / self.input_tokens
+
+    def cost(self, model: str | None) -> float | None:
+        """Estimated USD cost at ``model``'s list price, ``None`` if unknown."""
+        prices = price_for(model)
+        if prices is None:
+            return None
+        input_price, cached_price, output_price = prices
+        uncached = max(self.input_tokens - self.cached_tokens, 0)
+        return (
+            uncached * input_price
+            + self.cached_tokens * cached_price
+            + self.output_tokens * output_price
+        ) / 1_000_000
+
+    def summary(self, model: str | None = None, cost: float | None = None) -> str:
+        text = (
+            f"{self.input_tokens} in ({self.cached_tokens} cached, "
+            f"{self.cache_hit_ratio:.0%}), {self.output_tokens} out, {self.calls} calls"
+        )
+        if cost is None and model is not None:
+            cost = self.cost(model)
+        if cost is not None:
+            text += f", ~${cost:.4f}"
+        return text
+
+
+class RunBudget:
+    """Token and cost caps for a run of many articles.
+
+    :meth:`admit` is asked before each article is scheduled. It projects
+    the spend so far plus the articles still running plus the new one, at
+    the average per-article spend seen so far (or at the caller's guess
+    before any article has finished), and refuses once a cap would be
+    exceeded.
+    """
+
+    def __init__(self, max_cost: float | None = None, max_tokens: int | None = None):
+        self.max_cost = max_cost
+        self.max_tokens = max_tokens
+        self.usage = Usage()
+        self.cost = 0.0
+        self.finished = 0
+        self.in_flight = 0
+        self.priced = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_cost is not None or self.max_tokens is not None
+
+    def admit(self, guess_tokens: int, guess_cost: float | None) -> bool:
+        pending = self.in_flight + 1
+        if self.finished:
+            per_tokens = self.usage.total_tokens / self.finished
+            per_cost = self.cost / self.finished
+        else:
+            per_tokens, per_cost = guess_tokens, guess_cost
+        if (
+            self.max_tokens is not None
+            and self.usage.total_tokens + pending * per_tokens > self.max_tokens
+        ):
+            return False
+        if (
+            self.max_cost is not None
+            and per_cost is not None
+            and self.cost + pending * per_cost > self.max_cost
+        ):
+            return False
+        self.in_flight += 1
+        return True
+
+    def record(self, usage: Usage, model: str | None) -> None:
+        """Account for a finished or failed article.
+
+        Articles that made no calls (shared results, failures before the
+        first call) do not count towards the per-article average.
+        """
+        self.in_flight = max(0, self.in_flight - 1)
+        if usage.calls:
+            self.finished += 1
+        self.charge(usage, model)
+
+    def charge(self, usage: Usage, model: str | None) -> None:
+        """Add spend that belongs to no single article, such as hedge losers."""
+        self.usage.add(usage)
+        cost = usage.cost(model)
+        if cost is not None:
+            self.priced = True
+            self.cost += cost
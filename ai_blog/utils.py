@@ -1,5 +1,7 @@
 import json
+import os
 import re
+import threading
 import unicodedata
 from dataclasses import dataclass
 from datetime import date
@@ -48,6 +50,17 @@ def build_frontmatter(
     kind: str | None = None,
     provider: str | None = None,
     dry_run: bool | None = None,
+    tone: str | None = None,
+    audience: str | None = None,
+    country: str | None = None,
+    model: str | None = None,
+    fingerprint: str | None = None,
+    language: str | None = None,
+    base_slug: str | None = None,
+    input_tokens: int | None = None,
+    output_tokens: int | None = None,
+    cached_tokens: int | None = None,
+    cost_usd: float | None = None,
 ) -> str:
     if date_str is None:
         date_str = date.today().isoformat()
@@ -66,6 +79,26 @@ def build_frontmatter(
         lines.append(f"provider: {_yaml_quote(provider)}")
     if dry_run is not None:
         lines.append(f"dry_run: {'true' if dry_run else 'false'}")
+    for key, value in (
+        ("tone", tone),
+        ("audience", audience),
+        ("country", country),
+        ("model", model),
+        ("fingerprint", fingerprint),
+        ("language", language),
+        ("base_slug", base_slug),
+    ):
+        if value is not None:
+            lines.append(f"{key}: {_yaml_quote(value)}")
+    for key, value in (
+        ("input_tokens", input_tokens),
+        ("output_tokens", output_tokens),
+        ("cached_tokens", cached_tokens),
+    ):
+        if value is not None:
+            lines.append(f"{key}: {value}")
+    if cost_usd is not None:
+        lines.append(f"cost_usd: {cost_usd:.6f}")
     lines.append("---")
     return "\n".join(lines)
 
@@ -182,4 +215,119 @@ def validate_outline(body: str) -> list[str]:
 
 def write_markdown(path: Path, frontmatter: str, body: str) -> None:
     content = f"{frontmatter}\n{body.strip()}\n"
-    path.write_text(content, encoding="utf-8")
+    # Write then rename so a crashed worker never leaves a half-written file.
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp_path.write_text(content, encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+_HEADING_RE = re.compile(r"^ {0,3}(#{1,6})\s+(.+?)(?:\s+#+)?\s*$")
+_BOLD_LINE_RE = re.compile(r"^\s*(?:\*\*|__)(.+?)(?:\*\*|__)\s*$")
+_FAQ_LINE_RE = re.compile(
+    r"^\s*(?:[-*+]\s+|\d+[.)]\s+)?(?:\*\*|__)?(q|a|question|answer)\s*[:.)]"
+    r"\s*(?:\*\*|__)?\s*(.+)$",
+    re.IGNORECASE,
+)
+# Section names from the blog prompt that must be H2s, and the spellings
+# models use for them.
+_SECTION_NAMES = {
+    "quick answer": "Quick answer",
+    "decision checklist": "Decision checklist",
+    "faq": "FAQs",
+    "faqs": "FAQs",
+    "frequently asked questions": "FAQs",
+    "conclusion": "Conclusion",
+}
+
+
+def _section_name(text: str) -> str | None:
+    key = re.sub(r"[*_:]+", "", text).strip().lower()
+    return _SECTION_NAMES.get(key)
+
+
+def _strip_emphasis(text: str) -> str:
+    return re.sub(r"^(?:\*\*|__)|(?:\*\*|__)$", "", text.strip()).strip()
+
+
+def normalize_body(body: str, title: str | None = None) -> str:
+    """Rewrite common formatting slips into what validate_body expects.
+
+    Handles prompt sections written as bold lines or at the wrong heading
+    level, all sections one level too deep (or too shallow), a missing H1
+    (``title`` is used), and FAQ pairs written as ``**Q:**``, ``1. Q:``,
+    ``Question:``, or as question headings and bold questions followed by
+    the answer. Only the first line of each answer gets an ``A:`` label;
+    later answer paragraphs are left alone. Apart from the H1, no lines are
+    added or removed.
+    """
+    # (level, text) for headings, (0, line) for everything else.
+    tokens: list[tuple[int, str]] = []
+    for line in body.splitlines():
+        match = _HEADING_RE.match(line)
+        if match:
+            text = match.group(2).strip()
+            name = _section_name(text)
+            tokens.append((2, name) if name else (len(match.group(1)), text))
+            continue
+        bold = _BOLD_LINE_RE.match(line)
+        name = _section_name(bold.group(1)) if bold else None
+        tokens.append((2, name) if name else (0, line))
+
+    levels = [level for level, text in tokens if level]
+    if levels.count(2) < 5:
+        named = sum(1 for level, text in tokens if level == 2 and _section_name(text))
+        if levels.count(1) > 1:
+            # Sections written as H1s: keep the first as the title.
+            first = next(i for i, (level, _) in enumerate(tokens) if level == 1)
+            tokens = [
+                (2, text) if level == 1 and i > first else (level, text)
+                for i, (level, text) in enumerate(tokens)
+            ]
+        elif levels.count(2) == named and any(level >= 3 for level in levels):
+            # Sections written as H3s (or deeper): promote everything a level.
+            tokens = [
+                (level - 1, text) if level >= 3 else (level, text) for level, text in tokens
+            ]
+
+    if title and not any(level == 1 for level, _ in tokens):
+        tokens[:0] = [(1, title.strip()), (0, "")]
+
+    lines: list[str] = []
+    in_faqs = False
+    awaiting_answer = False
+    for level, text in tokens:
+        if level == 2 and in_faqs and text.rstrip("*_ ").endswith("?"):
+            level = 3
+        if level == 2:
+            in_faqs = text == "FAQs" or text.lower().startswith("faq")
+            awaiting_answer = False
+        elif in_faqs:
+            pair = _FAQ_LINE_RE.match(text) if not level else None
+            label = None
+            if pair:
+                label = "Q" if pair.group(1).lower().startswith("q") else "A"
+            # Only the first line of an answer is labelled; later paragraphs
+            # (even ones starting "a)" or "Answer:") are kept as written.
+            if label == "Q" or (label == "A" and awaiting_answer):
+                lines.append(f"{label}: {_strip_emphasis(pair.group(2))}")
+                awaiting_answer = label == "Q"
+                continue
+            question = None
+            if level >= 3:
+                question = text
+            else:
+                bold = _BOLD_LINE_RE.match(text)
+                if bold and bold.group(1).strip().endswith("?"):
+                    question = bold.group(1)
+            if question is not None:
+                lines.append(f"Q: {_strip_emphasis(question)}")
+                awaiting_answer = True
+                continue
+            if awaiting_answer and text.strip():
+                lines.append(f"A: {text.strip()}")
+                awaiting_answer = False
+                continue
+            lines.append(text)
+            continue
+        lines.append(f"{'#' * level} {text}" if level else text)
+    return "\n".join(lines)
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+
+
+class AsyncWaiters:
+    """FIFO queue of event-loop tasks waiting on a thread-shared resource.
+
+    The owner checks for capacity and calls :meth:`add` under its own lock,
+    then awaits :meth:`wait` outside it; :meth:`wake` is called under the
+    same lock when capacity frees up, from any thread or loop. A woken task
+    that cannot get the resource re-queues with ``first=True`` so it keeps
+    its place. A task cancelled after being woken passes the wake-up on.
+    """
+
+    def __init__(self, lock):
+        self._lock = lock
+        self._queue: deque[asyncio.Future] = deque()
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def add(self, first: bool = False) -> asyncio.Future:
+        """Queue the current task. The caller holds the owner's lock."""
+        future = asyncio.get_running_loop().create_future()
+        if first:
+            self._queue.appendleft(future)
+        else:
+            self._queue.append(future)
+        return future
+
+    async def wait(self, future: asyncio.Future, timeout: float | None = None) -> None:
+        """Wait until ``future`` is woken, or ``timeout`` seconds pass."""
+        woken = False
+        try:
+            await asyncio.wait({future}, timeout=timeout)
+            woken = future.done()
+        finally:
+            with self._lock:
+                try:
+                    self._queue.remove(future)
+                except ValueError:
+                    # Already woken: hand the wake-up on if we will not use it.
+                    if not woken:
+                        self.wake()
+
+    def wake(self, count: int = 1) -> None:
+        """Wake up to ``count`` waiters in arrival order. The caller holds the lock."""
+        for _ in range(min(count, len(self._queue))):
+            future = self._queue.popleft()
+            future.get_loop().call_soon_threadsafe(_resolve, future)
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
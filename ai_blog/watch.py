@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable
+
+from .topics import TopicRow
+from .utils import slugify_topic
+
+STATE_NAME = ".watch-state.json"
+
+
+def row_key(row: TopicRow) -> str:
+    """Hash of everything that affects a row's article."""
+    raw = "\x1f".join(
+        str(value)
+        for value in (row.topic, row.words, row.tone, row.audience, row.country, row.model)
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def state_path(out_dir: str | Path) -> Path:
+    return Path(out_dir) / STATE_NAME
+
+
+def load_state(path: str | Path) -> dict[str, str]:
+    """Return ``{slug: row_key}`` for rows already generated."""
+    file_path = Path(path)
+    if not file_path.exists():
+        return {}
+    try:
+        data = json.loads(file_path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def save_state(path: str | Path, state: dict[str, str]) -> None:
+    file_path = Path(path)
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = file_path.with_name(f".{file_path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps(state, sort_keys=True, indent=0), encoding="utf-8")
+    os.replace(tmp_path, file_path)
+
+
+@dataclass
+class Changes:
+    rows: list[tuple[str, TopicRow]] = field(default_factory=list)
+    unchanged: int = 0
+
+
+def diff_rows(rows: Iterable[TopicRow], state: dict[str, str]) -> Changes:
+    """Return rows whose slug is new or whose settings changed since ``state``.
+
+    Later duplicates of a slug win, matching what a full ``batch`` run would
+    leave on disk.
+    """
+    latest: dict[str, TopicRow] = {}
+    for row in rows:
+        latest[slugify_topic(row.topic)] = row
+    changes = Changes()
+    for slug, row in latest.items():
+        if state.get(slug) == row_key(row):
+            changes.unchanged += 1
+        else:
+            changes.rows.append((slug, row))
+    return changes
+
+
+def file_signature(path: str | Path) -> tuple[int, int] | None:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def wait_for_change(
+    path: str | Path,
+    last: tuple[int, int] | None,
+    interval: float = 1.0,
+    debounce: float = 2.0,
+    sleep: Callable[[float], None] = time.sleep,
+    clock: Callable[[], float] = time.monotonic,
+) -> tuple[int, int] | None:
+    """Block until ``path`` changes, then until it has been quiet for ``debounce``.
+
+    Only ``stat`` is called while polling, so an idle watch costs one syscall
+    per ``interval``. A burst of saves is coalesced into a single change.
+    """
+    current = file_signature(path)
+    while current == last:
+        sleep(interval)
+        current = file_signature(path)
+    settled_at = clock()
+    while clock() - settled_at < debounce:
+        sleep(min(interval, debounce))
+        latest = file_signature(path)
+        if latest != current:
+            current = latest
+            settled_at = clock()
+    return current
+
+
+def watch_topics(
+    path: str | Path,
+    read_rows: Callable[[], Iterable[TopicRow]],
+    handle: Callable[[str, TopicRow], None],
+    state_file: str | Path,
+    interval: float = 1.0,
+    debounce: float = 2.0,
+    once: bool = False,
+    fatal: tuple[type[BaseException], ...] = (),
+    on_scan: Callable[[Changes], None] | None = None,
+    sleep: Callable[[float], None] = time.sleep,
+    save_every: int = 50,
+    save_interval: float = 5.0,
+    clock: Callable[[], float] = time.monotonic,
+) -> None:
+    """Generate new or changed rows whenever the topics file changes.
+
+    ``handle`` is called with ``(slug, row)``; rows whose handler raises are
+    left out of the saved state so they are retried on the next change.
+    Exceptions listed in ``fatal``, and any raised by ``read_rows``, stop
+    the watch. The state file is rewritten after ``save_every`` rows or
+    ``save_interval`` seconds, at the end of each scan and when the watch
+    stops, so a crash can only cost the rows since the last write.
+    """
+    state = load_state(state_file)
+    unsaved = 0
+    saved_at = clock()
+
+    def flush() -> None:
+        nonlocal unsaved, saved_at
+        if unsaved:
+            save_state(state_file, state)
+            unsaved = 0
+        saved_at = clock()
+
+    signature = None
+    try:
+        while True:
+            signature = wait_for_change(path, signature, interval, debounce, sleep)
+            if signature is not None:
+                changes = diff_rows(read_rows(), state)
+                if on_scan:
+                    on_scan(changes)
+                for slug, row in changes.rows:
+                    try:
+                        handle(slug, row)
+                    except fatal:
+                        raise
+                    except Exception:
+                        continue
+                    state[slug] = row_key(row)
+                    unsaved += 1
+                    if unsaved >= save_every or clock() - saved_at >= save_interval:
+                        flush()
+                flush()
+            if once:
+                return
+    finally:
+        flush()
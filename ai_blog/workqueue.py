@@ -0,0 +1,286 @@
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Iterable
+
+from .topics import TopicRow
+from .utils import slugify_topic
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    slug TEXT NOT NULL UNIQUE,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_token TEXT,
+    lease_expires REAL,
+    last_error TEXT,
+    updated_at REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS tasks_ready ON tasks (status, available_at);
+"""
+
+STATUSES = ("pending", "leased", "done", "dead")
+
+
+@dataclass
+class Task:
+    id: int
+    slug: str
+    row: TopicRow
+    attempts: int
+    token: str
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class WorkQueue:
+    """A lease-based topic queue stored in a single SQLite file.
+
+    Workers lease one task at a time for ``visibility_timeout`` seconds.
+    A lease that is neither acked nor extended before it expires becomes
+    visible again, so a crashed worker's topic is picked up by another one.
+    Acks are only accepted from the current lease holder, and articles are
+    written under their slug, so a reclaimed task never produces a second
+    article.
+
+    The default rollback journal is used rather than WAL because WAL does
+    not work on network filesystems.
+    """
+
+    def __init__(self, path: str | Path, max_attempts: int = 5, timeout: float = 30.0):
+        self.path = Path(path)
+        self.max_attempts = max_attempts
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            str(self.path), timeout=timeout, isolation_level=None, check_same_thread=False
+        )
+        self._lock = threading.Lock()
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> WorkQueue:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _transaction(self, fn: Callable[[sqlite3.Connection], object]):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(self._conn)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return result
+
+    def push(self, rows: Iterable[TopicRow], chunk_size: int = 500) -> tuple[int, int]:
+        """Enqueue rows, ignoring slugs already queued. Returns (added, skipped)."""
+        added = 0
+        total = 0
+        chunk: list[tuple[str, str, float]] = []
+
+        def flush(conn: sqlite3.Connection) -> int:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO tasks (slug, payload, updated_at) VALUES (?, ?, ?)",
+                chunk,
+            )
+            return conn.total_changes - before
+
+        for row in rows:
+            total += 1
+            payload = json.dumps(asdict(row), ensure_ascii=True)
+            chunk.append((slugify_topic(row.topic), payload, time.time()))
+            if len(chunk) >= chunk_size:
+                added += self._transaction(flush)
+                chunk = []
+        if chunk:
+            added += self._transaction(flush)
+        return added, total - added
+
+    def lease(self, worker_id: str, visibility_timeout: float) -> Task | None:
+        """Lease the next ready task, reclaiming expired leases first."""
+        now = time.time()
+        token = uuid.uuid4().hex
+
+        def take(conn: sqlite3.Connection) -> Task | None:
+            conn.execute(
+                "UPDATE tasks SET status = 'dead', lease_owner = NULL, lease_token = NULL,"
+                " last_error = COALESCE(last_error, 'lease expired'), updated_at = ?"
+                " WHERE status = 'leased' AND lease_expires <= ? AND attempts >= ?",
+                (now, now, self.max_attempts),
+            )
+            found = conn.execute(
+                "SELECT id, slug, payload, attempts FROM tasks"
+                " WHERE (status = 'pending' AND available_at <= ?)"
+                " OR (status = 'leased' AND lease_expires <= ?)"
+                " ORDER BY id LIMIT 1",
+                (now, now),
+            ).fetchone()
+            if found is None:
+                return None
+            task_id, slug, payload, attempts = found
+            conn.execute(
+                "UPDATE tasks SET status = 'leased', lease_owner = ?, lease_token = ?,"
+                " lease_expires = ?, attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                (worker_id, token, now + visibility_timeout, now, task_id),
+            )
+            return Task(
+                id=task_id,
+                slug=slug,
+                row=TopicRow(**json.loads(payload)),
+                attempts=attempts + 1,
+                token=token,
+            )
+
+        return self._transaction(take)
+
+    def extend(self, task: Task, visibility_timeout: float) -> bool:
+        """Push the lease deadline forward. False if the lease was lost."""
+        now = time.time()
+        return self._update_leased(
+            task,
+            "lease_expires = ?, updated_at = ?",
+            (now + visibility_timeout, now),
+        )
+
+    def ack(self, task: Task) -> bool:
+        """Mark a task done. False if the lease expired and was reclaimed."""
+        return self._update_leased(
+            task,
+            "status = 'done', lease_owner = NULL, lease_token = NULL, last_error = NULL,"
+            " updated_at = ?",
+            (time.time(),),
+        )
+
+    def retry(self, task: Task, error: str, delay: float = 0.0) -> bool:
+        """Release a failed task for another attempt, or bury it as dead."""
+        status = "dead" if task.attempts >= self.max_attempts else "pending"
+        return self._update_leased(
+            task,
+            "status = ?, available_at = ?, lease_owner = NULL, lease_token = NULL,"
+            " last_error = ?, updated_at = ?",
+            (status, time.time() + delay, error, time.time()),
+        )
+
+    def release(self, task: Task) -> bool:
+        """Return a task to the queue without counting the attempt."""
+        return self._update_leased(
+            task,
+            "status = 'pending', attempts = attempts - 1, lease_owner = NULL,"
+            " lease_token = NULL, updated_at = ?",
+            (time.time(),),
+        )
+
+    def _update_leased(self, task: Task, assignments: str, params: tuple) -> bool:
+        def update(conn: sqlite3.Connection) -> bool:
+            cursor = conn.execute(
+                f"UPDATE tasks SET {assignments}"
+                " WHERE id = ? AND status = 'leased' AND lease_token = ?",
+                (*params, task.id, task.token),
+            )
+            return cursor.rowcount == 1
+
+        return self._transaction(update)
+
+    def stats(self) -> dict[str, int]:
+        counts = {status: 0 for status in STATUSES}
+        with self._lock:
+            for status, count in self._conn.execute(
+                "SELECT status, COUNT(*) FROM tasks GROUP BY status"
+            ):
+                counts[status] = count
+        return counts
+
+
+class _Heartbeat(threading.Thread):
+    def __init__(self, queue: WorkQueue, task: Task, visibility_timeout: float):
+        super().__init__(daemon=True)
+        self.queue = queue
+        self.task = task
+        self.visibility_timeout = visibility_timeout
+        self.lost = False
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        interval = max(self.visibility_timeout / 3, 0.05)
+        while not self._stop_event.wait(interval):
+            if not self.queue.extend(self.task, self.visibility_timeout):
+                self.lost = True
+                return
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+def run_worker(
+    queue: WorkQueue,
+    handle: Callable[[TopicRow], str],
+    worker_id: str,
+    visibility_timeout: float = 600.0,
+    retry_delay: float = 30.0,
+    poll_interval: float = 2.0,
+    exit_when_idle: bool = True,
+    max_tasks: int | None = None,
+    fatal: tuple[type[BaseException], ...] = (),
+    on_event: Callable[[str, Task, str], None] | None = None,
+) -> int:
+    """Lease and process tasks until the queue is drained. Returns tasks acked.
+
+    ``handle`` generates the article for a row and returns its path, while a
+    heartbeat keeps the lease alive. A ``fatal`` exception puts the task back
+    and stops the worker; any other is retried after ``retry_delay`` seconds
+    times the attempt number.
+    """
+    done = 0
+    while max_tasks is None or done < max_tasks:
+        task = queue.lease(worker_id, visibility_timeout)
+        if task is None:
+            if exit_when_idle:
+                counts = queue.stats()
+                if counts["pending"] == 0 and counts["leased"] == 0:
+                    break
+            time.sleep(poll_interval)
+            continue
+
+        heartbeat = _Heartbeat(queue, task, visibility_timeout)
+        heartbeat.start()
+        try:
+            result = handle(task.row)
+        except fatal:
+            heartbeat.stop()
+            queue.release(task)
+            raise
+        except Exception as exc:
+            heartbeat.stop()
+            queue.retry(task, str(exc), delay=retry_delay * task.attempts)
+            if on_event:
+                on_event("retry", task, str(exc))
+            continue
+        heartbeat.stop()
+        if queue.ack(task):
+            done += 1
+            if on_event:
+                on_event("done", task, result)
+        elif on_event:
+            on_event("lost", task, result)
+    return done
@@ -0,0 +1,29 @@
+import pytest
+
+from ai_blog import fanout, generator
+
+
+class Obj:
+    """Attribute bag standing in for OpenAI SDK clients and responses."""
+
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+class FakeClock:
+    """Manually advanced replacement for ``time.monotonic``."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def fake_openai_errors(monkeypatch):
+    """Let generator code run without the openai SDK installed."""
+    errors = (PermissionError, TimeoutError)
+    monkeypatch.setattr(generator, "openai_error_classes", lambda: errors)
+    monkeypatch.setattr(fanout, "openai_error_classes", lambda: errors)
+    return errors
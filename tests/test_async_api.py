@@ -0,0 +1,285 @@
+import asyncio
+import json
+
+import pytest
+
+import ai_blog.generator as generator
+from ai_blog.fingerprint import generation_fingerprint
+from ai_blog.generator import aexpand_section, agenerate_article, agenerate_outline
+from ai_blog.limiter import AdaptiveLimiter
+from ai_blog.outline_parse import read_frontmatter
+from ai_blog.pool import PoolMember, ProviderPool
+
+from conftest import Obj
+
+
+def _model_text(topic):
+    faqs = "\n".join(f"Q: Question {i}?\nA: Answer {i}." for i in range(5))
+    sections = "\n\n".join(f"## Section {i}\n\nText." for i in range(5))
+    return (
+        f"TITLE: {topic}\nMETA: Meta\nBODY:\n# {topic}\n\n"
+        f"{sections}\n\n## FAQs\n\n{faqs}\n\n## Conclusion\n\nBye."
+    )
+
+
+class _AsyncResponses:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.in_flight = 0
+        self.peak = 0
+
+    async def create(self, model, input, **kwargs):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        topic = input[1]["content"].split("Topic: ", 1)[1].splitlines()[0]
+        return Obj(output_text=_model_text(topic), usage=None)
+
+
+class _AsyncClient:
+    def __init__(self, delay=0.0):
+        self.responses = _AsyncResponses(delay)
+        self.closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.closed = True
+
+
+def _generate(tmp_path, topic, **kwargs):
+    return agenerate_article(
+        topic=topic,
+        words=800,
+        tone="friendly",
+        audience="beginners",
+        country="India",
+        out_dir=str(tmp_path),
+        model="gpt-4o-mini",
+        **kwargs,
+    )
+
+
+pytestmark = pytest.mark.usefixtures("fake_openai_errors")
+
+
+def test_many_concurrent_generations_share_one_loop(tmp_path):
+    client = _AsyncClient(delay=0.01)
+
+    async def main():
+        return await asyncio.gather(
+            *[
+                agenerate_article(
+                    topic=f"topic {i}",
+                    words=800,
+                    tone="friendly",
+                    audience="beginners",
+                    country="India",
+                    out_dir=str(tmp_path),
+                    model="gpt-4o-mini",
+                    client=client,
+                )
+                for i in range(200)
+            ]
+        )
+
+    articles = asyncio.run(main())
+    assert len({a.path for a in articles}) == 200
+    assert client.responses.peak == 200
+    assert tmp_path.joinpath("topic-7.md").exists()
+
+
+def test_cancelled_generation_writes_nothing(tmp_path):
+    client = _AsyncClient(delay=10)
+
+    async def main():
+        task = asyncio.ensure_future(
+            agenerate_article(
+                topic="slow topic",
+                words=800,
+                tone="friendly",
+                audience="beginners",
+                country="India",
+                out_dir=str(tmp_path),
+                model="gpt-4o-mini",
+                client=client,
+            )
+        )
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert not list(tmp_path.glob("*.md"))
+
+
+def test_async_mock_matches_sync(tmp_path):
+    async def main():
+        article = await agenerate_article(
+            topic="best earbuds",
+            words=1200,
+            tone="friendly",
+            audience="beginners",
+            country="India",
+            out_dir=str(tmp_path / "a"),
+            model="gpt-4o-mini",
+            provider="mock",
+        )
+        outline = await agenerate_outline(
+            topic="best earbuds",
+            tone="friendly",
+            audience="beginners",
+            country="India",
+            out_dir=str(tmp_path / "a"),
+            model="gpt-4o-mini",
+            provider="mock",
+        )
+        section = await aexpand_section(
+            section_heading="Heading",
+            section_body_lines=["- one"],
+            topic="best earbuds",
+            tone="friendly",
+            audience="beginners",
+            country="India",
+            model="gpt-4o-mini",
+            provider="mock",
+        )
+        return article, outline, section
+
+    article, outline, section = asyncio.run(main())
+    sync_article = generator.generate_article(
+        topic="best earbuds",
+        words=1200,
+        tone="friendly",
+        audience="beginners",
+        country="India",
+        out_dir=str(tmp_path / "b"),
+        model="gpt-4o-mini",
+        provider="mock",
+    )
+    assert article.body == sync_article.body
+    assert outline.slug == "best-earbuds-outline"
+    assert section.startswith("## Heading")
+
+
+def test_async_calls_go_through_the_limiter_and_pool(tmp_path, monkeypatch):
+    members = [PoolMember(name=name, client=object()) for name in ("a", "b")]
+    for member in members:
+        member.async_client = _AsyncClient(delay=0.01)
+    monkeypatch.setattr(generator, "_POOL", ProviderPool(members))
+    monkeypatch.setattr(generator, "_LIMITER", AdaptiveLimiter(initial=3, max_limit=3))
+
+    async def main():
+        return await asyncio.gather(*[_generate(tmp_path, f"topic {i}") for i in range(12)])
+
+    assert len(asyncio.run(main())) == 12
+    responses = [member.async_client.responses for member in members]
+    assert sum(r.peak for r in responses) <= 3
+    assert all(r.peak for r in responses)
+    assert generator._LIMITER.in_flight == 0
+
+
+def test_client_created_for_a_call_is_closed(tmp_path, monkeypatch):
+    owned = _AsyncClient()
+    monkeypatch.setattr(generator, "_async_openai_client", lambda: owned)
+
+    article = asyncio.run(_generate(tmp_path, "own client"))
+
+    assert article.slug == "own-client"
+    assert owned.closed
+
+
+class _AsyncStreamingResponses:
+    def __init__(self, text):
+        self.text = text
+        self.calls = []
+        self.closed = False
+
+    async def create(self, model, input, stream=False, **kwargs):
+        self.calls.append(dict(kwargs, stream=stream))
+        if not stream:
+            faqs = "\n".join(f"Q: Question {i}?\nA: Answer {i}." for i in range(5))
+            tail = f"## Decision checklist\n\n- One\n\n## FAQs\n\n{faqs}\n\n## Conclusion\n\nBuy."
+            return Obj(output_text=tail, usage=Obj(input_tokens=50, output_tokens=40))
+        return _AsyncEvents(self, self.text)
+
+
+class _AsyncEvents:
+    def __init__(self, owner, text):
+        self.owner = owner
+        self.chunks = iter([text[i : i + 37] for i in range(0, len(text), 37)])
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return Obj(type="response.output_text.delta", delta=next(self.chunks))
+        except StopIteration:
+            raise StopAsyncIteration from None
+
+    async def close(self):
+        self.owner.closed = True
+
+
+def test_async_stream_is_cut_at_the_budget_and_finished(tmp_path):
+    filler = " ".join(["word"] * 120)
+    sections = "\n\n".join(f"## Section {i}\n\n{filler}" for i in range(12))
+    responses = _AsyncStreamingResponses(
+        f"TITLE: Title\nMETA: Meta\nBODY:\n# Title\n\nIntro.\n\n{sections}\n\n## Conclusion\n\nBye."
+    )
+    article = asyncio.run(
+        _generate(tmp_path, "Streaming", client=Obj(responses=responses), stream=True)
+    )
+    assert responses.closed
+    assert [call["stream"] for call in responses.calls] == [True, False]
+    assert "## Section 11" not in article.body
+    assert article.body.rstrip().endswith("Buy.")
+
+
+def test_async_structured_output_and_recorded_usage(tmp_path):
+    data = {
+        "title": "Structured",
+        "meta": "Meta.",
+        "intro": "Intro.",
+        "quick_answer": ["Yes"],
+        "sections": [{"heading": f"Part {i}", "content": "Text."} for i in range(5)],
+        "checklist": ["Budget"],
+        "faqs": [{"question": f"Q{i}?", "answer": "A."} for i in range(5)],
+        "conclusion": "Bye.",
+    }
+
+    class _Responses:
+        async def create(self, model, input, **kwargs):
+            assert kwargs["text"]["format"]["type"] == "json_schema"
+            return Obj(output_text=json.dumps(data), usage=Obj(input_tokens=100, output_tokens=50))
+
+    article = asyncio.run(
+        _generate(
+            tmp_path,
+            "Structured",
+            client=Obj(responses=_Responses()),
+            structured=True,
+            record_usage=True,
+        )
+    )
+    fm = read_frontmatter(article.path)
+    assert "## Part 4" in article.body and "Q: Q4?\nA: A." in article.body
+    assert (fm["input_tokens"], fm["output_tokens"]) == ("100", "50")
+    assert fm["fingerprint"] == generation_fingerprint(
+        "article",
+        "Structured",
+        800,
+        "friendly",
+        "beginners",
+        "India",
+        "gpt-4o-mini",
+        "openai",
+        False,
+        structured=True,
+    )
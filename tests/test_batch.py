@@ -0,0 +1,121 @@
+import threading
+import time
+
+import pytest
+
+from ai_blog.batch import Stage, run_pipeline
+from ai_blog.metrics import metrics
+
+
+def test_run_pipeline_runs_stages_in_order_and_reports_errors():
+    results = {}
+
+    def parse(n):
+        if n == 3:
+            raise ValueError("bad topic")
+        return n * 2
+
+    def on_result(item, result, exc):
+        results[item] = result if exc is None else str(exc)
+
+    stages = [
+        Stage("fetch", lambda n: n, workers=3),
+        Stage("prepare", parse, workers=2),
+        Stage("write", lambda n: n + 1),
+    ]
+    assert run_pipeline(iter(range(20)), stages, on_result=on_result) == 20
+    assert results[3] == "bad topic"
+    assert results[19] == 39
+    assert len(results) == 20
+
+
+def test_run_pipeline_bounds_work_in_memory_behind_a_slow_writer():
+    lock = threading.Lock()
+    pulled = [0]
+    finished = [0]
+    peak = [0]
+
+    def items():
+        for n in range(60):
+            with lock:
+                pulled[0] += 1
+                peak[0] = max(peak[0], pulled[0] - finished[0])
+            yield n
+
+    def write(n):
+        time.sleep(0.005)
+        return n
+
+    def on_result(item, result, exc):
+        with lock:
+            finished[0] += 1
+
+    stages = [
+        Stage("fetch", lambda n: n, workers=4),
+        Stage("prepare", lambda n: n, workers=4),
+        Stage("write", write, workers=1),
+    ]
+    assert run_pipeline(items(), stages, on_result=on_result) == 60
+    assert finished[0] == 60
+    # Queues (8 + 8 + 2 + results 2) plus 9 workers, plus the item in hand.
+    assert peak[0] <= 30
+    assert metrics.gauge("pipeline.write.queue") is not None
+
+
+def test_run_pipeline_stops_on_fatal_error():
+    pulled = []
+    reported = []
+
+    def items():
+        for n in range(100):
+            pulled.append(n)
+            yield n
+
+    def fetch(n):
+        if n == 2:
+            raise PermissionError("bad key")
+        time.sleep(0.005)
+        return n
+
+    stages = [Stage("fetch", fetch, workers=2), Stage("write", lambda n: n)]
+    with pytest.raises(PermissionError):
+        run_pipeline(
+            items(),
+            stages,
+            fatal=(PermissionError,),
+            on_result=lambda item, result, exc: reported.append(item),
+        )
+    assert len(pulled) < 20
+    assert 2 not in reported
+
+
+def test_article_stages_match_generate_article(tmp_path):
+    from ai_blog.generator import (
+        ArticleJob,
+        fetch_article,
+        generate_article,
+        prepare_article,
+        save_article,
+    )
+
+    args = dict(
+        topic="Best pens",
+        words=800,
+        tone="friendly",
+        audience="beginners",
+        country="India",
+        model="m",
+        provider="mock",
+    )
+    saved = {}
+    stages = [
+        Stage("fetch", lambda topic: fetch_article(ArticleJob(out_dir=str(tmp_path / "a"), **args))),
+        Stage("prepare", prepare_article),
+        Stage("write", save_article),
+    ]
+    run_pipeline(["Best pens"], stages, on_result=lambda item, article, exc: saved.update(a=article))
+    direct = generate_article(out_dir=str(tmp_path / "b"), **args)
+    assert saved["a"].body == direct.body
+    assert (tmp_path / "a" / "best-pens.md").read_text().split("date:")[0] == (
+        tmp_path / "b" / "best-pens.md"
+    ).read_text().split("date:")[0]
@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+from ai_blog.breaker import CircuitBreaker
+from ai_blog.errors import CircuitOpenError, OpenAIAuthError
+from ai_blog.manifest import append_retry
+from ai_blog.topics import TopicRow, iter_topic_rows
+
+from conftest import FakeClock
+
+
+def _fail():
+    raise TimeoutError("upstream timeout")
+
+
+def test_opens_after_consecutive_failures_and_recovers_via_probe():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10, clock=clock)
+    for _ in range(3):
+        with pytest.raises(TimeoutError):
+            breaker.call(_fail)
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError) as info:
+        breaker.call(lambda: "never called")
+    assert info.value.retry_after == 10
+
+    clock.now = 10
+    assert breaker.state == "half_open"
+    with pytest.raises(TimeoutError):
+        breaker.call(_fail)
+    assert breaker.state == "open"
+
+    clock.now = 29
+    assert not breaker.wait_until_ready(timeout=0)
+    clock.now = 30
+    assert breaker.wait_until_ready(timeout=0)
+    assert breaker.call(lambda: "ok") == "ok"
+    assert breaker.state == "closed"
+
+
+def test_opens_on_failure_rate_and_ignores_auth_errors():
+    breaker = CircuitBreaker(failure_threshold=100, failure_rate=0.5, window=10, min_calls=6)
+    for _ in range(5):
+        with pytest.raises(OpenAIAuthError):
+            breaker.call(lambda: (_ for _ in ()).throw(OpenAIAuthError("bad key")))
+    assert breaker.state == "closed"
+
+    outcomes = [True, False, True, False, True, False]
+    for ok in outcomes[:-1]:
+        if ok:
+            breaker.call(lambda: "ok")
+        else:
+            with pytest.raises(TimeoutError):
+                breaker.call(_fail)
+    assert breaker.state == "closed"
+    with pytest.raises(TimeoutError):
+        breaker.call(_fail)
+    assert breaker.state == "open"
+
+
+def test_cancelled_probe_frees_the_slot():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=1, clock=clock)
+    with pytest.raises(TimeoutError):
+        breaker.call(_fail)
+    clock.now = 1
+
+    async def hang():
+        await asyncio.sleep(10)
+
+    async def run():
+        task = asyncio.ensure_future(breaker.acall(hang))
+        await asyncio.sleep(0)
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert breaker.before_call() is True
+
+
+def test_retry_file_round_trips_as_topics(tmp_path):
+    row = TopicRow(
+        topic="Best pens", words=800, tone="casual", audience="students", country="US", model="m"
+    )
+    path = append_retry(tmp_path, row)
+    rows = list(iter_topic_rows(path, words=1200, tone="x", audience="y", country="z"))
+    assert len(rows) == 1
+    assert (rows[0].topic, rows[0].words, rows[0].country, rows[0].model) == (
+        "Best pens",
+        800,
+        "US",
+        "m",
+    )
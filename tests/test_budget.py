@@ -0,0 +1,155 @@
+from ai_blog.budget import SectionStop, drop_last_section, missing_tail, output_token_cap
+from ai_blog.generator import generate_article
+from ai_blog.utils import validate_body
+
+from conftest import Obj
+
+
+def _long_article(sections=12, words_per_section=120):
+    filler = " ".join(["word"] * words_per_section)
+    body = "\n\n".join(f"## Section {i}\n\n{filler}" for i in range(sections))
+    faqs = "\n".join(f"Q: Question {i}?\nA: Answer {i}." for i in range(5))
+    return (
+        "TITLE: Title\nMETA: Meta\nBODY:\n# Title\n\nIntro.\n\n## Quick answer\n\n- Yes\n\n"
+        f"{body}\n\n## Decision checklist\n\n- One\n\n## FAQs\n\n{faqs}\n\n"
+        "## Conclusion\n\nBuy now."
+    )
+
+
+def _chunks(text, size=37):
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+def test_output_token_cap_scales_with_words():
+    assert output_token_cap(1200) > output_token_cap(600)
+    assert output_token_cap(1200) > 1200 * 1.3
+    assert output_token_cap(1000, margin=0.5) > output_token_cap(1000)
+
+
+def test_missing_tail_only_reports_sections_after_the_last_present():
+    assert missing_tail("# T\n\n## Quick answer\n\n- a") == [
+        "Decision checklist",
+        "FAQs",
+        "Conclusion",
+    ]
+    assert missing_tail("## One\n\n## FAQs\n\nQ: a?\nA: b.") == ["Conclusion"]
+    assert missing_tail("## FAQ\n\n## Conclusion\n\nBye.") == []
+
+
+def test_section_stop_cuts_before_a_heading_once_over_budget():
+    stop = SectionStop(words=600, reserve=100)
+    stopped = False
+    for chunk in _chunks(_long_article()):
+        if stop.feed(chunk):
+            stopped = True
+            break
+    assert stopped
+    kept = stop.text
+    assert kept.rstrip().endswith("word")
+    assert "## Decision checklist" not in kept
+    body_words = len(kept.split("BODY:", 1)[1].split())
+    assert 500 <= body_words < 500 + 130
+
+
+def test_section_stop_never_cuts_inside_the_closing_sections():
+    text = _long_article(sections=2, words_per_section=10)
+    stop = SectionStop(words=30, reserve=0, min_sections=10)
+    assert not any(stop.feed(chunk) for chunk in _chunks(text))
+    assert stop.text == text
+
+
+class _StreamingResponses:
+    def __init__(self, text):
+        self.text = text
+        self.calls = []
+        self.closed = False
+
+    def create(self, model, input, stream=False, **kwargs):
+        self.calls.append(dict(kwargs, stream=stream))
+        if not stream:
+            faqs = "\n".join(f"Q: Question {i}?\nA: Answer {i}." for i in range(5))
+            tail = f"## Decision checklist\n\n- One\n\n## FAQs\n\n{faqs}\n\n## Conclusion\n\nBuy."
+            return Obj(output_text=tail, usage=Obj(input_tokens=50, output_tokens=40))
+        return self._events()
+
+    def _events(self):
+        try:
+            for chunk in _chunks(self.text):
+                yield Obj(type="response.output_text.delta", delta=chunk)
+            yield Obj(type="response.completed", response=Obj(usage=None))
+        finally:
+            self.closed = True
+
+
+def test_streamed_article_stops_early_and_keeps_a_complete_ending(tmp_path, fake_openai_errors):
+    responses = _StreamingResponses(_long_article())
+    client = Obj(responses=responses)
+
+    article = generate_article(
+        topic="Streaming budget",
+        words=800,
+        tone="friendly",
+        audience="beginners",
+        country="India",
+        out_dir=str(tmp_path),
+        model="m",
+        client=client,
+        stream=True,
+    )
+
+    assert responses.closed
+    first, finish = responses.calls
+    assert first["stream"] and first["max_output_tokens"] == output_token_cap(800)
+    assert not finish["stream"] and finish["max_output_tokens"] < first["max_output_tokens"]
+    assert "## Section 11" not in article.body
+    assert article.body.rstrip().endswith("Buy.")
+    assert validate_body(article.body) == []
+    assert article.usage.calls == 2
+    assert article.usage.output_tokens > 40
+
+
+def test_drop_last_section_keeps_whole_sections_only():
+    assert drop_last_section("# T\n\n## One\n\nA.\n\n## Two\n\nB") == "# T\n\n## One\n\nA.\n"
+    assert drop_last_section("# T\n\nIntro") == "# T\n\nIntro"
+
+
+class _TruncatedResponses:
+    def __init__(self, text):
+        self.text = text
+        self.calls = []
+
+    def create(self, model, input, **kwargs):
+        self.calls.append(kwargs)
+        if len(self.calls) == 1:
+            return Obj(
+                output_text=self.text,
+                status="incomplete",
+                incomplete_details=Obj(reason="max_output_tokens"),
+                usage=Obj(input_tokens=50, output_tokens=1000),
+            )
+        tail = "## Conclusion\n\nBuy."
+        return Obj(output_text=tail, status="completed", usage=Obj(input_tokens=50, output_tokens=9))
+
+
+def test_reply_cut_by_the_token_cap_gets_its_ending_rewritten(tmp_path, fake_openai_errors):
+    # The cap ended the reply inside its Conclusion, so every heading is there.
+    text = _long_article(sections=4, words_per_section=60).replace("Buy now.", "Buy the")
+    responses = _TruncatedResponses(text)
+
+    article = generate_article(
+        topic="Truncated reply",
+        words=800,
+        tone="friendly",
+        audience="beginners",
+        country="India",
+        out_dir=str(tmp_path),
+        model="m",
+        client=Obj(responses=responses),
+    )
+
+    assert len(responses.calls) == 2
+    assert "Buy the" not in article.body
+    assert article.body.rstrip().endswith("Buy.")
+    assert article.body.count("## Conclusion") == 1
+    assert article.body.count("## FAQs") == 1
+    assert validate_body(article.body) == []
@@ -0,0 +1,68 @@
+import random
+
+from ai_blog import dedupe
+from ai_blog.dedupe import find_duplicates, lsh_bands, minhash, shingles, similarity
+from ai_blog.utils import build_frontmatter, write_markdown
+
+
+def _words(seed, count=600):
+    rng = random.Random(seed)
+    return [f"w{rng.randrange(5000)}" for _ in range(count)]
+
+
+def _write(out, slug, words, kind=None):
+    frontmatter = build_frontmatter(slug, slug, "Meta.", slug, 800, kind=kind)
+    write_markdown(out / f"{slug}.md", frontmatter, f"# {slug}\n\n" + " ".join(words))
+
+
+def test_minhash_estimates_jaccard_similarity():
+    words = _words(1)
+    left = shingles(" ".join(words))
+    right = shingles(" ".join(words[:450] + _words(2, 150)))
+    exact = len(left & right) / len(left | right)
+    assert abs(similarity(minhash(left), minhash(right)) - exact) < 0.15
+    assert similarity(minhash(left), minhash(left)) == 1.0
+    assert minhash(set()) == []
+
+
+def test_lsh_bands_put_the_candidate_threshold_under_the_target():
+    bands, rows = lsh_bands(0.8)
+    assert bands * rows == 128
+    assert (1 / bands) ** (1 / rows) <= 0.8
+
+
+def test_duplicates_are_clustered_and_signatures_reused(tmp_path):
+    base = _words(1)
+    _write(tmp_path, "a", base)
+    _write(tmp_path, "a-copy", base)
+    _write(tmp_path, "a-edited", base[:570] + _words(3, 30))
+    _write(tmp_path, "b", _words(4))
+    _write(tmp_path, "a-outline", base, kind="outline")
+
+    report = find_duplicates(tmp_path)
+
+    assert report.scanned == 5
+    assert [cluster.paths for cluster in report.clusters] == [["a-copy.md", "a-edited.md", "a.md"]]
+    assert report.clusters[0].max_similarity > 0.95
+
+    again = find_duplicates(tmp_path)
+    assert (again.scanned, again.reused) == (0, 5)
+    assert [cluster.paths for cluster in again.clusters] == [
+        cluster.paths for cluster in report.clusters
+    ]
+
+
+def test_file_deleted_during_the_scan_is_dropped(tmp_path, monkeypatch):
+    _write(tmp_path, "a", _words(1))
+    _write(tmp_path, "b", _words(2))
+    scan_file = dedupe.scan_file
+
+    def vanishing_scan(path, shingle_words):
+        if path.name == "a.md":
+            path.unlink()
+        return scan_file(path, shingle_words)
+
+    monkeypatch.setattr(dedupe, "scan_file", vanishing_scan)
+    report = find_duplicates(tmp_path)
+    assert report.scanned == 2
+    assert list(report.titles) == ["b.md"]
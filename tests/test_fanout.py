@@ -0,0 +1,157 @@
+import threading
+import time
+
+import pytest
+
+from ai_blog import generator
+from ai_blog.fanout import FanoutSpecError, Variant, fanout_article, parse_variant, split_sections
+from ai_blog.outline_parse import read_frontmatter
+from ai_blog.utils import validate_body
+
+from conftest import Obj
+
+
+class _AdaptingResponses:
+    """Echo the section back with the country swapped, like a real adaptation."""
+
+    def __init__(self):
+        self.prompts = []
+
+    def create(self, model, input, **kwargs):
+        user = input[1]["content"]
+        self.prompts.append(user)
+        text = user.split("MARKDOWN TO ADAPT:\n", 1)[1].replace("India", "US")
+        if "Original title:" in user:
+            text = f"TITLE: Adapted title\nMETA: Adapted meta\nBODY:\n{text}"
+        usage = Obj(input_tokens=100, output_tokens=50)
+        return Obj(output_text=text, usage=usage)
+
+
+def test_parse_variant():
+    assert parse_variant("country=US, audience=experts") == Variant(country="US", audience="experts")
+    assert Variant(country="UK", language="Hindi").suffix() == "uk-hindi"
+    with pytest.raises(FanoutSpecError):
+        parse_variant("planet=Mars")
+
+
+def test_variants_that_would_share_a_file_are_rejected(tmp_path):
+    with pytest.raises(FanoutSpecError, match="-us"):
+        fanout_article(
+            topic="Best pens",
+            words=800,
+            tone="friendly",
+            audience="beginners",
+            country="India",
+            variants=[Variant(country="US"), Variant(audience="us")],
+            out_dir=str(tmp_path),
+            model="m",
+            provider="mock",
+        )
+    assert not list(tmp_path.iterdir())
+
+
+def test_split_sections_keeps_head_and_each_h2():
+    body = "# Title\n\nIntro.\n\n## One\n\nA.\n\n## Two\n\nB."
+    assert split_sections(body) == ["# Title\n\nIntro.", "## One\n\nA.", "## Two\n\nB."]
+
+
+def test_mock_fanout_writes_linked_variants(tmp_path):
+    result = fanout_article(
+        topic="Best pens",
+        words=800,
+        tone="friendly",
+        audience="beginners",
+        country="India",
+        variants=[Variant(country="US"), Variant(audience="experts", language="Hindi")],
+        out_dir=str(tmp_path),
+        model="m",
+        provider="mock",
+    )
+    assert [a.slug for a in result.variants] == ["best-pens-us", "best-pens-experts-hindi"]
+    us = result.variants[0]
+    assert "India" not in us.body and "US" in us.body
+    assert validate_body(us.body) == []
+    fm = read_frontmatter(us.path)
+    assert (fm["base_slug"], fm["country"], fm["kind"]) == ("best-pens", "US", "variant")
+    assert read_frontmatter(result.variants[1].path)["language"] == "Hindi"
+
+
+def test_openai_fanout_adapts_each_section_in_parallel(tmp_path, fake_openai_errors):
+    base = generator._mock_article("Best pens", 800, "friendly", "beginners", "India", False)
+    base_text = f"TITLE: {base.title}\nMETA: {base.meta_description}\nBODY:\n{base.body}"
+    responses = _AdaptingResponses()
+
+    class _Client:
+        def __init__(self):
+            self.responses = self
+
+        def create(self, model, input, **kwargs):
+            if "MARKDOWN TO ADAPT" not in input[1]["content"]:
+                return Obj(output_text=base_text, usage=None)
+            return responses.create(model, input)
+
+    result = fanout_article(
+        topic="Best pens",
+        words=800,
+        tone="friendly",
+        audience="beginners",
+        country="India",
+        variants=[Variant(country="US")],
+        out_dir=str(tmp_path),
+        model="m",
+        client=_Client(),
+    )
+    variant = result.variants[0]
+    sections = split_sections(base.body)
+    assert len(responses.prompts) == len(sections)
+    assert variant.title == "Adapted title"
+    assert variant.usage.calls == len(sections)
+    assert validate_body(variant.body) == []
+    assert "India" not in variant.body
+
+
+def test_variants_are_adapted_concurrently_within_the_call_bound(tmp_path, fake_openai_errors):
+    base = generator._mock_article("Best pens", 800, "friendly", "beginners", "India", False)
+    base_text = f"TITLE: {base.title}\nMETA: {base.meta_description}\nBODY:\n{base.body}"
+    responses = _AdaptingResponses()
+    # Each variant's head call waits for the other's, so this only passes
+    # if the two variants are adapted at the same time.
+    heads = threading.Barrier(2, timeout=5)
+    lock = threading.Lock()
+    state = {"in_flight": 0, "peak": 0}
+
+    class _Client:
+        def __init__(self):
+            self.responses = self
+
+        def create(self, model, input, **kwargs):
+            user = input[1]["content"]
+            if "MARKDOWN TO ADAPT" not in user:
+                return Obj(output_text=base_text, usage=None)
+            with lock:
+                state["in_flight"] += 1
+                state["peak"] = max(state["peak"], state["in_flight"])
+            try:
+                if "Original title:" in user:
+                    heads.wait()
+                time.sleep(0.005)
+                return responses.create(model, input)
+            finally:
+                with lock:
+                    state["in_flight"] -= 1
+
+    result = fanout_article(
+        topic="Best pens",
+        words=800,
+        tone="friendly",
+        audience="beginners",
+        country="India",
+        variants=[Variant(country="US"), Variant(country="UK")],
+        out_dir=str(tmp_path),
+        model="m",
+        client=_Client(),
+        concurrency=2,
+    )
+    assert [a.slug for a in result.variants] == ["best-pens-us", "best-pens-uk"]
+    assert len(responses.prompts) == 2 * len(split_sections(base.body))
+    assert state["peak"] == 2
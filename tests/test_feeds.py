@@ -0,0 +1,69 @@
+import xml.etree.ElementTree as ET
+
+from ai_blog.feeds import pages_from_index, write_feed, write_sitemap
+from ai_blog.index import build_index
+from ai_blog.utils import build_frontmatter, write_markdown
+
+NS = {"s": "http://www.sitemaps.org/schemas/sitemap/0.9"}
+
+
+def _write(out, slug, day, kind=None):
+    frontmatter = build_frontmatter(
+        f"Title {slug} & more", slug, f"About {slug}.", slug, 800, date_str=day, kind=kind
+    )
+    write_markdown(out / f"{slug}.md", frontmatter, f"# Title {slug}\n\nBody.")
+
+
+def _pages(out):
+    return pages_from_index(build_index(out, body_stats=False).entries)
+
+
+def test_sitemap_splits_and_only_rewrites_changed_parts(tmp_path):
+    for n in range(5):
+        _write(tmp_path, f"post-{n}", f"2024-01-0{n + 1}")
+    _write(tmp_path, "post-0-outline", "2024-01-01", kind="outline")
+
+    report = write_sitemap(tmp_path, "https://example.com/blog/", _pages(tmp_path), max_urls=2)
+
+    assert sorted(report.written) == ["sitemap-1.xml", "sitemap-2.xml", "sitemap-3.xml", "sitemap.xml"]
+    index = ET.parse(tmp_path / "sitemap.xml").getroot()
+    assert [loc.text for loc in index.findall("s:sitemap/s:loc", NS)] == [
+        f"https://example.com/blog/sitemap-{n}.xml" for n in (1, 2, 3)
+    ]
+    first = ET.parse(tmp_path / "sitemap-1.xml").getroot()
+    assert [loc.text for loc in first.findall("s:url/s:loc", NS)] == [
+        "https://example.com/blog/post-0/",
+        "https://example.com/blog/post-1/",
+    ]
+
+    _write(tmp_path, "post-5", "2024-01-06")
+    report = write_sitemap(tmp_path, "https://example.com/blog", _pages(tmp_path), max_urls=2)
+    assert sorted(report.written) == ["sitemap-3.xml", "sitemap.xml"]
+    assert report.unchanged == 2
+
+    for n in range(4):
+        (tmp_path / f"post-{n}.md").unlink()
+    report = write_sitemap(tmp_path, "https://example.com/blog", _pages(tmp_path), max_urls=2)
+    assert report.removed == ["sitemap-1.xml", "sitemap-2.xml", "sitemap-3.xml"]
+    urlset = ET.parse(tmp_path / "sitemap.xml").getroot()
+    assert len(urlset.findall("s:url", NS)) == 2
+
+
+def test_feed_lists_the_newest_pages_and_skips_unchanged_writes(tmp_path):
+    for n in range(3):
+        _write(tmp_path, f"post-{n}", f"2024-02-0{n + 1}")
+
+    report = write_feed(tmp_path, "https://example.com", _pages(tmp_path), "My blog", limit=2)
+
+    assert report.written == ["feed.xml"]
+    channel = ET.parse(tmp_path / "feed.xml").getroot().find("channel")
+    items = channel.findall("item")
+    assert [item.findtext("link") for item in items] == [
+        "https://example.com/post-2/",
+        "https://example.com/post-1/",
+    ]
+    assert items[0].findtext("title") == "Title post-2 & more"
+    assert items[0].findtext("pubDate") == "Sat, 03 Feb 2024 00:00:00 +0000"
+
+    again = write_feed(tmp_path, "https://example.com", _pages(tmp_path), "My blog", limit=2)
+    assert (again.written, again.unchanged) == ([], 1)
@@ -0,0 +1,55 @@
+from ai_blog import prompts
+from ai_blog.fingerprint import generation_fingerprint, is_stale, prompt_hash, stored_fingerprint
+from ai_blog.generator import generate_article
+
+
+def _fingerprint(**overrides):
+    settings = dict(
+        kind="article",
+        topic="Test Topic",
+        words=1200,
+        tone="friendly",
+        audience="beginners",
+        country="India",
+        model="gpt-4o-mini",
+        provider="mock",
+    )
+    settings.update(overrides)
+    return generation_fingerprint(**settings)
+
+
+def test_generated_file_records_current_fingerprint(tmp_path):
+    article = generate_article(
+        topic="Test Topic",
+        words=1200,
+        tone="friendly",
+        audience="beginners",
+        country="India",
+        out_dir=str(tmp_path),
+        model="gpt-4o-mini",
+        provider="mock",
+    )
+    assert stored_fingerprint(article.path) == _fingerprint()
+    assert not is_stale(article.path, _fingerprint())
+    assert is_stale(article.path, _fingerprint(tone="formal"))
+    assert is_stale(tmp_path / "missing.md", _fingerprint())
+
+
+def test_fingerprint_tracks_model_and_prompt_changes(monkeypatch):
+    assert _fingerprint(model="a") == _fingerprint(model="b")
+    assert _fingerprint(provider="openai", model="a") != _fingerprint(provider="openai", model="b")
+
+    before = _fingerprint()
+    monkeypatch.setattr(prompts, "BLOG_INSTRUCTIONS", prompts.BLOG_INSTRUCTIONS + " Be brief.")
+    monkeypatch.setattr(
+        prompts,
+        "blog_user_prompt",
+        lambda topic, words, tone, audience, country: prompts.BLOG_INSTRUCTIONS + topic,
+    )
+    prompt_hash.cache_clear()
+    try:
+        assert _fingerprint() != before
+    finally:
+        monkeypatch.undo()
+        prompt_hash.cache_clear()
+    assert _fingerprint() == before
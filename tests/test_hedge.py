@@ -0,0 +1,155 @@
+import asyncio
+import time
+
+from ai_blog.hedge import HedgePolicy, Hedger, LatencyTracker
+from ai_blog.limiter import AdaptiveLimiter
+from ai_blog.usage import Usage
+
+
+def _calibrated(policy):
+    hedger = Hedger(policy)
+    for _ in range(100):
+        hedger.tracker().record(0.01)
+    return hedger
+
+
+def test_latency_tracker_percentile():
+    tracker = LatencyTracker(window=100)
+    assert tracker.percentile(0.9) is None
+    for ms in range(1, 101):
+        tracker.record(ms / 1000)
+    assert tracker.percentile(0.5) == 0.05
+    assert tracker.percentile(0.95) == 0.095
+
+
+def test_slow_call_is_hedged_to_other_model():
+    hedger = _calibrated(HedgePolicy(min_samples=5, min_delay=0.02, max_ratio=1.0, model="fast"))
+    calls = []
+
+    def fn(client, model, usage):
+        calls.append(model)
+        usage.add(Usage(calls=1, output_tokens=10))
+        time.sleep(0.5 if model == "slow" else 0.01)
+        return model
+
+    usage = Usage()
+    start = time.monotonic()
+    assert hedger.call(fn, None, "slow", usage) == "fast"
+    assert time.monotonic() - start < 0.3
+    assert calls == ["slow", "fast"]
+    assert usage.calls == 1
+    assert (hedger.stats.hedged, hedger.stats.hedge_wins) == (1, 1)
+    # The slow loser is still billed; it is handed over once it finishes.
+    hedger.close()
+    assert hedger.take_wasted() == {"slow": Usage(calls=1, output_tokens=10)}
+    assert hedger.take_wasted() == {}
+
+
+def test_latency_is_tracked_per_call_kind():
+    hedger = _calibrated(HedgePolicy(min_samples=5, min_delay=0.01, max_ratio=1.0))
+    calls = []
+
+    def fn(client, model, usage):
+        calls.append(model)
+        time.sleep(0.05)
+        return "ok"
+
+    # Article calls are calibrated; finish calls have no samples yet.
+    assert hedger.delay() == 0.01
+    assert hedger.delay("finish") is None
+    assert hedger.call(fn, None, "m", kind="finish") == "ok"
+    assert calls == ["m"] and hedger.stats.hedged == 0
+    assert len(hedger.tracker("finish")) == 1
+    assert len(hedger.tracker()) == 100
+
+
+def test_hedge_budget_caps_duplicates():
+    hedger = _calibrated(HedgePolicy(min_samples=5, min_delay=0.01, max_ratio=0.5))
+
+    def fn(client, model, usage):
+        time.sleep(0.05)
+        return "ok"
+
+    for _ in range(4):
+        assert hedger.call(fn, None, "m") == "ok"
+    assert hedger.stats.calls == 4
+    assert hedger.stats.hedged == 2
+
+
+def test_failed_primary_falls_back_to_hedge():
+    hedger = _calibrated(HedgePolicy(min_samples=5, min_delay=0.01, max_ratio=1.0, model="b"))
+
+    def fn(client, model, usage):
+        if model == "a":
+            time.sleep(0.05)
+            raise TimeoutError("upstream timeout")
+        time.sleep(0.1)
+        return "b"
+
+    assert hedger.call(fn, None, "a") == "b"
+
+
+def test_async_hedge_cancels_loser():
+    hedger = _calibrated(HedgePolicy(min_samples=5, min_delay=0.02, max_ratio=1.0, model="fast"))
+    cancelled = []
+
+    async def fn(client, model, usage):
+        try:
+            await asyncio.sleep(1.0 if model == "slow" else 0.01)
+        except asyncio.CancelledError:
+            cancelled.append(model)
+            raise
+        return model
+
+    assert asyncio.run(hedger.acall(fn, None, "slow")) == "fast"
+    assert cancelled == ["slow"]
+
+
+def test_hedge_takes_a_limiter_slot_or_is_skipped():
+    hedger = _calibrated(HedgePolicy(min_samples=5, min_delay=0.02, max_ratio=1.0, model="fast"))
+    limiter = AdaptiveLimiter(initial=2, max_limit=2)
+    in_flight = []
+
+    def fn(client, model, usage):
+        in_flight.append((model, limiter.in_flight))
+        time.sleep(0.2 if model == "slow" else 0.01)
+        return model
+
+    # The primary's own slot, as taken by AdaptiveLimiter.call.
+    token = limiter.acquire()
+    assert hedger.call(fn, None, "slow", limiter=limiter) == "fast"
+    assert in_flight == [("slow", 1), ("fast", 2)]
+    # The losing primary still runs; the hedge's slot is back once it is done.
+    hedger.close()
+    assert limiter.in_flight == 1
+
+    # With every slot taken, the slow call is left to finish unhedged.
+    busy = limiter.acquire()
+    hedger = _calibrated(HedgePolicy(min_samples=5, min_delay=0.02, max_ratio=1.0, model="fast"))
+    in_flight.clear()
+    assert hedger.call(fn, None, "slow", limiter=limiter) == "slow"
+    assert in_flight == [("slow", 2)]
+    assert hedger.stats.hedged == 0
+    limiter.release(busy, None)
+    limiter.release(token, None)
+    assert limiter.in_flight == 0
+
+
+def test_async_hedge_returns_its_slot_when_cancelled():
+    hedger = _calibrated(HedgePolicy(min_samples=5, min_delay=0.02, max_ratio=1.0, model="slow"))
+    limiter = AdaptiveLimiter(initial=2, max_limit=2)
+
+    async def fn(client, model, usage):
+        await asyncio.sleep(1.0 if model == "slow" else 0.05)
+        return model
+
+    async def run():
+        token = await limiter.aacquire()
+        result = await hedger.acall(fn, None, "fast", limiter=limiter)
+        await asyncio.sleep(0)
+        limiter.release(token, None)
+        return result
+
+    assert asyncio.run(run()) == "fast"
+    assert hedger.stats.hedged == 1
+    assert limiter.in_flight == 0
@@ -0,0 +1,59 @@
+import os
+
+from ai_blog import index
+from ai_blog.generator import generate_article
+from ai_blog.index import build_index, load_index
+
+
+def _generate(out_dir, topic):
+    return generate_article(
+        topic=topic,
+        words=1200,
+        tone="friendly",
+        audience="beginners",
+        country="India",
+        out_dir=str(out_dir),
+        model="gpt-4o-mini",
+        provider="mock",
+    )
+
+
+def test_build_index_rereads_only_changed_files(tmp_path):
+    first = _generate(tmp_path, "First Topic")
+    second = _generate(tmp_path, "Second Topic")
+
+    report = build_index(tmp_path, workers=2)
+    assert (report.scanned, report.reused) == (2, 0)
+    entries = load_index(tmp_path)
+    entry = entries["first-topic.md"]
+    assert entry.frontmatter["topic"] == "First Topic"
+    assert entry.h2_count >= 5
+    assert entry.word_count > 100
+
+    report = build_index(tmp_path)
+    assert (report.scanned, report.reused) == (0, 2)
+
+    with open(second.path, "a", encoding="utf-8") as handle:
+        handle.write("\n## Extra\n")
+    os.remove(first.path)
+    report = build_index(tmp_path)
+    assert (report.scanned, report.reused, report.removed) == (1, 0, 1)
+    assert [entry.path for entry in report.entries] == ["second-topic.md"]
+    assert report.entries[0].h2_count == entries["second-topic.md"].h2_count + 1
+
+
+def test_file_deleted_during_the_scan_is_dropped(tmp_path, monkeypatch):
+    first = _generate(tmp_path, "First Topic")
+    _generate(tmp_path, "Second Topic")
+    scan_file = index.scan_file
+
+    def vanishing_scan(path, body_stats=True):
+        if str(path) == first.path:
+            os.remove(path)
+        return scan_file(path, body_stats)
+
+    monkeypatch.setattr(index, "scan_file", vanishing_scan)
+    for body_stats in (True, False):
+        report = build_index(tmp_path, body_stats=body_stats)
+        assert [entry.path for entry in report.entries] == ["second-topic.md"]
+        _generate(tmp_path, "First Topic")
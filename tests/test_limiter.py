@@ -0,0 +1,120 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from ai_blog.errors import OpenAIRateLimitError
+from ai_blog.limiter import AdaptiveLimiter
+from ai_blog.metrics import metrics
+
+
+def metrics_limit():
+    return metrics.gauge("limiter.limit")
+
+
+def _ok(limiter, latency=1.0):
+    token = limiter.acquire()
+    limiter.release(token, latency)
+
+
+def test_additive_increase_per_window_of_successes():
+    limiter = AdaptiveLimiter(initial=2, max_limit=4)
+    for _ in range(2):
+        _ok(limiter)
+    assert limiter.limit == 3
+    for _ in range(3):
+        _ok(limiter)
+    assert limiter.limit == 4
+    for _ in range(10):
+        _ok(limiter)
+    assert limiter.limit == 4
+
+
+def test_one_burst_of_429s_cuts_once():
+    limiter = AdaptiveLimiter(initial=8)
+    tokens = [limiter.acquire() for _ in range(8)]
+    for token in tokens:
+        limiter.release(token, None, rate_limited=True)
+    assert limiter.limit == 4
+    token = limiter.acquire()
+    limiter.release(token, None, rate_limited=True)
+    assert limiter.limit == 2
+
+
+def test_latency_spike_cuts_limit():
+    limiter = AdaptiveLimiter(initial=10, max_limit=10, min_samples=3)
+    for _ in range(5):
+        _ok(limiter, latency=1.0)
+    _ok(limiter, latency=10.0)
+    assert limiter.limit == 5
+
+
+def test_call_retries_rate_limits_and_caps_concurrency():
+    sleeps = []
+    limiter = AdaptiveLimiter(initial=2, max_limit=2, sleep=sleeps.append)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise OpenAIRateLimitError("429")
+        return "ok"
+
+    assert limiter.call(flaky) == "ok"
+    assert sleeps == [1.0, 2.0]
+    assert metrics_limit() == limiter.limit == 2
+
+    with pytest.raises(OpenAIRateLimitError):
+        limiter.call(lambda: (_ for _ in ()).throw(OpenAIRateLimitError("429")))
+
+    limiter = AdaptiveLimiter(initial=2, max_limit=2)
+    lock = threading.Lock()
+    active = [0]
+    peak = [0]
+
+    def work():
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.01)
+        with lock:
+            active[0] -= 1
+
+    threads = [threading.Thread(target=limiter.call, args=(work,)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak[0] == 2
+
+
+def test_async_waiters_get_slots_in_order_and_cancelled_ones_leave_the_line():
+    limiter = AdaptiveLimiter(initial=1, max_limit=1)
+    order = []
+
+    async def main():
+        release = asyncio.Event()
+
+        async def hold():
+            await release.wait()
+            return "held"
+
+        async def job(name):
+            await limiter.acall(lambda: _record(name))
+
+        async def _record(name):
+            order.append(name)
+
+        holder = asyncio.ensure_future(limiter.acall(hold))
+        await asyncio.sleep(0)
+        tasks = [asyncio.ensure_future(job(n)) for n in "abcd"]
+        await asyncio.sleep(0)
+        tasks[1].cancel()
+        release.set()
+        assert await holder == "held"
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    asyncio.run(main())
+    assert order == ["a", "c", "d"]
+    assert limiter.in_flight == 0 and len(limiter._waiters) == 0
@@ -0,0 +1,115 @@
+import json
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("scipy")
+
+from ai_blog import links
+from ai_blog.links import build_links, sidecar_path
+from ai_blog.outline_parse import read_frontmatter
+from ai_blog.utils import build_frontmatter, write_markdown
+
+TOPICS = {
+    "budget-earbuds": "wireless earbuds battery bass budget",
+    "gaming-earbuds": "gaming earbuds latency wireless bass",
+    "student-laptops": "student laptops battery keyboard budget",
+    "gaming-laptops": "gaming laptops graphics keyboard cooling",
+    "coffee-beans": "coffee beans roast grinder espresso",
+    "coffee-grinders": "coffee grinders burr espresso beans",
+}
+
+
+def _write(out, slug, words, kind=None):
+    body = f"# {slug}\n\n## Why {words.split()[0]}\n\n" + (words + " ") * 20
+    frontmatter = build_frontmatter(slug, slug, "Meta.", slug, 800, kind=kind)
+    write_markdown(out / f"{slug}.md", frontmatter, body)
+
+
+def _related(report):
+    return {name: [other for other, _ in links] for name, links in report.suggestions.items()}
+
+
+def test_links_rank_related_articles_and_write_a_sidecar(tmp_path):
+    for slug, words in TOPICS.items():
+        _write(tmp_path, slug, words)
+    _write(tmp_path, "coffee-beans-outline", TOPICS["coffee-beans"], kind="outline")
+
+    report = build_links(tmp_path, k=2)
+
+    assert report.full and report.read == 7
+    related = _related(report)
+    assert "coffee-beans-outline.md" not in related
+    assert related["coffee-beans.md"][0] == "coffee-grinders.md"
+    assert related["budget-earbuds.md"][0] == "gaming-earbuds.md"
+    assert all("coffee-beans-outline.md" not in links for links in related.values())
+    lines = sidecar_path(tmp_path).read_text(encoding="utf-8").splitlines()
+    record = json.loads(lines[0])
+    assert record["path"] == "budget-earbuds.md"
+    assert record["links"][0]["path"] == "gaming-earbuds.md"
+
+
+def test_incremental_update_matches_a_full_rebuild(tmp_path, monkeypatch):
+    # Patch the previous lists even though a third of this corpus changes.
+    monkeypatch.setattr(links, "FULL_REBUILD_RATIO", 1.0)
+    for slug, words in TOPICS.items():
+        _write(tmp_path, slug, words)
+    build_links(tmp_path, k=2)
+
+    _write(tmp_path, "espresso-machines", "espresso machines coffee beans milk")
+    (tmp_path / "gaming-laptops.md").unlink()
+    report = build_links(tmp_path, k=2)
+
+    assert not report.full
+    assert (report.read, report.reused, report.removed) == (1, 5, 1)
+    assert "espresso-machines.md" in _related(report)["coffee-beans.md"]
+    rebuilt = build_links(tmp_path, k=2, full=True)
+    assert _related(report) == _related(rebuilt)
+
+
+def test_incremental_update_scores_changed_articles_in_blocks(tmp_path, monkeypatch):
+    monkeypatch.setattr(links, "FULL_REBUILD_RATIO", 1.0)
+    for slug, words in TOPICS.items():
+        _write(tmp_path, slug, words)
+    build_links(tmp_path, k=2)
+
+    # One changed article per block.
+    monkeypatch.setattr(links, "BLOCK_CELLS", 1)
+    _write(tmp_path, "espresso-machines", "espresso machines coffee beans milk")
+    _write(tmp_path, "gaming-mice", "gaming mice latency wireless sensor")
+    report = build_links(tmp_path, k=2)
+
+    assert not report.full and report.read == 2
+    rebuilt = build_links(tmp_path, k=2, full=True)
+    assert _related(report) == _related(rebuilt)
+
+
+def test_frontmatter_related_does_not_invalidate_the_cache(tmp_path):
+    for slug, words in TOPICS.items():
+        _write(tmp_path, slug, words)
+
+    first = build_links(tmp_path, k=2, frontmatter=True)
+    assert first.updated_frontmatter == len(TOPICS)
+    related = json.loads(read_frontmatter(tmp_path / "coffee-beans.md")["related"])
+    assert related[0] == "coffee-grinders"
+
+    again = build_links(tmp_path, k=2, frontmatter=True)
+    assert (again.read, again.updated_frontmatter, again.recomputed) == (0, 0, 0)
+    text = (tmp_path / "coffee-beans.md").read_text(encoding="utf-8")
+    assert text.count("related:") == 1
+
+
+def test_file_deleted_during_the_scan_is_dropped(tmp_path, monkeypatch):
+    for slug, words in TOPICS.items():
+        _write(tmp_path, slug, words)
+    read_doc = links._read_doc
+
+    def vanishing_read(path):
+        if path.name == "coffee-beans.md":
+            path.unlink()
+        return read_doc(path)
+
+    monkeypatch.setattr(links, "_read_doc", vanishing_read)
+    report = build_links(tmp_path, k=2)
+    assert report.documents == len(TOPICS) - 1
+    assert "coffee-beans.md" not in _related(report)
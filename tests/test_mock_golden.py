@@ -0,0 +1,95 @@
+import hashlib
+
+import pytest
+
+from ai_blog.generator import (
+    _build_dry_run_outline,
+    _build_dry_run_output,
+    _expand_mock_section,
+    _topic_words,
+)
+
+# Digests of the mock output produced before the generators were rewritten
+# around shared template tuples; they must reproduce it byte for byte.
+CASES = [
+    (
+        ("best earbuds under 5000 in india", "India", "beginners"),
+        ("30edcd541e8173d8", "39450efddeb3dc33", "be6a3a8ebee5d133", "8f00f140d5c0906e"),
+    ),
+    (
+        ("AI voice tools", "US", "pros"),
+        ("efe342460bf60421", "9a5b3ae5ef8ce5db", "8636d4c8c8bcea5b", "6f1bd205b5d70c1f"),
+    ),
+    (
+        ("the best of the top", "Canada", "beginners"),
+        ("5b7a1afd9287dfe9", "0e08489abe9ffd0a", "ac99ef5aee259b6a", "094a3539feb6ce75"),
+    ),
+]
+
+
+def _digest(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+@pytest.mark.parametrize("args,expected", CASES)
+def test_mock_output_matches_golden(args, expected):
+    topic, country, audience = args
+    article = _build_dry_run_output(
+        topic, 1200, "friendly", audience, country, "MOCK OUTPUT: banner", "MOCK"
+    )
+    outline = _build_dry_run_outline(topic, "friendly", audience, country, "DRY RUN")
+    expanded = _expand_mock_section(
+        "Some Heading", ["- one", "- two", "- three"], topic, "friendly", audience, country
+    )
+    templated = _expand_mock_section("Some Heading", [], None, "friendly", audience, country)
+
+    assert _digest(article.title + article.meta_description + article.body) == expected[0]
+    assert _digest(outline.title + outline.meta_description + outline.body) == expected[1]
+    assert _digest(expanded) == expected[2]
+    assert _digest(templated) == expected[3]
+
+
+_WORDS = (
+    "best", "earbuds", "laptops", "AI", "voice", "tools", "under", "5000", "for",
+    "running", "the", "budget", "phones", "gaming", "chairs", "vs", "top",
+)
+
+
+def test_mock_output_matches_baseline_for_many_inputs():
+    # One digest over 3000 varied inputs, taken from the original generators.
+    h = hashlib.sha256()
+    for i in range(3000):
+        steps = (1, 3, 7, 11)[: 1 + i % 4]
+        topic = " ".join(_WORDS[(i * k + i // 17) % len(_WORDS)] for k in steps)
+        country = ("India", "US", "Canada", " india ")[i % 4]
+        audience = ("beginners", "pros", "students")[i % 3]
+        tone = ("friendly", "formal")[(i // 5) % 2]
+        article = _build_dry_run_output(topic, 1200, tone, audience, country, f"banner {i}", "MOCK")
+        outline = _build_dry_run_outline(topic, tone, audience, country, "DRY RUN")
+        lines = [f"- point {j}" for j in range(i % 6)] + ["plain line"]
+        expanded = _expand_mock_section(
+            f"Section {i % 11}", lines, topic if i % 2 else None, tone, audience, country
+        )
+        for text in (
+            article.title,
+            article.meta_description,
+            article.body,
+            outline.title,
+            outline.meta_description,
+            outline.body,
+            expanded,
+        ):
+            h.update(text.encode("utf-8") + b"\0")
+    assert h.hexdigest()[:16] == "1c5d92203abb5e8c"
+
+
+def test_values_with_braces_and_newlines_render_literally():
+    article = _build_dry_run_output(
+        "{topic}\nline two", 1200, "friendly", "beginners", "India", "banner", "MOCK"
+    )
+    assert "{topic}\nline two in India" in article.body
+
+
+def test_topic_words_dedupes_and_defaults():
+    assert _topic_words("Best earbuds and earbuds for runners") == ["earbuds", "runners"]
+    assert _topic_words("the best") == ["quality", "budget", "features"]
@@ -0,0 +1,109 @@
+from ai_blog.generator import generate_article
+from ai_blog.metrics import metrics
+from ai_blog.utils import normalize_body, validate_body
+
+from conftest import Obj
+
+SLOPPY = """### Quick answer
+
+- Yes.
+
+### Battery life
+
+Long.
+
+### Sound
+
+Good.
+
+**Decision checklist**
+
+- Budget
+
+### Frequently asked questions
+
+1. **Q:** Are they waterproof?
+   **A:** Mostly.
+- Q: Do they fit small ears?
+- A: Yes.
+**Question: Is there a warranty?**
+Answer: One year.
+#### Can I use them for calls?
+Yes, the mics are fine.
+**Do they support fast charging?**
+Some models do.
+
+### Conclusion
+
+Pick one today."""
+
+
+def test_normalize_body_fixes_common_format_slips():
+    assert validate_body(SLOPPY) == [
+        "Missing H1 title",
+        "Needs at least 5 H2 headings",
+        "FAQs must include at least 5 Q/A pairs",
+    ]
+    fixed = normalize_body(SLOPPY, title="Best earbuds")
+    assert validate_body(fixed) == []
+    assert fixed.startswith("# Best earbuds\n")
+    assert "## Decision checklist" in fixed
+    assert "Q: Is there a warranty?\nA: One year." in fixed
+    assert "Q: Can I use them for calls?\nA: Yes, the mics are fine." in fixed
+    assert "Q: Do they support fast charging?\nA: Some models do." in fixed
+
+
+def test_normalize_body_demotes_extra_h1_sections_and_keeps_valid_bodies():
+    body = "# Title\n\n# One\n\n# Two\n\n# Three\n\n# FAQs\n\nQ: a?\nA: b.\n\n# Conclusion\n\nBye."
+    fixed = normalize_body(body)
+    assert fixed.count("\n## ") == 5 and fixed.startswith("# Title")
+    valid = "# T\n\n## A\n\nText.\n\n## FAQs\n\nQ: a?\nA: b.\n\n- not a pair"
+    assert normalize_body(valid) == valid
+
+
+def test_normalize_body_labels_only_the_first_answer_line():
+    body = """# T
+
+## FAQs
+
+**Which tips should I use?**
+Start with the medium tips.
+
+a) Try the small ones if they slip.
+Answer: it depends on your ears.
+Q: Is there a warranty?
+A: One year.
+
+Keep the receipt.
+
+## Conclusion
+
+Bye."""
+    fixed = normalize_body(body)
+    assert "Q: Which tips should I use?\nA: Start with the medium tips.\n\n" in fixed
+    assert "\na) Try the small ones if they slip.\nAnswer: it depends on your ears.\n" in fixed
+    assert "A: One year.\n\nKeep the receipt.\n" in fixed
+    assert fixed.count("\nA: ") == 2
+
+
+def test_local_fix_skips_the_model_repair_call(tmp_path, fake_openai_errors):
+    calls = []
+
+    def create(model, input, **kwargs):
+        calls.append(input[1]["content"])
+        return Obj(output_text=f"TITLE: Best earbuds\nMETA: Meta\nBODY:\n{SLOPPY}", usage=None)
+
+    before = metrics.counter("repair.local_fixes")
+    article = generate_article(
+        topic="Sloppy earbuds",
+        words=800,
+        tone="friendly",
+        audience="beginners",
+        country="India",
+        out_dir=str(tmp_path),
+        model="m",
+        client=Obj(responses=Obj(create=create)),
+    )
+    assert len(calls) == 1
+    assert validate_body(article.body) == []
+    assert metrics.counter("repair.local_fixes") == before + 1
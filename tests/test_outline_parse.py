@@ -1,6 +1,11 @@
 import pytest
 
-from ai_blog.outline_parse import OutlineParseError, get_section, parse_outline_file
+from ai_blog.outline_parse import (
+    OutlineParseError,
+    get_section,
+    parse_outline_file,
+    read_frontmatter,
+)
 
 
 def test_parse_outline_with_frontmatter(tmp_path):
@@ -40,3 +45,16 @@ def test_get_section_out_of_range(tmp_path):
 
     with pytest.raises(OutlineParseError, match="Section out of range"):
         get_section(doc, 2)
+
+
+def test_read_frontmatter_stops_at_closing_delimiter(tmp_path):
+    path = tmp_path / "post.md"
+    path.write_text('---\ntitle: "A: B"\nword_count_target: 900\n---\n# Body\n', encoding="utf-8")
+    assert read_frontmatter(path) == {"title": "A: B", "word_count_target": "900"}
+
+    path.write_text("# No frontmatter\n", encoding="utf-8")
+    assert read_frontmatter(path) == {}
+
+    path.write_text("---\ntitle: x\n" + "pad: y\n" * 50, encoding="utf-8")
+    with pytest.raises(OutlineParseError):
+        read_frontmatter(path, max_bytes=100)
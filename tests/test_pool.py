@@ -0,0 +1,158 @@
+import asyncio
+import json
+
+import pytest
+
+from ai_blog import generator
+from ai_blog.errors import OpenAIAuthError, OpenAIRateLimitError
+from ai_blog.pool import PoolConfigError, PoolMember, ProviderPool, load_pool
+
+from conftest import FakeClock
+
+
+class _Responses:
+    def __init__(self, name, log, fail=None):
+        self.name = name
+        self.log = log
+        self.fail = fail
+
+    def create(self, model, input, **kwargs):
+        self.log.append(self.name)
+        if self.fail:
+            raise self.fail
+        return type("R", (), {"output_text": f"from {self.name}", "usage": None})()
+
+
+class _Client:
+    def __init__(self, name, log, fail=None):
+        self.responses = _Responses(name, log, fail)
+
+
+def test_acquire_prefers_least_loaded_by_weight():
+    pool = ProviderPool([PoolMember("a", weight=1), PoolMember("b", weight=3)])
+    picks = [pool.acquire().name for _ in range(4)]
+    assert picks.count("b") == 3 and picks.count("a") == 1
+
+
+def test_rate_limited_member_fails_over_and_cools_down():
+    clock = FakeClock()
+    log = []
+    pool = ProviderPool(
+        [
+            PoolMember("a", weight=2, client=_Client("a", log, TimeoutError("429"))),
+            PoolMember("b", client=_Client("b", log)),
+        ],
+        cooldown=10,
+        clock=clock,
+    )
+    call = lambda: generator.call_openai(pool, PermissionError, TimeoutError, "m", "s", "u")
+    assert call() == "from b"
+    assert call() == "from b"
+    assert log == ["a", "b", "b"]
+    assert [m["healthy"] for m in pool.snapshot()] == [False, True]
+
+    clock.now = 11
+    assert pool.snapshot()[0]["healthy"]
+
+
+def test_all_members_rate_limited_raises():
+    def limited(client):
+        raise OpenAIRateLimitError("quota")
+
+    pool = ProviderPool([PoolMember("a", client=object()), PoolMember("b", client=object())])
+    with pytest.raises(OpenAIRateLimitError):
+        pool.call(limited)
+
+
+def test_auth_disabled_members_count_as_tried():
+    auth, limited = object(), object()
+
+    def fn(client):
+        if client is auth:
+            raise OpenAIAuthError("401")
+        raise OpenAIRateLimitError("quota")
+
+    async def afn(client):
+        return fn(client)
+
+    pool = ProviderPool(
+        [
+            PoolMember("a", client=auth, async_client=auth),
+            PoolMember("b", client=limited, async_client=limited),
+        ],
+        cooldown=0.01,
+    )
+    for _ in range(2):
+        with pytest.raises(OpenAIRateLimitError):
+            pool.call(fn)
+    with pytest.raises(OpenAIRateLimitError):
+        asyncio.run(pool.acall(afn))
+    assert pool.members[0].disabled
+
+
+def test_async_callers_wait_in_line_for_a_busy_member():
+    pool = ProviderPool([PoolMember("a", max_in_flight=1, async_client=object())])
+    order = []
+
+    async def main():
+        async def job(name):
+            async def fn(client):
+                order.append(name)
+                await asyncio.sleep(0.001)
+
+            await pool.acall(fn)
+
+        tasks = [asyncio.ensure_future(job(n)) for n in "abcd"]
+        await asyncio.sleep(0)
+        tasks[2].cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    asyncio.run(main())
+    assert order == ["a", "b", "d"]
+    assert pool.members[0].in_flight == 0 and len(pool._waiters) == 0
+
+
+def test_consecutive_failures_take_member_out():
+    clock = FakeClock()
+    pool = ProviderPool([PoolMember("a"), PoolMember("b")], failure_threshold=2, clock=clock)
+    a = pool.members[0]
+    for _ in range(2):
+        a.in_flight += 1
+        pool.release(a, ok=False)
+    assert a.unhealthy_until == pool.cooldown
+    assert [pool.acquire().name for _ in range(3)] == ["b", "b", "b"]
+
+
+def test_rpm_limit_spreads_calls():
+    clock = FakeClock()
+    pool = ProviderPool([PoolMember("a", rpm=60), PoolMember("b", weight=0.1)], clock=clock)
+    assert pool.acquire().name == "a"
+    pool.release(pool.members[0], ok=True)
+    assert pool.acquire().name == "b"
+    clock.now = 1.0
+    pool.release(pool.members[1], ok=True)
+    assert pool.acquire().name == "a"
+
+
+def test_load_pool(tmp_path):
+    path = tmp_path / "pool.json"
+    path.write_text(
+        json.dumps(
+            {
+                "cooldown": 5,
+                "members": [
+                    {"name": "main", "api_key_env": "KEY_A", "weight": 2},
+                    {"base_url": "http://vllm:8000/v1", "max_in_flight": 4},
+                ],
+            }
+        ),
+        encoding="utf-8",
+    )
+    pool = load_pool(path)
+    assert pool.cooldown == 5
+    assert [m.name for m in pool.members] == ["main", "http://vllm:8000/v1"]
+    assert pool.members[1].max_in_flight == 4
+
+    path.write_text(json.dumps({"members": [{"name": "x", "colour": "red"}]}), encoding="utf-8")
+    with pytest.raises(PoolConfigError):
+        load_pool(path)
@@ -0,0 +1,73 @@
+import threading
+import time
+
+import pytest
+
+from ai_blog.progress import BatchProgress, BatchStats, format_snapshot
+
+from conftest import FakeClock
+
+
+def test_stats_report_rates_latency_and_eta():
+    clock = FakeClock()
+    stats = BatchStats(total=10, clock=clock)
+    items = [object() for _ in range(4)]
+    for item in items:
+        stats.start(item)
+    clock.now = 30.0
+    stats.finish(items[0], "ok", tokens=3000)
+    clock.now = 60.0
+    stats.finish(items[1], "failed")
+    stats.finish(items[2], "skipped")
+    stats.skip(2)
+
+    snap = stats.snapshot()
+    assert (snap.completed, snap.failed, snap.skipped, snap.in_flight) == (1, 1, 3, 1)
+    assert snap.per_minute == pytest.approx(2.0)
+    assert snap.tokens_per_minute == pytest.approx(3000.0)
+    assert snap.p50 == pytest.approx(30.0)
+    assert snap.p95 == pytest.approx(60.0)
+    # 5 topics left at 30 seconds per finished article.
+    assert snap.eta == pytest.approx(150.0)
+    line = format_snapshot(snap)
+    assert "1/10 done, 1 failed, 1 running, 3 skipped" in line
+    assert "ETA 2m 30s" in line
+
+
+def test_eta_is_unknown_without_a_total_or_results():
+    stats = BatchStats()
+    assert stats.snapshot().eta is None
+    assert "ETA -" in format_snapshot(stats.snapshot())
+    assert BatchStats(total=5).snapshot().eta is None
+
+
+def test_plain_progress_logs_periodically_and_on_exit():
+    lines = []
+    stats = BatchStats(total=2)
+    with BatchProgress(stats, log=lines.append, interval=0.01):
+        stats.start("a")
+        time.sleep(0.05)
+        stats.finish("a", "ok", tokens=10)
+    assert len(lines) >= 2
+    assert lines[-1].startswith("1/2 done")
+
+
+def test_total_is_counted_in_the_background():
+    release = threading.Event()
+    stats = BatchStats()
+
+    def count():
+        release.wait(5)
+        return 7
+
+    thread = stats.count_total(count)
+    assert stats.snapshot().total is None
+    release.set()
+    thread.join(5)
+    assert stats.snapshot().total == 7
+
+    def broken():
+        raise ValueError("bad row")
+
+    stats.count_total(broken).join(5)
+    assert stats.total == 7
@@ -0,0 +1,79 @@
+from ai_blog import prompts
+from ai_blog.generator import generate_article
+
+from conftest import Obj
+
+
+def _common_prefix(a, b):
+    n = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        n += 1
+    return n
+
+
+def test_variable_fields_come_after_static_instructions():
+    first = prompts.blog_user_prompt("best earbuds", 1200, "friendly", "beginners", "India")
+    second = prompts.blog_user_prompt("laptops", 800, "casual", "experts", "US")
+
+    assert first.startswith(prompts.BLOG_INSTRUCTIONS)
+    assert _common_prefix(first, second) >= len(prompts.BLOG_INSTRUCTIONS)
+    assert first.index("Topic: best earbuds") > first.index("OUTPUT REQUIREMENTS")
+
+
+def test_other_prompts_start_with_static_block():
+    assert prompts.outline_user_prompt("t", "x", "y", "z").startswith(
+        prompts.OUTLINE_INSTRUCTIONS
+    )
+    repair = prompts.repair_user_prompt("t", 1, "x", "y", "z", ["Missing H1 title"], "body")
+    assert repair.startswith(prompts.REPAIR_INSTRUCTIONS)
+    assert repair.endswith("BODY TO FIX:\nbody")
+    expand = prompts.expand_user_prompt("Heading", ["- a"], None, "x", "y", "z")
+    assert expand.startswith(prompts.EXPAND_INSTRUCTIONS)
+    assert "Heading line: ## Heading" in expand
+
+
+class _FakeResponses:
+    def __init__(self, text):
+        self.text = text
+
+    def create(self, model, input, **kwargs):
+        usage = Obj(
+            input_tokens=1200,
+            output_tokens=900,
+            input_tokens_details=Obj(cached_tokens=1024),
+        )
+        return Obj(output_text=self.text, usage=usage)
+
+
+class _FakeClient:
+    def __init__(self, text):
+        self.responses = _FakeResponses(text)
+
+
+def _model_text():
+    faqs = "\n".join(f"Q: Question {i}?\nA: Answer {i}." for i in range(5))
+    sections = "\n\n".join(f"## Section {i}\n\nText." for i in range(5))
+    return (
+        "TITLE: Title\nMETA: Meta\nBODY:\n# Title\n\n"
+        f"{sections}\n\n## FAQs\n\n{faqs}\n\n## Conclusion\n\nBye."
+    )
+
+
+def test_cached_tokens_are_reported(tmp_path, fake_openai_errors):
+    article = generate_article(
+        topic="best earbuds",
+        words=1200,
+        tone="friendly",
+        audience="beginners",
+        country="India",
+        out_dir=str(tmp_path),
+        model="gpt-4o-mini",
+        client=_FakeClient(_model_text()),
+    )
+
+    assert article.usage.calls == 1
+    assert article.usage.input_tokens == 1200
+    assert article.usage.cached_tokens == 1024
+    assert round(article.usage.cache_hit_ratio, 2) == 0.85
@@ -0,0 +1,142 @@
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+from ai_blog.server import GenerationService, RequestError, make_server
+
+
+@pytest.fixture
+def base_url(tmp_path):
+    service = GenerationService(tmp_path, provider="mock", workers=2)
+    server = make_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+    service.close()
+
+
+def _request(url, payload=None):
+    data = None if payload is None else json.dumps(payload).encode("utf-8")
+    req = urllib.request.Request(url, data=data, method="POST" if data else "GET")
+    try:
+        with urllib.request.urlopen(req) as resp:
+            return resp.status, resp.headers.get("Content-Type"), resp.read().decode("utf-8")
+    except urllib.error.HTTPError as exc:
+        return exc.code, exc.headers.get("Content-Type"), exc.read().decode("utf-8")
+
+
+def test_generate_json_and_markdown(base_url, tmp_path):
+    status, _, body = _request(f"{base_url}/generate", {"topic": "best earbuds", "words": 800})
+    assert status == 200
+    data = json.loads(body)
+    assert data["slug"] == "best-earbuds"
+    assert data["body"].startswith("# ")
+    assert tmp_path.joinpath("best-earbuds.md").exists()
+
+    status, ctype, text = _request(
+        f"{base_url}/generate?format=markdown", {"topic": "best laptops"}
+    )
+    assert status == 200
+    assert ctype.startswith("text/markdown")
+    assert text.startswith("---\n")
+
+
+def test_outline_then_expand(base_url):
+    status, _, body = _request(f"{base_url}/outline", {"topic": "best earbuds"})
+    outline = json.loads(body)
+    name = Path(outline["path"]).name
+    status, _, body = _request(f"{base_url}/expand", {"outline": name, "section": 1})
+    assert status == 200
+    assert json.loads(body)["content"].startswith("## ")
+
+
+def test_expand_only_reads_outlines_in_out_dir(base_url, tmp_path):
+    secret = tmp_path.parent / "secret-outline.md"
+    secret.write_text("# Secret\n\n## Section\n- private note\n", encoding="utf-8")
+    for outline in (str(secret), "../secret-outline.md", "sub/../../secret-outline.md", 5):
+        status, _, body = _request(f"{base_url}/expand", {"outline": outline, "section": 0})
+        assert status == 400, outline
+        assert "output directory" in json.loads(body)["error"]
+
+
+def test_bad_requests(base_url):
+    assert _request(f"{base_url}/generate", {"words": 5})[0] == 400
+    assert _request(f"{base_url}/generate", {"topic": "x", "words": "many"})[0] == 400
+    assert _request(f"{base_url}/jobs/nope")[0] == 404
+    assert _request(f"{base_url}/nope", {"topic": "x"})[0] == 404
+
+
+def test_batch_job_and_metrics(base_url):
+    status, _, body = _request(
+        f"{base_url}/jobs", {"topics": ["one", {"topic": "two", "country": "US"}]}
+    )
+    assert status == 202
+    job_id = json.loads(body)["id"]
+
+    deadline = time.time() + 5
+    while time.time() < deadline:
+        job = json.loads(_request(f"{base_url}/jobs/{job_id}")[2])
+        if job["status"] == "finished":
+            break
+        time.sleep(0.02)
+    assert job["done"] == 2
+    assert {r["slug"] for r in job["results"]} == {"one", "two"}
+
+    metrics = json.loads(_request(f"{base_url}/metrics")[2])
+    assert metrics["counters"]["server.jobs.submitted"] >= 1
+
+
+def _wait_finished(service, job_id):
+    deadline = time.time() + 5
+    while service.job(job_id)["status"] != "finished" and time.time() < deadline:
+        time.sleep(0.01)
+
+
+def test_finished_jobs_are_evicted(tmp_path):
+    service = GenerationService(tmp_path, provider="mock", workers=1, max_jobs=1)
+    try:
+        first = service.submit_job({"topics": ["one"]})
+        _wait_finished(service, first.id)
+        second = service.submit_job({"topics": ["two"]})
+        _wait_finished(service, second.id)
+        service.submit_job({"topics": ["three"]})
+        with pytest.raises(RequestError, match="Unknown job"):
+            service.job(first.id)
+        assert service.job(second.id)["done"] == 1
+
+        service.job_ttl = 0
+        time.sleep(0.01)
+        with pytest.raises(RequestError, match="Unknown job"):
+            service.job(second.id)
+    finally:
+        service.close()
+
+
+def test_job_is_running_while_its_first_row_runs(tmp_path):
+    started = threading.Event()
+    release = threading.Event()
+    service = GenerationService(tmp_path, provider="mock", workers=1)
+
+    def slow_row(row):
+        started.set()
+        release.wait(5)
+        raise RuntimeError("boom")
+
+    service._generate_row = slow_row
+    try:
+        job = service.submit_job({"topics": ["one"]})
+        assert started.wait(5)
+        assert service.job(job.id)["status"] == "running"
+        release.set()
+        _wait_finished(service, job.id)
+        assert service.job(job.id)["failed"] == 1
+    finally:
+        release.set()
+        service.close()
@@ -0,0 +1,106 @@
+import pytest
+
+from ai_blog.manifest import append_manifest, compact_manifest, read_manifest
+from ai_blog.shard import ShardSpecError, merge_outputs, parse_shard, shard_for_slug
+
+
+def test_parse_shard():
+    shard = parse_shard("1/4")
+    assert (shard.index, shard.count) == (1, 4)
+    assert str(shard) == "1/4"
+    for bad in ["4/4", "x/2", "1", "-1/3", "0/0"]:
+        with pytest.raises(ShardSpecError):
+            parse_shard(bad)
+
+
+def test_shards_partition_slugs():
+    slugs = [f"topic-{i}" for i in range(200)]
+    shards = [parse_shard(f"{i}/3") for i in range(3)]
+    owners = [[s for s in shards if s.owns(slug)] for slug in slugs]
+    assert all(len(o) == 1 for o in owners)
+    assert shard_for_slug("topic-7", 3) == shard_for_slug("topic-7", 3)
+
+
+def _write_shard(path, shard, slugs, failed=()):
+    path.mkdir()
+    for slug in slugs:
+        (path / f"{slug}.md").write_text(f"# {slug}\n", encoding="utf-8")
+        append_manifest(path, {"slug": slug, "path": f"{slug}.md", "status": "ok", "shard": shard})
+    for slug in failed:
+        append_manifest(path, {"slug": slug, "status": "failed", "shard": shard})
+
+
+def test_merge_reports_gaps_and_overlaps(tmp_path):
+    a = tmp_path / "a"
+    b = tmp_path / "b"
+    _write_shard(a, "0/3", ["one", "two"])
+    _write_shard(b, "1/3", ["two", "three"], failed=["four"])
+    dest = tmp_path / "merged"
+
+    report = merge_outputs([a, b], dest, expected_slugs={"one", "two", "three", "four", "five"})
+
+    assert report.merged == 3
+    assert report.overlaps == {"two": [str(a), str(b)]}
+    assert report.failed == ["four"]
+    assert report.missing == ["five"]
+    assert report.missing_shards == ["2/3"]
+    assert sorted(p.name for p in dest.glob("*.md")) == ["one.md", "three.md", "two.md"]
+    assert len(list(read_manifest(dest))) == 3
+
+
+def test_merge_dedupes_reruns_within_a_source(tmp_path):
+    a = tmp_path / "a"
+    _write_shard(a, "0/1", ["one"], failed=["two"])
+    # A later run retried "two" and regenerated "one".
+    (a / "two.md").write_text("# two\n", encoding="utf-8")
+    append_manifest(a, {"slug": "two", "path": "two.md", "status": "ok", "shard": "0/1"})
+    append_manifest(a, {"slug": "one", "path": "one.md", "status": "ok", "shard": "0/1"})
+
+    report = merge_outputs([a], tmp_path / "merged")
+
+    assert report.merged == 2
+    assert report.overlaps == {}
+    assert report.failed == []
+
+
+def test_merge_reports_bad_shard_values(tmp_path):
+    a = tmp_path / "a"
+    _write_shard(a, "0/2", ["one"])
+    append_manifest(a, {"slug": "two", "status": "failed", "shard": "2/two"})
+
+    report = merge_outputs([a], tmp_path / "merged")
+
+    assert report.merged == 1
+    assert len(report.bad_shards) == 1 and "2/two" in report.bad_shards[0]
+    # Without the topics list there is no telling which shards had work.
+    assert report.missing_shards == []
+
+
+def test_shards_that_owned_no_topics_are_not_missing(tmp_path):
+    # With 4 shards, topic-2 and topic-6 hash to shard 0, topic-3 to 1, topic-4 to 3.
+    a = tmp_path / "a"
+    b = tmp_path / "b"
+    _write_shard(a, "0/4", ["topic-2", "topic-6"])
+    _write_shard(b, "1/4", ["topic-3"])
+
+    report = merge_outputs([a, b], tmp_path / "merged", {"topic-2", "topic-3", "topic-6"})
+    assert report.missing_shards == []
+
+    report = merge_outputs([a, b], tmp_path / "merged", {"topic-2", "topic-3", "topic-4"})
+    assert report.missing_shards == ["3/4"]
+    assert report.missing == ["topic-4"]
+
+
+def test_compact_manifest_keeps_latest_records(tmp_path):
+    for status in ["ok", "failed", "ok", "skipped"]:
+        append_manifest(tmp_path, {"slug": "one", "status": status})
+    for status in ["failed", "failed"]:
+        append_manifest(tmp_path, {"slug": "two", "status": status})
+
+    compact_manifest(tmp_path)
+
+    assert [(r["slug"], r["status"]) for r in read_manifest(tmp_path)] == [
+        ("one", "ok"),
+        ("one", "skipped"),
+        ("two", "failed"),
+    ]
@@ -0,0 +1,101 @@
+import threading
+import time
+
+from ai_blog import generator
+from ai_blog.generator import Article, generate_article
+from ai_blog.metrics import metrics
+from ai_blog.singleflight import SingleFlight
+from ai_blog.usage import Usage
+
+
+def _run_concurrently(n, fn):
+    results = [None] * n
+    errors = [None] * n
+
+    def target(i):
+        try:
+            results[i] = fn()
+        except Exception as exc:
+            errors[i] = exc
+
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+def test_concurrent_callers_share_one_execution_and_errors():
+    flight = SingleFlight("test")
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.05)
+        return "done"
+
+    results, _ = _run_concurrently(5, lambda: flight.do("k", slow))
+    assert len(calls) == 1
+    assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+    assert flight.in_flight() == 0
+
+    def boom():
+        time.sleep(0.05)
+        raise RuntimeError("upstream")
+
+    _, errors = _run_concurrently(3, lambda: flight.do("k", boom))
+    assert all(isinstance(exc, RuntimeError) for exc in errors)
+    assert flight.do("k", lambda: "fresh") == ("fresh", False)
+
+
+def test_identical_generate_requests_share_one_generation(monkeypatch, tmp_path):
+    calls = []
+
+    def fake_generate(topic, *args):
+        calls.append(topic)
+        time.sleep(0.05)
+        return Article("T", "M", "body", "slug", "slug.md", usage=Usage(calls=1))
+
+    monkeypatch.setattr(generator, "_generate_article", fake_generate)
+    before = metrics.counter("singleflight.generate.waiters")
+    args = dict(
+        words=1200,
+        tone="friendly",
+        audience="beginners",
+        country="India",
+        out_dir=str(tmp_path),
+        model="m",
+        provider="mock",
+    )
+    results, _ = _run_concurrently(4, lambda: generate_article(topic="same", **args))
+    assert calls == ["same"]
+    assert sum(article.usage.calls for article in results) == 1
+    assert metrics.counter("singleflight.generate.waiters") - before == 3
+
+    generate_article(topic="other", **args)
+    assert calls == ["same", "other"]
+
+
+def test_requests_with_different_clients_are_not_merged(monkeypatch, tmp_path):
+    calls = []
+
+    def fake_generate(topic, *args):
+        calls.append(args[8])
+        time.sleep(0.05)
+        return Article("T", "M", "body", "slug", "slug.md", usage=Usage(calls=1))
+
+    monkeypatch.setattr(generator, "_generate_article", fake_generate)
+    clients = [object(), object()]
+    args = dict(
+        topic="same",
+        words=1200,
+        tone="friendly",
+        audience="beginners",
+        country="India",
+        out_dir=str(tmp_path),
+        model="m",
+    )
+    counter = iter(range(4))
+    _run_concurrently(4, lambda: generate_article(client=clients[next(counter) % 2], **args))
+    assert sorted(map(id, calls)) == sorted(map(id, clients))
@@ -0,0 +1,122 @@
+import json
+
+import pytest
+
+from ai_blog.generator import generate_article
+from ai_blog.metrics import metrics
+from ai_blog.outline_parse import read_frontmatter
+from ai_blog.structured import StructuredOutputError, assemble_markdown, parse_structured
+from ai_blog.utils import validate_body
+
+from conftest import Obj
+
+
+def _reply(**overrides):
+    data = {
+        "title": "Best earbuds",
+        "meta": "Our picks.",
+        "intro": "Earbuds are everywhere.",
+        "quick_answer": ["- Buy the mid-range pair"],
+        "sections": [
+            {"heading": "## Sound", "content": "Clear.\n\n## Bass\n\nPunchy."},
+            {"heading": "Battery", "content": "All day."},
+        ],
+        "checklist": ["Budget", "Fit"],
+        "faqs": [{"question": f"Question {i}?", "answer": f"Answer {i}."} for i in range(5)],
+        "conclusion": "Pick one today.",
+    }
+    data.update(overrides)
+    return data
+
+
+def test_assembled_markdown_passes_validation_by_construction():
+    parsed = assemble_markdown(_reply())
+    assert parsed.title == "Best earbuds"
+    assert validate_body(parsed.body) == []
+    assert "## Sound\n\nClear.\n\n### Bass" in parsed.body
+    assert "- Buy the mid-range pair" in parsed.body
+    assert "Q: Question 4?\nA: Answer 4." in parsed.body
+
+
+def test_parse_structured_accepts_fenced_json_and_rejects_bad_replies():
+    assert parse_structured("```json\n" + json.dumps(_reply()) + "\n```").title == "Best earbuds"
+    with pytest.raises(StructuredOutputError):
+        parse_structured('{"title": "cut off')
+    with pytest.raises(StructuredOutputError):
+        parse_structured(json.dumps(_reply(faqs=[])))
+
+
+def _generate(tmp_path, create, structured=True):
+    return generate_article(
+        topic="Structured earbuds",
+        words=800,
+        tone="friendly",
+        audience="beginners",
+        country="India",
+        out_dir=str(tmp_path),
+        model="m",
+        client=Obj(responses=Obj(create=create)),
+        structured=structured,
+    )
+
+
+def test_structured_generation_requests_the_schema(tmp_path, fake_openai_errors):
+    calls = []
+
+    def create(model, input, **kwargs):
+        calls.append(kwargs)
+        return Obj(output_text=json.dumps(_reply()), usage=None)
+
+    article = _generate(tmp_path, create)
+    assert len(calls) == 1
+    assert calls[0]["text"]["format"]["type"] == "json_schema"
+    assert calls[0]["text"]["format"]["strict"] is True
+    assert validate_body(article.body) == []
+    structured_fp = read_frontmatter(article.path)["fingerprint"]
+
+    def text_create(model, input, **kwargs):
+        reply = assemble_markdown(_reply())
+        return Obj(
+            output_text=f"TITLE: {reply.title}\nMETA: {reply.meta_description}\nBODY:\n{reply.body}",
+            usage=None,
+        )
+
+    plain = _generate(tmp_path, text_create, structured=False)
+    assert read_frontmatter(plain.path)["fingerprint"] != structured_fp
+
+
+def test_structured_generation_falls_back_to_the_text_prompt(tmp_path, fake_openai_errors):
+    reply = assemble_markdown(_reply())
+
+    def create(model, input, **kwargs):
+        if "text" in kwargs:
+            raise ValueError("json_schema is not supported with this model")
+        return Obj(
+            output_text=f"TITLE: {reply.title}\nMETA: {reply.meta_description}\nBODY:\n{reply.body}",
+            usage=None,
+        )
+
+    before = metrics.counter("structured.fallbacks")
+    article = _generate(tmp_path, create)
+    assert article.body == reply.body
+    assert metrics.counter("structured.fallbacks") == before + 1
+
+
+def test_unparseable_structured_reply_is_fetched_again_and_counted(tmp_path, fake_openai_errors):
+    reply = assemble_markdown(_reply())
+    calls = []
+
+    def create(model, input, **kwargs):
+        calls.append(kwargs)
+        if "text" in kwargs:
+            return Obj(output_text='{"title": "cut off', usage=None)
+        return Obj(
+            output_text=f"TITLE: {reply.title}\nMETA: {reply.meta_description}\nBODY:\n{reply.body}",
+            usage=None,
+        )
+
+    before = metrics.counter("structured.refetches")
+    article = _generate(tmp_path, create)
+    assert article.body == reply.body
+    assert len(calls) == 2
+    assert metrics.counter("structured.refetches") == before + 1
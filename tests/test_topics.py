@@ -0,0 +1,68 @@
+import io
+
+import pytest
+
+from ai_blog.topics import TopicsParseError, iter_topic_rows
+
+DEFAULTS = dict(words=1200, tone="friendly", audience="beginners", country="India")
+
+
+def test_txt_skips_blank_and_comments(tmp_path):
+    path = tmp_path / "topics.txt"
+    path.write_text("# header\nfirst topic\n\n  second topic  \n", encoding="utf-8")
+
+    rows = list(iter_topic_rows(path, **DEFAULTS))
+    assert [r.topic for r in rows] == ["first topic", "second topic"]
+    assert all(r.words == 1200 and r.country == "India" for r in rows)
+    assert rows[1].line == 4
+
+
+def test_csv_row_overrides(tmp_path):
+    path = tmp_path / "topics.csv"
+    path.write_text(
+        "topic,words,tone,country,model\n"
+        "best earbuds,800,,US,gpt-4o\n"
+        "best laptops,,casual,,\n",
+        encoding="utf-8",
+    )
+
+    rows = list(iter_topic_rows(path, model="gpt-4o-mini", **DEFAULTS))
+    assert rows[0].words == 800
+    assert rows[0].tone == "friendly"
+    assert rows[0].country == "US"
+    assert rows[0].model == "gpt-4o"
+    assert rows[1].words == 1200
+    assert rows[1].tone == "casual"
+    assert rows[1].model == "gpt-4o-mini"
+
+
+def test_csv_requires_topic_column(tmp_path):
+    path = tmp_path / "topics.csv"
+    path.write_text("title\nfoo\n", encoding="utf-8")
+
+    with pytest.raises(TopicsParseError, match="topic"):
+        list(iter_topic_rows(path, **DEFAULTS))
+
+
+def test_jsonl_from_stdin_is_lazy():
+    stream = io.StringIO(
+        '{"topic": "one", "audience": "experts"}\n'
+        '"two"\n'
+        "not json\n"
+    )
+    rows = iter_topic_rows("-", stdin=stream, **DEFAULTS)
+
+    first = next(rows)
+    assert first.topic == "one"
+    assert first.audience == "experts"
+    assert next(rows).topic == "two"
+    with pytest.raises(TopicsParseError, match="Line 3"):
+        next(rows)
+
+
+def test_invalid_words_override(tmp_path):
+    path = tmp_path / "topics.jsonl"
+    path.write_text('{"topic": "one", "words": "lots"}\n', encoding="utf-8")
+
+    with pytest.raises(TopicsParseError, match="invalid words"):
+        list(iter_topic_rows(path, **DEFAULTS))
@@ -0,0 +1,98 @@
+import pytest
+
+from ai_blog.generator import ArticleJob, fetch_article, generate_article, prepare_article
+from ai_blog.outline_parse import read_frontmatter
+from ai_blog.usage import PriceConfigError, RunBudget, Usage, price_for
+
+from conftest import Obj
+
+
+def test_price_lookup_uses_the_longest_prefix_and_env_override(monkeypatch):
+    assert price_for("gpt-4o-mini-2024-07-18") == price_for("gpt-4o-mini")
+    assert price_for("gpt-4o-mini") != price_for("gpt-4o")
+    assert price_for("gpt-4o-2024-08-06") == price_for("gpt-4o")
+    assert price_for("gpt-4oo") is None
+    assert price_for("my-model") is None
+    monkeypatch.setenv("AI_BLOG_PRICES", '{"my-model": [1, 0.5, 2]}')
+    assert price_for("my-model") == (1, 0.5, 2)
+
+
+@pytest.mark.parametrize(
+    "value", ["{not json", "[1, 2, 3]", '{"m": [1, 2]}', '{"m": ["1", 2, 3]}']
+)
+def test_bad_price_override_is_reported(monkeypatch, value):
+    monkeypatch.setenv("AI_BLOG_PRICES", value)
+    with pytest.raises(PriceConfigError, match="AI_BLOG_PRICES must be"):
+        price_for("gpt-4o")
+
+
+def test_cost_bills_cached_input_at_the_cached_price(monkeypatch):
+    monkeypatch.setenv("AI_BLOG_PRICES", '{"m": [1.0, 0.1, 2.0]}')
+    usage = Usage(calls=1, input_tokens=1_000_000, cached_tokens=400_000, output_tokens=500_000)
+    assert usage.cost("m") == pytest.approx(0.6 + 0.04 + 1.0)
+    assert usage.cost("unknown") is None
+    assert usage.summary("m").endswith("~$1.6400")
+
+
+def test_run_budget_refuses_work_that_would_exceed_the_cap(monkeypatch):
+    monkeypatch.setenv("AI_BLOG_PRICES", '{"m": [1.0, 1.0, 1.0]}')
+    budget = RunBudget(max_tokens=10_000)
+    # Guess of 3000 tokens: three fit in flight, a fourth would not.
+    assert [budget.admit(3000, None) for _ in range(4)] == [True, True, True, False]
+    # Real articles turn out cheaper; the average replaces the guess.
+    for _ in range(3):
+        budget.record(Usage(calls=2, input_tokens=500, output_tokens=500), "m")
+    assert budget.admit(3000, None)
+    assert budget.usage.total_tokens == 3000
+    assert budget.cost == pytest.approx(0.003)
+
+    by_cost = RunBudget(max_cost=0.01)
+    assert by_cost.admit(0, 0.004) and by_cost.admit(0, 0.004)
+    assert not by_cost.admit(0, 0.004)
+    by_cost.record(Usage(), "m")
+    assert by_cost.finished == 0 and by_cost.in_flight == 1
+
+
+def test_usage_is_written_to_frontmatter_when_asked(tmp_path, fake_openai_errors):
+    faqs = "\n".join(f"Q: Question {i}?\nA: Answer {i}." for i in range(5))
+    sections = "\n\n".join(f"## Section {i}\n\nText." for i in range(5))
+    text = f"TITLE: T\nMETA: M\nBODY:\n# T\n\n{sections}\n\n## FAQs\n\n{faqs}\n\n## Conclusion\n\nBye."
+
+    def create(model, input, **kwargs):
+        usage = Obj(input_tokens=1000, output_tokens=2000, input_tokens_details=Obj(cached_tokens=200))
+        return Obj(output_text=text, usage=usage)
+
+    article = generate_article(
+        topic="Metered topic",
+        words=800,
+        tone="friendly",
+        audience="beginners",
+        country="India",
+        out_dir=str(tmp_path),
+        model="gpt-4o-mini",
+        client=Obj(responses=Obj(create=create)),
+        record_usage=True,
+    )
+    frontmatter = read_frontmatter(article.path)
+    assert frontmatter["input_tokens"] == "1000"
+    assert frontmatter["cached_tokens"] == "200"
+    assert float(frontmatter["cost_usd"]) == pytest.approx(article.usage.cost("gpt-4o-mini"), abs=1e-6)
+
+
+def test_failed_article_keeps_the_usage_it_spent(tmp_path, fake_openai_errors):
+    def create(model, input, **kwargs):
+        return Obj(output_text="not an article", usage=Obj(input_tokens=700, output_tokens=300))
+
+    job = ArticleJob(
+        topic="Broken topic",
+        words=800,
+        tone="friendly",
+        audience="beginners",
+        country="India",
+        out_dir=str(tmp_path),
+        model="gpt-4o-mini",
+        client=Obj(responses=Obj(create=create)),
+    )
+    with pytest.raises(ValueError):
+        prepare_article(fetch_article(job))
+    assert (job.usage.calls, job.usage.total_tokens) == (1, 1000)
@@ -0,0 +1,79 @@
+import pytest
+
+from ai_blog import watch
+from ai_blog.topics import TopicRow
+from ai_blog.watch import diff_rows, row_key, wait_for_change, watch_topics
+
+
+def _row(topic, words=1200):
+    return TopicRow(topic=topic, words=words, tone="friendly", audience="beginners", country="India")
+
+
+def test_diff_rows_returns_only_new_and_changed():
+    state = {"one": row_key(_row("One")), "two": row_key(_row("Two"))}
+    changes = diff_rows([_row("One"), _row("Two", words=800), _row("Three")], state)
+    assert [slug for slug, _ in changes.rows] == ["two", "three"]
+    assert changes.unchanged == 1
+
+
+def test_wait_for_change_coalesces_bursts(tmp_path):
+    path = tmp_path / "topics.txt"
+    path.write_text("a\n", encoding="utf-8")
+    now = [0.0]
+    edits = iter(["a\nb\n", "a\nb\nc\n", None, None, None, None])
+
+    def sleep(seconds):
+        now[0] += seconds
+        text = next(edits)
+        if text is not None:
+            path.write_text(text, encoding="utf-8")
+
+    signature = wait_for_change(path, None, interval=1, debounce=2, sleep=sleep, clock=lambda: now[0])
+    assert signature[1] == len("a\nb\nc\n")
+    assert now[0] == 4
+
+
+def test_watch_topics_skips_processed_rows_and_retries_failures(tmp_path):
+    path = tmp_path / "topics.txt"
+    path.write_text("x", encoding="utf-8")
+    state_file = tmp_path / "state.json"
+    rows = [_row("One"), _row("Flaky")]
+    calls = []
+
+    def handle(slug, row):
+        calls.append(slug)
+        if slug == "flaky" and calls.count("flaky") == 1:
+            raise RuntimeError("transient")
+
+    def run():
+        watch_topics(path, lambda: rows, handle, state_file, debounce=0, once=True)
+
+    run()
+    run()
+    assert calls == ["one", "flaky", "flaky"]
+    run()
+    assert calls == ["one", "flaky", "flaky"]
+
+
+def test_watch_topics_batches_state_writes(tmp_path, monkeypatch):
+    path = tmp_path / "topics.txt"
+    path.write_text("x", encoding="utf-8")
+    state_file = tmp_path / "state.json"
+    rows = [_row(f"Topic {i}") for i in range(7)]
+    saves = []
+    monkeypatch.setattr(watch, "save_state", lambda p, state: saves.append(len(state)))
+
+    def handle(slug, row):
+        if slug == "topic-4":
+            raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        watch_topics(path, lambda: rows, handle, state_file, debounce=0, once=True, save_every=3)
+    # One full batch, then the row done since is written on the way out.
+    assert saves == [3, 4]
+
+    saves.clear()
+    watch_topics(
+        path, lambda: rows[:5], lambda s, r: None, state_file, debounce=0, once=True, save_every=3
+    )
+    assert saves == [3, 5]
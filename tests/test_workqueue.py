@@ -0,0 +1,72 @@
+import pytest
+
+from ai_blog.topics import TopicRow
+from ai_blog.workqueue import WorkQueue, run_worker
+
+
+def _row(topic):
+    return TopicRow(topic=topic, words=1200, tone="friendly", audience="beginners", country="India")
+
+
+def test_push_deduplicates_by_slug(tmp_path):
+    with WorkQueue(tmp_path / "q.db") as queue:
+        assert queue.push([_row("One"), _row("two"), _row("one")]) == (2, 1)
+        assert queue.push([_row("two")]) == (0, 1)
+        assert queue.stats()["pending"] == 2
+
+
+def test_expired_lease_is_reclaimed_and_stale_ack_rejected(tmp_path):
+    with WorkQueue(tmp_path / "q.db") as queue:
+        queue.push([_row("one")])
+        first = queue.lease("a", visibility_timeout=-1)
+        assert first is not None
+
+        second = queue.lease("b", visibility_timeout=60)
+        assert second is not None
+        assert second.id == first.id
+        assert second.attempts == 2
+        assert queue.lease("c", visibility_timeout=60) is None
+
+        assert not queue.ack(first)
+        assert queue.ack(second)
+        assert queue.stats()["done"] == 1
+
+
+def test_retry_buries_after_max_attempts(tmp_path):
+    with WorkQueue(tmp_path / "q.db", max_attempts=2) as queue:
+        queue.push([_row("one")])
+        task = queue.lease("a", 60)
+        assert queue.retry(task, "boom")
+        task = queue.lease("a", 60)
+        assert queue.retry(task, "boom again")
+        assert queue.lease("a", 60) is None
+        assert queue.stats()["dead"] == 1
+
+
+def test_run_worker_processes_and_retries(tmp_path):
+    calls = []
+
+    def handle(row):
+        calls.append(row.topic)
+        if row.topic == "flaky" and calls.count("flaky") == 1:
+            raise RuntimeError("transient")
+        return f"{row.topic}.md"
+
+    with WorkQueue(tmp_path / "q.db") as queue:
+        queue.push([_row("flaky"), _row("steady")])
+        done = run_worker(queue, handle, "w1", retry_delay=0, poll_interval=0)
+        assert done == 2
+        assert queue.stats() == {"pending": 0, "leased": 0, "done": 2, "dead": 0}
+    assert calls.count("flaky") == 2
+
+
+def test_run_worker_fatal_error_releases_task(tmp_path):
+    def handle(row):
+        raise PermissionError("bad key")
+
+    with WorkQueue(tmp_path / "q.db") as queue:
+        queue.push([_row("one")])
+        with pytest.raises(PermissionError):
+            run_worker(queue, handle, "w1", fatal=(PermissionError,))
+        task = queue.lease("w2", 60)
+        assert task.attempts == 1